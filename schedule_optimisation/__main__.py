@@ -0,0 +1,136 @@
+import argparse
+import json
+import random
+import signal
+import sys
+from datetime import datetime
+import numpy as np
+from schedule_optimisation.optimizer import optimise_schedule
+from schedule_optimisation.occupancy import ROOM_STRATEGIES
+from schedule_optimisation.tabu import TABU_ATTRIBUTES
+from schedule_optimisation.budget import BestSoFar
+from schedule_optimisation.constants import DECOMPOSITION_POLISH_ITERS, NEIGHBOUR_CHECKS_LIMIT
+from schedule_optimisation.construction import INITIALISERS
+from schedule_optimisation.evaluator import EVALUATION_TERMS
+from schedule_optimisation.zobrist import CACHE_EVICTIONS
+
+def _load_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _save_json(data, path):
+    # NumPy numbers (e.g. batch evaluation costs) are saved as plain numbers
+    def default(value):
+        if isinstance(value, np.generic):
+            return value.item()
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+    if path == "-":
+        json.dump(data, sys.stdout, indent=2, ensure_ascii=False, default=default)
+        sys.stdout.write("\n")
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False, default=default)
+
+def _windows(value):
+    return value if value == "week" else int(value)
+
+def _term_order(value):
+    return tuple(name.strip() for name in value.split(","))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m schedule_optimisation",
+                                     description="Optimise a schedule with Tabu Search or Quantum-Inspired Tabu Search.")
+    parser.add_argument("schedule", help="path of the schedule JSON (scraper output)")
+    parser.add_argument("--lessons-times", required=True, help="path of the lessons times JSON")
+    parser.add_argument("--start-date", required=True, help="first date of the optimised range (YYYY-MM-DD)")
+    parser.add_argument("--end-date", required=True, help="last date of the optimised range (YYYY-MM-DD)")
+    parser.add_argument("--output", required=True, help="path of the optimised schedule JSON ('-' for stdout)")
+    parser.add_argument("--metrics", default=None, help="path of the metrics JSON")
+    parser.add_argument("--algorithm", default="ts", choices=["ts", "qits"])
+    parser.add_argument("--max-iters", type=int, default=1000)
+    parser.add_argument("--initialiser", default=None, choices=list(INITIALISERS),
+                        help="place unassigned lessons ('greedy') and lessons in hard conflicts ('greedy_conflicts') first")
+    parser.add_argument("--repair", action="store_true", help="repair hard conflicts (min-conflicts) before the search")
+    parser.add_argument("--tabu-tenure", type=int, default=50)
+    parser.add_argument("--no-improvement-limit", type=int, default=None, help="stop after this many iterations without improvement")
+    parser.add_argument("--time-limit", type=float, default=None, help="wall-clock time limit of the search in seconds")
+    parser.add_argument("--deadline", type=datetime.fromisoformat, default=None,
+                        help="stop the search at this date and time (ISO format, e.g. 2024-09-01T05:30)")
+    parser.add_argument("--room-strategy", default="first", choices=list(ROOM_STRATEGIES))
+    parser.add_argument("--tabu-attribute", default="lesson_pair", choices=list(TABU_ATTRIBUTES))
+    parser.add_argument("--candidate-bias", type=float, default=0.0,
+                        help="probability of moving a lesson with conflicts or penalties instead of a random lesson")
+    parser.add_argument("--bounded-evaluation", action="store_true",
+                        help="stop evaluating a neighbour as soon as it cannot be selected")
+    parser.add_argument("--term-order", type=_term_order, default=None,
+                        help=f"comma-separated order of the terms in the bounded evaluation (default: {','.join(EVALUATION_TERMS)})")
+    parser.add_argument("--cost-cache-size", type=int, default=None, help="max number of cached neighbour costs")
+    parser.add_argument("--cache-eviction", default="lru", choices=list(CACHE_EVICTIONS))
+    parser.add_argument("--solution-tabu-tenure", type=int, default=None,
+                        help="iterations during which revisiting an exact solution is tabu")
+    parser.add_argument("--room-reassignment", action="store_true",
+                        help="reassign the rooms of the slots changed by every accepted move optimally")
+    parser.add_argument("--room-postpass", action="store_true", help="assign the rooms of all slots optimally after the search")
+    parser.add_argument("--batch-evaluation", action="store_true", help="evaluate the whole neighbourhood at once (qits)")
+    parser.add_argument("--neighbour-workers", type=int, default=None,
+                        help="worker processes evaluating the neighbours of large inputs (qits)")
+    parser.add_argument("--neighbour-checks-limit", type=int, default=NEIGHBOUR_CHECKS_LIMIT,
+                        help="number of neighbours generated per iteration")
+    parser.add_argument("--enumerate-moves", action="store_true", help="evaluate all moves of one lesson per iteration")
+    parser.add_argument("--n-starts", type=int, default=1, help="number of independent runs in parallel processes")
+    parser.add_argument("--max-workers", type=int, default=None)
+    parser.add_argument("--decompose", type=_windows, default=None,
+                        help="optimise time windows in parallel: 'week' or a number of dates per window")
+    parser.add_argument("--polish-iters", type=int, default=DECOMPOSITION_POLISH_ITERS,
+                        help="iterations of the global polish after stitching the windows")
+    parser.add_argument("--compare-monolithic", action="store_true", help="report the cost of a monolithic run as well")
+    parser.add_argument("--weekly-template", action="store_true",
+                        help="optimise one representative week of the recurring lessons and expand it to the range")
+    parser.add_argument("--template-exception-iters", type=int, default=None,
+                        help="iterations of the template exceptions search (default: their share of --max-iters)")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the random generators")
+    parser.add_argument("--trace", default=None, help="path of the JSONL iteration trace")
+    parser.add_argument("--profile", action="store_true", help="add the profiling breakdown to the metrics")
+    parser.add_argument("--plot", action="store_true", help="save the cost history figure to logs/figures")
+    parser.add_argument("--checkpoint", default=None, help="path of the periodic search checkpoint")
+    parser.add_argument("--checkpoint-interval", type=int, default=100, help="iterations between checkpoints")
+    parser.add_argument("--resume", action="store_true", help="continue the search from the checkpoint if it exists")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.seed is not None:
+        random.seed(args.seed)
+        np.random.seed(args.seed)
+
+    # SIGINT/SIGTERM stop the search cleanly, the best schedule found so far is still saved (single runs only)
+    best_so_far = None
+    if args.n_starts == 1 and args.decompose is None and not args.weekly_template:
+        best_so_far = BestSoFar()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: best_so_far.request_stop())
+
+    optimised_schedule, metrics = optimise_schedule(
+        _load_json(args.schedule), _load_json(args.lessons_times), args.start_date, args.end_date,
+        algorithm=args.algorithm, max_iters=args.max_iters, tabu_tenure=args.tabu_tenure, room_strategy=args.room_strategy,
+        tabu_attribute=args.tabu_attribute, n_starts=args.n_starts, max_workers=args.max_workers, plot=args.plot,
+        profile=args.profile, trace=args.trace, checkpoint_path=args.checkpoint,
+        checkpoint_interval=args.checkpoint_interval, resume=args.resume, no_improvement_limit=args.no_improvement_limit,
+        time_limit=args.time_limit, deadline=args.deadline, best_so_far=best_so_far, decompose=args.decompose,
+        polish_iters=args.polish_iters, compare_monolithic=args.compare_monolithic, weekly_template=args.weekly_template,
+        template_exception_iters=args.template_exception_iters,
+        candidate_bias=args.candidate_bias, enumerate_moves=args.enumerate_moves, initialiser=args.initialiser,
+        repair=args.repair, bounded_evaluation=args.bounded_evaluation, term_order=args.term_order,
+        cost_cache_size=args.cost_cache_size, cache_eviction=args.cache_eviction, solution_tabu_tenure=args.solution_tabu_tenure,
+        room_reassignment=args.room_reassignment, room_postpass=args.room_postpass,
+        batch_evaluation=args.batch_evaluation, neighbour_workers=args.neighbour_workers,
+        neighbour_checks_limit=args.neighbour_checks_limit
+    )
+
+    _save_json(optimised_schedule, args.output)
+    if args.metrics is not None:
+        _save_json(metrics, args.metrics)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+Batch Cost Evaluation Module
+
+The Batch Cost Evaluation Module contains a vectorised evaluator which finds the costs of a whole
+neighbourhood at once. Each constraint is counted over buckets of lessons (slots for hard conflicts,
+teacher days for movement and overload, teachers for room reuse, teacher group days for split
+classes). For all K candidate moves together, only the buckets touched by the moves are gathered from
+the sorted current state and recounted with grouped NumPy operations, so the costs are the same as
+the ones returned by `compute_cost` for every neighbouring solution.
+"""
+
+import numpy as np
+from schedule_optimisation.state import AssignmentState, UNASSIGNED
+from schedule_optimisation.evaluator import HARD_METRICS, SOFT_METRICS
+from schedule_optimisation.weights import (TEACHER_MOVE_BETWEEN_CONSECUTIVE, TEACHER_SAME_ROOM_FOR_DIFF, GROUP_SPLIT_DOUBLE,
+                                           TEACHER_DAILY_OVERLOAD, HARD_CONFLICTS_PENALTY)
+
+def encode_moves(moves):
+    # Encode moves as int64 rows (a, b, date_idx, time_idx, room_idx):
+    # - "move": lesson a gets (date_idx, time_idx, room_idx), b is -1
+    # - "swap": lessons a and b exchange their assignments
+    encoded = np.full((len(moves), 5), UNASSIGNED, dtype=np.int64)
+    for k, move in enumerate(moves):
+        if move[0] == "move":
+            _, lesson_idx, _, new_asgn = move
+            encoded[k, 0] = lesson_idx
+            if new_asgn is not None:
+                date_idx, time_idx, room_idx = new_asgn
+                encoded[k, 2:] = (date_idx, time_idx, room_idx if room_idx is not None else UNASSIGNED)
+        elif move[0] == "swap":
+            _, a_idx, b_idx, _, _ = move
+            encoded[k, :2] = (a_idx, b_idx)
+    return encoded
+
+def _run_starts(keys):
+    # Boolean flags of the first element of every run of equal sorted keys
+    starts = np.ones(len(keys), dtype=bool)
+    starts[1:] = keys[1:] != keys[:-1]
+    return starts
+
+def _run_first(values, starts):
+    # Value of the first element of the run for every element
+    return values[starts][np.cumsum(starts) - 1]
+
+def _run_lengths(starts):
+    # Length of the run at every run start (zero for other elements)
+    lengths = np.zeros(len(starts), dtype=np.int64)
+    start_idx = np.flatnonzero(starts)
+    lengths[start_idx] = np.diff(np.append(start_idx, len(starts)))
+    return lengths
+
+def _take(elems, idx):
+    return {name: values[idx] for name, values in elems.items()}
+
+def _concat(first, second):
+    return {name: np.concatenate((first[name], second[name])) for name in first}
+
+def _expand_ranges(left, right):
+    # Positions of all elements in [left, right) ranges and the index of the range of each position
+    counts = right - left
+    owner = np.repeat(np.arange(len(left)), counts)
+    positions = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(left, counts)
+    return positions, owner
+
+# --- Per-element contributions of sorted buckets (elements are sorted by bucket key and bucket order) ---
+
+def _slot_contributions(keys, elems):
+    # Teacher and room conflicts: lessons matching the first lesson (with a room) in the slot
+    starts = _run_starts(keys)
+    teacher_viol = (elems["teacher"] == _run_first(elems["teacher"], starts)) & ~starts
+    room_viol = np.zeros(len(keys), dtype=bool)
+    has_room = np.flatnonzero(elems["room"] != UNASSIGNED)
+    room_starts = _run_starts(keys[has_room])
+    room_viol[has_room] = (elems["room"][has_room] == _run_first(elems["room"][has_room], room_starts)) & ~room_starts
+    return {"teacher_conflicts": teacher_viol, "room_conflicts": room_viol}
+
+def _slot_group_contributions(keys, elems):
+    # Group conflicts: every repeated occurrence of a group in the slot
+    return {"group_conflicts": ~_run_starts(keys)}
+
+def _teacher_day_contributions(keys, elems):
+    # Teacher movement between consecutive classes and daily overload
+    starts = _run_starts(keys)
+    time, room = elems["time"], elems["room"]
+    moved = np.zeros(len(keys), dtype=bool)
+    moved[1:] = (~starts[1:] & (time[1:] == time[:-1] + 1) & (room[1:] != UNASSIGNED) &
+                 (room[:-1] != UNASSIGNED) & (room[1:] != room[:-1]))
+    counts = _run_lengths(starts)
+    return {"teacher_move_between_consecutive": moved,
+            "teacher_daily_overload": np.maximum(counts - 4, 0) + np.maximum(counts - 6, 0)}
+
+def _teacher_contributions(keys, elems):
+    # Teacher room reuse: every class except the first one in each distinct room
+    room = elems["room"]
+    new_room = _run_starts(keys)
+    new_room[1:] |= room[1:] != room[:-1]
+    return {"teacher_same_room_for_diff": ~(new_room & (room != UNASSIGNED))}
+
+def _teacher_group_day_contributions(keys, elems):
+    # Group splits: classes without a consecutive class of the teacher with the group on the same day
+    time = elems["time"]
+    linked = (keys[1:] == keys[:-1]) & (time[1:] == time[:-1] + 1)
+    paired = np.zeros(len(keys), dtype=bool)
+    paired[1:] |= linked
+    paired[:-1] |= linked
+    return {"group_split_double": ~paired}
+
+
+class BatchEvaluator:
+    def __init__(self, problem):
+        self.num_lessons = problem.num_lessons
+        self.lesson_teacher = problem.lesson_teacher.astype(np.int64)
+        num_teachers = max(problem.num_teachers, 1)
+
+        # (lesson, group) pairs are the CSR lesson -> groups mapping of the problem
+        self.pair_ptr = problem.lesson_groups_ptr.astype(np.int64)
+        self.pair_groups = problem.lesson_groups.astype(np.int64)
+        num_groups = max(problem.num_groups, 1)
+
+        # Bucket families: (bucket key, number of buckets, order inside bucket, contributions, uses group pairs)
+        nd, nt = problem.num_dates, problem.num_times
+        self.families = (
+            (lambda e: e["date"] * nt + e["time"], nd * nt, ("lesson",), _slot_contributions, False),
+            (lambda e: (e["date"] * nt + e["time"]) * num_groups + e["group"], nd * nt * num_groups, (),
+             _slot_group_contributions, True),
+            (lambda e: e["teacher"] * nd + e["date"], num_teachers * nd, ("time", "lesson"), _teacher_day_contributions, False),
+            (lambda e: e["teacher"], num_teachers, ("room",), _teacher_contributions, False),
+            (lambda e: (e["teacher"] * num_groups + e["group"]) * nd + e["date"], num_teachers * num_groups * nd, ("time",),
+             _teacher_group_day_contributions, True),
+        )
+
+    def evaluate(self, assignments, moves):
+        # Returns costs of all neighbours (int64 array) and violations of every constraint ({name: array})
+        state = assignments if isinstance(assignments, AssignmentState) else AssignmentState.from_assignments(assignments)
+        encoded = moves if isinstance(moves, np.ndarray) else encode_moves(moves)
+        num_candidates = len(encoded)
+
+        # Lesson and (lesson, group) elements of the current state and of the changed lessons of every candidate
+        base = self._lesson_elements(np.arange(self.num_lessons), state.dates, state.times, state.rooms)
+        changed_cand, changed_old, changed_new = self._changed_elements(state, encoded)
+        base_pairs = self._pair_elements(base)
+        changed_pairs_old = self._pair_elements(changed_old)
+        changed_pairs_new = self._pair_elements(changed_new)
+        changed_pairs_cand = changed_cand[changed_pairs_old["owner"]]
+
+        viol = {name: np.zeros(num_candidates, dtype=np.int64) for name in HARD_METRICS + SOFT_METRICS}
+        for bucket, num_buckets, order, contributions, pairs in self.families:
+            if pairs:
+                family_base, family_cand, family_old, family_new = base_pairs, changed_pairs_cand, changed_pairs_old, changed_pairs_new
+            else:
+                family_base, family_cand, family_old, family_new = base, changed_cand, changed_old, changed_new
+            for name, values in self._family_violations(num_candidates, bucket, num_buckets, order, contributions,
+                                                        family_base, family_cand, family_old, family_new).items():
+                viol[name] += values
+
+        # Total cost in the same way as compute_cost
+        hard = viol["teacher_conflicts"] + viol["room_conflicts"] + viol["group_conflicts"]
+        soft = (viol["teacher_move_between_consecutive"] * TEACHER_MOVE_BETWEEN_CONSECUTIVE +
+                viol["teacher_same_room_for_diff"] * TEACHER_SAME_ROOM_FOR_DIFF +
+                viol["group_split_double"] * GROUP_SPLIT_DOUBLE +
+                viol["teacher_daily_overload"] * TEACHER_DAILY_OVERLOAD)
+        costs = np.where(hard > 0, hard * HARD_CONFLICTS_PENALTY * self.num_lessons, soft)
+        return costs, viol
+
+    def penalties(self, violations, k):
+        # Penalties of the k-th neighbour in the same format as compute_cost
+        hard_metrics = {name: int(violations[name][k]) for name in HARD_METRICS}
+        if sum(hard_metrics.values()) > 0:
+            return {"hard_conflicts": hard_metrics, "soft_conflicts": {}}
+        return {"hard_conflicts": hard_metrics, "soft_conflicts": {name: int(violations[name][k]) for name in SOFT_METRICS}}
+
+    # --- Elements ---
+
+    def _lesson_elements(self, lesson, dates, times, rooms):
+        return {"lesson": lesson, "teacher": self.lesson_teacher[lesson], "date": dates.astype(np.int64),
+                "time": times.astype(np.int64), "room": rooms.astype(np.int64)}
+
+    def _pair_elements(self, elems):
+        # Expand lesson elements to (lesson, group) elements, "owner" is the index of the lesson element
+        positions, owner = _expand_ranges(self.pair_ptr[elems["lesson"]], self.pair_ptr[elems["lesson"] + 1])
+        pairs = _take(elems, owner)
+        pairs["group"] = self.pair_groups[positions]
+        pairs["owner"] = owner
+        return pairs
+
+    def _changed_elements(self, state, encoded):
+        # Lessons changed by every candidate with their assignments before and after the move
+        cand = np.arange(len(encoded))
+        a_idx, b_idx = encoded[:, 0], encoded[:, 1]
+        is_swap = b_idx != UNASSIGNED
+        swap_cand = cand[is_swap]
+        a_swap, b_swap = a_idx[is_swap], b_idx[is_swap]
+
+        changed_cand = np.concatenate((cand, swap_cand))
+        lesson = np.concatenate((a_idx, b_swap))
+        new_lesson_src = np.concatenate((a_idx, a_swap))  # lesson b of a swap takes the assignment of a
+        new_dates = np.concatenate((encoded[:, 2], state.dates[new_lesson_src[len(cand):]]))
+        new_times = np.concatenate((encoded[:, 3], state.times[new_lesson_src[len(cand):]]))
+        new_rooms = np.concatenate((encoded[:, 4], state.rooms[new_lesson_src[len(cand):]]))
+        # Lesson a of a swap takes the assignment of b
+        new_dates[:len(cand)][is_swap] = state.dates[b_swap]
+        new_times[:len(cand)][is_swap] = state.times[b_swap]
+        new_rooms[:len(cand)][is_swap] = state.rooms[b_swap]
+
+        old = self._lesson_elements(lesson, state.dates[lesson], state.times[lesson], state.rooms[lesson])
+        new = self._lesson_elements(lesson, new_dates, new_times, new_rooms)
+        return changed_cand, old, new
+
+    # --- Violations of one bucket family ---
+
+    def _family_violations(self, num_candidates, bucket, num_buckets, order, contributions, base, changed_cand, changed_old, changed_new):
+        # Sort the assigned elements of the current state by bucket and order inside bucket
+        assigned = np.flatnonzero(base["date"] != UNASSIGNED)
+        base = _take(base, assigned)
+        base_keys = bucket(base)
+        sort_idx = np.lexsort(tuple(base[name] for name in reversed(order)) + (base_keys,))
+        base, base_keys = _take(base, sort_idx), base_keys[sort_idx]
+
+        # Violations of the current state
+        base_total = {name: int(values.sum()) for name, values in contributions(base_keys, base).items()}
+
+        # Buckets touched by every candidate (keyed by candidate * num_buckets + bucket)
+        old_valid = changed_old["date"] != UNASSIGNED
+        new_valid = changed_new["date"] != UNASSIGNED
+        old_keys = changed_cand * num_buckets + bucket(changed_old)
+        new_keys = changed_cand * num_buckets + bucket(changed_new)
+        touched = np.unique(np.concatenate((old_keys[old_valid], new_keys[new_valid])))
+        touched_buckets = touched % num_buckets
+
+        # Elements of touched buckets before the moves (already sorted inside each bucket)
+        positions, owner = _expand_ranges(np.searchsorted(base_keys, touched_buckets, "left"),
+                                          np.searchsorted(base_keys, touched_buckets, "right"))
+        before, before_keys = _take(base, positions), touched[owner]
+
+        # Elements of touched buckets after the moves: without changed lessons and with their new assignments
+        num_lessons = max(self.num_lessons, 1)
+        changed_lesson_keys = changed_cand * num_lessons + changed_old["lesson"]
+        kept = ~np.isin((before_keys // num_buckets) * num_lessons + before["lesson"], changed_lesson_keys)
+        after = _concat(_take(before, kept), _take(changed_new, new_valid))
+        after_keys = np.concatenate((before_keys[kept], new_keys[new_valid]))
+        sort_idx = np.lexsort(tuple(after[name] for name in reversed(order)) + (after_keys,))
+        after, after_keys = _take(after, sort_idx), after_keys[sort_idx]
+
+        # Violations of every candidate: current state minus touched buckets before plus touched buckets after
+        viol = {}
+        before_contrib = contributions(before_keys, before)
+        after_contrib = contributions(after_keys, after)
+        for name, total in base_total.items():
+            viol[name] = (total
+                          - np.bincount(before_keys // num_buckets, weights=before_contrib[name], minlength=num_candidates)
+                          + np.bincount(after_keys // num_buckets, weights=after_contrib[name], minlength=num_candidates)
+                          ).astype(np.int64)
+        return viol
@@ -0,0 +1,24 @@
+import argparse
+import json
+from schedule_optimisation.benchmark.suite import DEFAULT_CASES, run_benchmark
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m schedule_optimisation.benchmark",
+                                     description="Benchmark the schedule optimisation on synthetic timetables.")
+    parser.add_argument("--cases", nargs="+", default=list(DEFAULT_CASES), choices=list(DEFAULT_CASES))
+    parser.add_argument("--algorithms", nargs="+", default=["ts", "qits"], choices=["ts", "qits"])
+    parser.add_argument("--max-iters", type=int, default=200)
+    parser.add_argument("--tabu-tenure", type=int, default=15)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--moves", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="path of the JSON report (printed if not given)")
+    args = parser.parse_args()
+
+    report = run_benchmark(cases=args.cases, algorithms=args.algorithms, max_iters=args.max_iters, tabu_tenure=args.tabu_tenure,
+                           repeats=args.repeats, num_moves=args.moves, seed=args.seed, output_path=args.output)
+    if args.output is None:
+        print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Synthetic Timetable Generator Module
+
+The Synthetic Timetable Generator Module contains a seeded generator of realistic timetables in the
+same schema as the output of the schedule scraper. Courses of a teacher with one to three groups of a
+cohort are held weekly on a fixed weekday and time, most of them are placed without clashes and a
+configurable share is placed at random (conflicts) or left without a room (unassigned). Courses without
+a clash-free placement are dropped, so only the conflicting share clashes.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+# Lesson times of the university day
+LESSONS_TIMES = [
+    {"start_time": "09:00", "end_time": "10:30"},
+    {"start_time": "10:40", "end_time": "12:10"},
+    {"start_time": "12:20", "end_time": "13:50"},
+    {"start_time": "14:00", "end_time": "15:30"},
+    {"start_time": "15:40", "end_time": "17:10"},
+    {"start_time": "17:20", "end_time": "18:50"},
+]
+
+PLACEMENT_ATTEMPTS = 50      # number of attempts to find a clash-free weekday, time and room for a course
+COHORT_SIZE = 4              # number of groups which can share a lesson
+DROPPED_COURSES_LIMIT = 100  # number of consecutive courses without a clash-free placement before giving up
+
+def _week_dates(start_date, num_weeks):
+    # Weekday dates of every week (monday=0 ... friday=4), None for days before the start date
+    monday = start_date - timedelta(days=start_date.weekday())
+    weeks = []
+    for w in range(num_weeks):
+        days = [monday + timedelta(days=7 * w + d) for d in range(5)]
+        weeks.append([day.strftime("%Y-%m-%d") if day >= start_date else None for day in days])
+    return weeks
+
+def generate_timetable(num_lessons=500, num_teachers=40, num_groups=30, num_rooms=25, start_date="2025-02-03", num_weeks=4,
+                       lessons_times=None, conflict_ratio=0.05, unassigned_ratio=0.02, seed=0):
+    rng = random.Random(seed)
+    lessons_times = LESSONS_TIMES if lessons_times is None else lessons_times
+    if isinstance(start_date, str):
+        start_date = datetime.strptime(start_date, "%Y-%m-%d")
+    weeks = _week_dates(start_date, num_weeks)
+    all_dates = [date for week in weeks for date in week if date is not None]
+    if num_lessons > len(all_dates) * len(lessons_times) * num_rooms:
+        raise ValueError(f"Invalid timetable size: {num_lessons} lessons do not fit into {len(all_dates)} dates, "
+                         f"{len(lessons_times)} times and {num_rooms} rooms.")
+
+    teachers = [f"Lecturer {i + 1:03d}" for i in range(num_teachers)]
+    groups = [f"{4000 + i + 1}BDA" for i in range(num_groups)]
+    rooms = [f"{1 + i // 20}{i % 20 + 1:02d}" for i in range(num_rooms)]
+    teacher_weights = [1 / (i + 1) ** 0.5 for i in range(num_teachers)]  # some teachers have more courses
+
+    # Courses are placed on a weekday and time of every week until the number of lessons is reached
+    schedule_data = []
+    busy = set()  # (date, time_idx, kind, name) of placed lessons
+    course = 0
+    dropped = 0  # consecutive courses without a clash-free placement
+    while len(schedule_data) < num_lessons:
+        course += 1
+        teacher = rng.choices(teachers, weights=teacher_weights)[0]
+        cohort = rng.randrange(0, num_groups, COHORT_SIZE)
+        course_groups = rng.sample(groups[cohort:cohort + COHORT_SIZE], min(rng.randint(1, 3), len(groups[cohort:cohort + COHORT_SIZE])))
+        first_week = rng.randrange(num_weeks)
+        course_weeks = weeks[first_week:first_week + rng.randint(1, num_weeks)]
+
+        # Clash-free weekday, time and room for all weeks of the course (or any for the conflicting share)
+        clash_free = rng.random() >= conflict_ratio
+        for _ in range(PLACEMENT_ATTEMPTS):
+            weekday, time_idx, room = rng.randrange(5), rng.randrange(len(lessons_times)), rng.choice(rooms)
+            dates = [week[weekday] for week in course_weeks if week[weekday] is not None]
+            keys = [(date, time_idx, kind, name) for date in dates
+                    for kind, name in [("teacher", teacher), ("room", room)] + [("group", grp) for grp in course_groups]]
+            if not clash_free or not any(key in busy for key in keys):
+                break
+        else:
+            # Drop the course instead of keeping a clashing placement (conflicts come from conflict_ratio only)
+            dropped += 1
+            if dropped >= DROPPED_COURSES_LIMIT:
+                raise ValueError(f"Invalid timetable size: no clash-free placement found after {len(schedule_data)} of "
+                                 f"{num_lessons} lessons, add dates, times or rooms or lower the number of lessons.")
+            continue
+        dropped = 0
+        busy.update(keys)
+
+        subject = f"Subject {course:04d}"
+        for date in dates[:num_lessons - len(schedule_data)]:
+            lesson_time = lessons_times[time_idx]
+            schedule_data.append(dict(
+                date=date, time={"start": lesson_time["start_time"], "end": lesson_time["end_time"]},
+                lecturer=teacher, subject=subject, type="Lesson",
+                room=room if rng.random() >= unassigned_ratio else None, groups=list(course_groups), comment=""
+            ))
+
+    # Same order as the scraper output
+    schedule_data.sort(key=lambda x: (x["date"], x["time"]["start"]))
+    return schedule_data, lessons_times, all_dates[0], all_dates[-1]
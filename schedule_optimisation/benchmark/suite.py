@@ -0,0 +1,172 @@
+"""
+Benchmark Suite Module
+
+The Benchmark Suite Module contains the performance benchmarks of the schedule optimisation. Each case
+generates a synthetic timetable and times data preparation, full cost computation, neighbour
+generation and evaluation, and complete optimisation runs. Every case runs in its own process, so the
+reported peak RSS belongs to the case, and the results are returned (and saved) as JSON so the
+performance of different versions can be compared.
+"""
+
+import json
+import os
+import platform
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import numpy as np
+from schedule_optimisation.benchmark.generator import generate_timetable
+from schedule_optimisation.batch import BatchEvaluator
+from schedule_optimisation.cost import compute_cost
+from schedule_optimisation.data_preparation import prepare_input_data
+from schedule_optimisation.evaluator import CostEvaluator
+from schedule_optimisation.occupancy import SlotOccupancy
+from schedule_optimisation.optimizer import optimise_schedule
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# Default benchmark cases: name and options of the timetable generator
+DEFAULT_CASES = {
+    "small": dict(num_lessons=200, num_teachers=20, num_groups=16, num_rooms=12, num_weeks=2),
+    "medium": dict(num_lessons=1000, num_teachers=60, num_groups=40, num_rooms=30, num_weeks=4),
+    "large": dict(num_lessons=3000, num_teachers=150, num_groups=100, num_rooms=60, num_weeks=8),
+}
+
+def peak_rss_mb():
+    # Peak resident set size of the current process in MiB (None where it is not available)
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10  # bytes on macOS, KiB on Linux
+
+def _timed(func, repeats):
+    # Best wall-clock time of the repeats and the result of the last call
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+class _IterationCounter:
+    # Minimal trace of the optimisation runs: counts the completed iterations (runs may stop before max_iters)
+    def __init__(self):
+        self.iterations = 0
+
+    def iteration(self, iteration, current_cost, best_cost, move_type, improved):
+        self.iterations += 1
+
+    def rejected(self, iteration, current_cost, best_cost, move_type):
+        pass
+
+def _random_moves(assignments, problem, occupancy, num_moves, rng, room_strategy="first"):
+    # Same neighbourhood as the algorithms: half moves of one lesson to a random slot, half swaps
+    moves = []
+    while len(moves) < num_moves:
+        if rng.random() < 0.5:
+            lesson_idx = rng.randrange(problem.num_lessons)
+            old_assign = assignments[lesson_idx]
+            d_new, t_new = problem.time_slots[rng.randrange(problem.total_slots)]
+            new_room_idx = occupancy.choose_room(d_new, t_new, strategy=room_strategy, moving_assign=old_assign)
+            if new_room_idx is not None:
+                moves.append(("move", lesson_idx, old_assign, (d_new, t_new, new_room_idx)))
+        else:
+            a, b = rng.randrange(problem.num_lessons), rng.randrange(problem.num_lessons)
+            if a != b:
+                moves.append(("swap", a, b, assignments[a], assignments[b]))
+    return moves
+
+def benchmark_case(name, generator_options, algorithms=("ts", "qits"), max_iters=200, tabu_tenure=15, repeats=3,
+                   num_moves=1000, seed=0):
+    schedule_data, lessons_times, start_date, end_date = generate_timetable(seed=seed, **generator_options)
+    result = {"name": name, "generator": dict(generator_options, seed=seed), "entries": len(schedule_data)}
+
+    # Data preparation
+    prepare_time, (problem, _, assignments) = _timed(
+        lambda: prepare_input_data(schedule_data, lessons_times, start_date, end_date, as_state=True), repeats
+    )
+    result["problem"] = {"lessons": problem.num_lessons, "teachers": problem.num_teachers, "groups": problem.num_groups,
+                         "rooms": problem.num_rooms, "slots": problem.total_slots,
+                         "conflict_graph_edges": problem.conflict_graph.num_edges}
+    result["prepare_input_data"] = {"seconds": prepare_time}
+
+    # Full cost computation
+    cost_time, (initial_cost, _) = _timed(lambda: compute_cost(assignments, problem), repeats)
+    result["compute_cost"] = {"seconds": cost_time, "evals_per_second": 1 / cost_time, "cost": initial_cost}
+
+    # Neighbour generation and evaluation (incremental and batch)
+    rng = random.Random(seed)
+    occupancy = SlotOccupancy(assignments, problem)
+    generate_time, moves = _timed(lambda: _random_moves(assignments, problem, occupancy, num_moves, rng), repeats)
+    evaluator = CostEvaluator(assignments, problem)
+    evaluate_time, _ = _timed(lambda: [evaluator.evaluate(move) for move in moves], repeats)
+    batch_evaluator = BatchEvaluator(problem)
+    batch_time, _ = _timed(lambda: batch_evaluator.evaluate(assignments, moves), repeats)
+    result["neighbours"] = {
+        "moves": num_moves,
+        "generate_seconds": generate_time,
+        "moves_per_second": num_moves / generate_time,
+        "incremental_evals_per_second": num_moves / evaluate_time,
+        "batch_evals_per_second": num_moves / batch_time,
+    }
+
+    # Complete optimisation runs (seeded, the speed is measured over the iterations actually run)
+    result["optimise_schedule"] = {}
+    for algorithm in algorithms:
+        random.seed(seed)
+        np.random.seed(seed)
+        counter = _IterationCounter()
+        start = time.perf_counter()
+        _, metrics = optimise_schedule(schedule_data, lessons_times, start_date, end_date, algorithm=algorithm,
+                                       max_iters=max_iters, tabu_tenure=tabu_tenure, plot=False, trace=counter)
+        run_time = time.perf_counter() - start
+        result["optimise_schedule"][algorithm] = {
+            "max_iters": max_iters,
+            "iterations": counter.iterations,
+            "seconds": run_time,
+            "iters_per_second": counter.iterations / run_time,
+            "initial_cost": metrics["initial_cost"],
+            "final_cost": metrics["best_cost"],
+        }
+
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+def run_benchmark(cases=None, algorithms=("ts", "qits"), max_iters=200, tabu_tenure=15, repeats=3, num_moves=1000, seed=0,
+                  output_path=None, isolate=True):
+    # Cases are names of DEFAULT_CASES or a {name: generator options} dict
+    if cases is None:
+        cases = DEFAULT_CASES
+    elif not isinstance(cases, dict):
+        unknown = [name for name in cases if name not in DEFAULT_CASES]
+        if unknown:
+            raise ValueError(f"Invalid benchmark cases: {', '.join(unknown)}. Available cases: {', '.join(DEFAULT_CASES)}.")
+        cases = {name: DEFAULT_CASES[name] for name in cases}
+
+    results = []
+    for name, generator_options in cases.items():
+        args = (name, generator_options, tuple(algorithms), max_iters, tabu_tenure, repeats, num_moves, seed)
+        if isolate:
+            # Fresh process for every case (peak RSS of the case only)
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                results.append(pool.submit(benchmark_case, *args).result())
+        else:
+            results.append(benchmark_case(*args))
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "cases": results,
+    }
+    if output_path is not None:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
@@ -0,0 +1,90 @@
+"""
+Search Budget Module
+
+The Search Budget Module contains the anytime controls of a running search. A search budget stops the
+algorithms after a wall-clock time limit or at a deadline, and the best-so-far slot always holds the
+best assignments found by the running search, so a supervisor (another thread or a signal handler)
+can take the current best result at any moment and ask the search to stop after the current iteration.
+A time limit of a run with several phases or processes is turned into one absolute deadline shared by all
+of them, so the whole run stays within the limit.
+"""
+
+import threading
+import time
+from datetime import datetime
+
+def absolute_deadline(time_limit=None, deadline=None):
+    # POSIX timestamp of the earlier of a time limit in seconds from now and a deadline (datetime or POSIX timestamp),
+    # None if neither is given
+    if time_limit is not None and time_limit < 0:
+        raise ValueError(f"Invalid time limit: {time_limit}. Expected a non-negative number of seconds.")
+    if isinstance(deadline, datetime):
+        deadline = deadline.timestamp()
+    if time_limit is None:
+        return deadline
+    end = time.time() + time_limit
+    return end if deadline is None else min(deadline, end)
+
+class SearchBudget:
+    def __init__(self, time_limit=None, deadline=None):
+        # Time limit in seconds from now and/or deadline (datetime or POSIX timestamp), the earlier one wins
+        self.start = time.monotonic()
+        self.end = None
+        if time_limit is not None:
+            if time_limit < 0:
+                raise ValueError(f"Invalid time limit: {time_limit}. Expected a non-negative number of seconds.")
+            self.end = self.start + time_limit
+        if deadline is not None:
+            if isinstance(deadline, datetime):
+                deadline = deadline.timestamp()
+            deadline_end = self.start + (deadline - time.time())  # wall-clock deadline on the monotonic clock
+            self.end = deadline_end if self.end is None else min(self.end, deadline_end)
+
+    def expired(self):
+        return self.end is not None and time.monotonic() >= self.end
+
+    def elapsed(self):
+        return time.monotonic() - self.start
+
+    def progress(self, iteration, max_iters):
+        # Fraction of the search done: iterations or elapsed time of the budget, whichever is further
+        progress = iteration / max_iters
+        if self.end is not None:
+            total = self.end - self.start
+            progress = max(progress, min(1.0, self.elapsed() / total) if total > 0 else 1.0)
+        return progress
+
+
+class BestSoFar:
+    def __init__(self):
+        # Best assignments of the running search, published by the algorithm under a lock
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._assignments = None  # preallocated AssignmentState buffer (allocated on first publish)
+        self.cost = None
+        self.penalties = None
+        self.iteration = None
+        self.updates = 0
+
+    def publish(self, assignments, cost, penalties, iteration):
+        with self._lock:
+            self._assignments = assignments.snapshot(self._assignments)
+            self.cost = cost
+            self.penalties = penalties
+            self.iteration = iteration
+            self.updates += 1
+
+    def get(self):
+        # Copy of the best assignments with cost and penalties (None before the search publishes a result)
+        with self._lock:
+            if self._assignments is None:
+                return None
+            return self._assignments.copy(), self.cost, self.penalties
+
+    def request_stop(self):
+        # Ask the search to stop after the current iteration (safe to call from other threads and signal handlers)
+        self._stop.set()
+
+    @property
+    def stop_requested(self):
+        return self._stop.is_set()
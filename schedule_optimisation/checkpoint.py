@@ -0,0 +1,146 @@
+"""
+Checkpoint Module
+
+The Checkpoint Module contains periodic checkpoints of a running search. A checkpoint holds the current
+and best assignments, the tabu memory, the solution tabu, the order of the candidate sets, the states of both random
+generators, the counters and the cost history in one compressed NumPy archive. Archives are written by a background thread to a temporary
+file which then replaces the checkpoint, so a crash never leaves a broken checkpoint and the search is
+not stalled by the compression and disk writes. A search restored from a checkpoint continues exactly
+where it stopped.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+import numpy as np
+from schedule_optimisation.state import AssignmentState
+
+CHECKPOINT_VERSION = 4
+
+def save_checkpoint(path, arrays, meta):
+    # Atomic write: the archive is written next to the checkpoint and then replaces it
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez_compressed(f, meta=np.array(json.dumps(meta)), **arrays)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def load_checkpoint(path):
+    with np.load(path, allow_pickle=False) as archive:
+        arrays = {name: archive[name] for name in archive.files if name != "meta"}
+        meta = json.loads(str(archive["meta"]))
+    if meta.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"Invalid checkpoint version: {meta.get('version')}, expected {CHECKPOINT_VERSION}.")
+    return arrays, meta
+
+def capture_search_state(algorithm, next_iteration, current_assignments, best_assignments, best_cost, best_penalties,
+                         no_improve_counter, tabu_memory, cost_history, evaluator=None, solution_tabu=None):
+    # Copies of everything needed to continue the search (taken between two iterations)
+    py_version, py_state, py_gauss = random.getstate()
+    np_name, np_keys, np_pos, np_has_gauss, np_gauss = np.random.get_state()
+    arrays = {
+        "current": current_assignments.data.copy(),
+        "best": best_assignments.data.copy(),
+        "history": np.asarray(cost_history.points, dtype=np.float64),
+        "py_random": np.array(py_state, dtype=np.uint64),
+        "np_random": np.array(np_keys, dtype=np.uint32),
+    }
+    arrays.update({f"tabu_{name}": array.copy() for name, array in tabu_memory.state().items()})
+    if solution_tabu is not None:
+        arrays.update({f"solution_tabu_{name}": array.copy() for name, array in solution_tabu.state().items()})
+    # Sampling from the candidate sets depends on the order of their lessons, which depends on the search path
+    if evaluator is not None and evaluator.conflicted is not None:
+        arrays["candidates_conflicted"] = np.array(evaluator.conflicted.items, dtype=np.int64)
+        arrays["candidates_penalised"] = np.array(evaluator.penalised.items, dtype=np.int64)
+    meta = {
+        "version": CHECKPOINT_VERSION,
+        "algorithm": algorithm,
+        "num_lessons": len(current_assignments),
+        "next_iteration": next_iteration,
+        "no_improve_counter": no_improve_counter,
+        "best_cost": best_cost,
+        "best_penalties": best_penalties,
+        "tabu_attribute": tabu_memory.attribute,
+        "solution_tabu": solution_tabu is not None,
+        "history_stride": cost_history.stride,
+        "history_count": cost_history.count,
+        "history_integer": all(isinstance(cost, (int, np.integer)) for cost in cost_history.points),
+        "py_random": [py_version, py_gauss],
+        "np_random": [np_name, int(np_pos), int(np_has_gauss), float(np_gauss)],
+    }
+    return arrays, meta
+
+def restore_search_state(checkpoint, algorithm, tabu_memory, cost_history, solution_tabu=None):
+    # Restore tabu memory (and solution tabu), cost history and random generators in place, return assignments and
+    # counters
+    arrays, meta = checkpoint
+    if meta["algorithm"] != algorithm:
+        raise ValueError(f"Invalid checkpoint: saved by '{meta['algorithm']}', cannot resume '{algorithm}'.")
+    if meta["tabu_attribute"] != tabu_memory.attribute:
+        raise ValueError(f"Invalid checkpoint: tabu attribute '{meta['tabu_attribute']}', expected '{tabu_memory.attribute}'.")
+
+    tabu_memory.load_state({name[len("tabu_"):]: array for name, array in arrays.items() if name.startswith("tabu_")})
+    if meta["solution_tabu"] != (solution_tabu is not None):
+        raise ValueError(f"Invalid checkpoint: solution tabu {'enabled' if meta['solution_tabu'] else 'disabled'}, "
+                         f"expected {'enabled' if solution_tabu is not None else 'disabled'}.")
+    if solution_tabu is not None:
+        solution_tabu.load_state({name: arrays[f"solution_tabu_{name}"] for name in ("keys", "expiry")})
+    points = arrays["history"].tolist()
+    cost_history.points = [int(cost) for cost in points] if meta["history_integer"] else points
+    cost_history.stride = meta["history_stride"]
+    cost_history.count = meta["history_count"]
+
+    py_version, py_gauss = meta["py_random"]
+    random.setstate((py_version, tuple(int(x) for x in arrays["py_random"]), py_gauss))
+    np_name, np_pos, np_has_gauss, np_gauss = meta["np_random"]
+    np.random.set_state((np_name, arrays["np_random"], np_pos, np_has_gauss, np_gauss))
+
+    return (AssignmentState(arrays["current"].astype(np.int32)), AssignmentState(arrays["best"].astype(np.int32)),
+            meta["best_cost"], meta["best_penalties"], meta["next_iteration"], meta["no_improve_counter"])
+
+def restore_candidate_order(checkpoint, evaluator):
+    # Replace the order of the rebuilt candidate sets with the saved order (if the checkpoint has candidate sets)
+    arrays, _ = checkpoint
+    for name, candidates in (("conflicted", evaluator.conflicted), ("penalised", evaluator.penalised)):
+        if candidates is not None and f"candidates_{name}" in arrays:
+            candidates.restore(arrays[f"candidates_{name}"].tolist())
+
+
+class Checkpointer:
+    def __init__(self, path, interval=100, interval_seconds=None):
+        # Checkpoint every `interval` iterations and/or every `interval_seconds` seconds
+        self.path = path
+        self.interval = interval
+        self.interval_seconds = interval_seconds
+        self.saved = 0    # number of written checkpoints
+        self.skipped = 0  # checkpoints skipped because the previous one was still being written
+        self._last_time = time.monotonic()
+        self._thread = None
+
+    def due(self, iteration):
+        # Iteration is the number of completed iterations
+        if self.interval is not None and iteration % self.interval == 0:
+            return True
+        return self.interval_seconds is not None and time.monotonic() - self._last_time >= self.interval_seconds
+
+    def save(self, state, wait=False):
+        # Write the captured state in the background (skipped if the previous write is not finished yet)
+        if self._thread is not None and self._thread.is_alive():
+            if not wait:
+                self.skipped += 1
+                return False
+            self._thread.join()
+        self._last_time = time.monotonic()
+        self._thread = threading.Thread(target=save_checkpoint, args=(self.path, *state), name="checkpoint-writer", daemon=True)
+        self._thread.start()
+        self.saved += 1
+        if wait:
+            self._thread.join()
+        return True
+
+    def close(self):
+        if self._thread is not None:
+            self._thread.join()
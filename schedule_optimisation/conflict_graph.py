@@ -0,0 +1,110 @@
+"""
+Conflict Graph Module
+
+The Conflict Graph Module contains a sparse lesson-lesson conflict graph. Two lessons are connected when
+they share a teacher or any group, so they can only clash when they are placed in the same time slot.
+The graph depends only on the lessons, so it is built once at preparation time and reused by the hard
+constraints, the incremental evaluator and the move generators.
+"""
+
+import numpy as np
+from schedule_optimisation.state import AssignmentState, UNASSIGNED
+from schedule_optimisation.profiling import profiled
+
+# Edge kinds (bit flags, an edge can have both)
+TEACHER_EDGE = 1
+GROUP_EDGE = 2
+ANY_EDGE = TEACHER_EDGE | GROUP_EDGE
+
+def _clique_pairs(ptr, members):
+    # All (a, b) pairs with a < b inside every clique given in CSR form (members of a clique are sorted)
+    sizes = np.diff(ptr)
+    position = np.arange(len(members))
+    clique_end = np.repeat(ptr[1:], sizes)
+    counts = clique_end - position - 1
+    owner = np.repeat(position, counts)
+    partner = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + owner + 1
+    return members[owner].astype(np.int64), members[partner].astype(np.int64)
+
+def slot_ids(assignments, num_times):
+    # Slot index of every lesson (UNASSIGNED for lessons without assignment)
+    if isinstance(assignments, AssignmentState):
+        return np.where(assignments.dates == UNASSIGNED, UNASSIGNED,
+                        assignments.dates.astype(np.int64) * num_times + assignments.times)
+    return np.array([assign[0] * num_times + assign[1] if assign is not None else UNASSIGNED for assign in assignments],
+                    dtype=np.int64)
+
+
+class ConflictGraph:
+    def __init__(self, problem):
+        self.num_lessons = num_lessons = problem.num_lessons
+        self.num_times = problem.num_times
+
+        # Lessons of one teacher and lessons of one group are cliques of the graph
+        teacher_a, teacher_b = _clique_pairs(problem.teacher_lessons_ptr, problem.teacher_lessons)
+        group_a, group_b = _clique_pairs(problem.group_lessons_ptr, problem.group_lessons)
+        keys = np.concatenate((teacher_a * num_lessons + teacher_b, group_a * num_lessons + group_b))
+        kinds = np.concatenate((np.full(len(teacher_a), TEACHER_EDGE, dtype=np.uint8),
+                                np.full(len(group_a), GROUP_EDGE, dtype=np.uint8)))
+
+        # Merge duplicated pairs (shared teacher and groups) into one edge with combined kinds
+        order = np.argsort(keys, kind="stable")
+        keys, kinds = keys[order], kinds[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.zeros(0, dtype=np.int64)
+        self.edge_keys = keys[starts]  # sorted a * num_lessons + b keys of edges with a < b
+        self.edge_kinds = np.bitwise_or.reduceat(kinds, starts) if len(keys) else kinds
+
+        # Symmetric CSR adjacency: neighbours of every lesson sorted by lesson index with edge kinds
+        a, b = np.divmod(self.edge_keys, num_lessons)
+        rows, cols = np.concatenate((a, b)), np.concatenate((b, a))
+        order = np.lexsort((cols, rows))
+        self.neighbours = cols[order].astype(np.int32)
+        self.kinds = np.concatenate((self.edge_kinds, self.edge_kinds))[order]
+        self.ptr = np.searchsorted(rows[order], np.arange(num_lessons + 1))
+
+        # Number of repeated groups inside every lesson (they clash with the lesson itself)
+        self.group_repeats = np.array([len(grp_list) - len(set(grp_list)) for grp_list in problem.groups_of], dtype=np.int64)
+
+    @property
+    def num_edges(self):
+        return len(self.edge_keys)
+
+    def degree(self, lesson_idx):
+        return int(self.ptr[lesson_idx + 1] - self.ptr[lesson_idx])
+
+    def neighbours_of(self, lesson_idx, kind=ANY_EDGE):
+        row = slice(self.ptr[lesson_idx], self.ptr[lesson_idx + 1])
+        if kind == ANY_EDGE:
+            return self.neighbours[row]
+        return self.neighbours[row][(self.kinds[row] & kind) != 0]
+
+    def adjacent_in(self, lesson_idx, lessons, kind=ANY_EDGE):
+        # Lessons of the given collection (e.g. the lessons of one slot) connected to the lesson
+        lessons = np.asarray(lessons, dtype=np.int64)
+        row = slice(self.ptr[lesson_idx], self.ptr[lesson_idx + 1])
+        neighbours, kinds = self.neighbours[row], self.kinds[row]
+        if not len(neighbours) or not len(lessons):
+            return lessons[:0]
+        pos = np.minimum(np.searchsorted(neighbours, lessons), len(neighbours) - 1)
+        return lessons[(neighbours[pos] == lessons) & ((kinds[pos] & kind) != 0)]
+
+    @profiled("same_slot_edges")
+    def same_slot_edges(self, assignments):
+        # Edges between lessons in the same slot as (a, b, kinds) with a < b and the first lesson of the slot of every lesson
+        slots = slot_ids(assignments, self.num_times)
+        assigned = np.flatnonzero(slots != UNASSIGNED)
+        order = assigned[np.argsort(slots[assigned], kind="stable")]  # lessons sorted by slot, lesson order inside slot
+        sorted_slots = slots[order]
+        starts = np.r_[True, sorted_slots[1:] != sorted_slots[:-1]] if len(order) else np.zeros(0, dtype=bool)
+        run_start = np.flatnonzero(starts)
+        run_index = np.cumsum(starts) - 1
+        first = np.full(self.num_lessons, UNASSIGNED, dtype=np.int64)
+        first[order] = order[run_start[run_index]]
+
+        # Candidate pairs inside every slot looked up among the edges
+        run_ptr = np.r_[run_start, len(order)]
+        a, b = _clique_pairs(run_ptr, order)
+        keys = a * self.num_lessons + b
+        pos = np.minimum(np.searchsorted(self.edge_keys, keys), max(len(self.edge_keys) - 1, 0))
+        hit = self.edge_keys[pos] == keys if len(self.edge_keys) else np.zeros(len(keys), dtype=bool)
+        return a[hit], b[hit], self.edge_kinds[pos[hit]], first
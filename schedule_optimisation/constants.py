@@ -1,2 +1,11 @@
 NEIGHBOUR_CHECKS_LIMIT = 30        # number of neighbours checked before selecting the best one
-TABU_LIST_CLEAR_THRESHOLD = 300    # number of iterations before clearing the tabu list
\ No newline at end of file
+TABU_TABLE_MIN_SIZE = 1024        # min number of entries in the hashed tabu tables
+TABU_TABLE_WAYS = 8                # entries per bucket of the hashed tabu tables (a full bucket doubles the table)
+PARALLEL_NEIGHBOURS_MIN_LESSONS = 40000  # min number of lessons to evaluate neighbours in worker processes (serial was faster up to 20000)
+TRACE_QUEUE_SIZE = 10000           # max number of trace records waiting for the writer thread
+COST_HISTORY_MAX_POINTS = 10000    # max number of costs kept in the cost history (evenly spaced)
+DECOMPOSITION_POLISH_ITERS = 200   # iterations of the global polish after stitching the time windows
+TEMPLATE_MIN_WEEKS = 2             # min number of weeks with the same lesson to fold it into the weekly template
+REPAIR_MAX_ITERS = 10000           # max iterations of the min-conflicts repair before the search
+REPAIR_TABU_TENURE = 10            # iterations a repaired lesson may not return to the slot it left
+ROOM_ASSIGNMENT_MAX_PASSES = 10    # max passes of the room assignment post-pass over all slots
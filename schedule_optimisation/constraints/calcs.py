@@ -1,12 +1,16 @@
 from schedule_optimisation.constraints.soft import teacher_movement, teacher_room_reuse, group_splits, teacher_overload
 from schedule_optimisation.constraints.hard import teacher_conflicts, room_conflicts, group_conflicts
 from schedule_optimisation.weights import (TEACHER_MOVE_BETWEEN_CONSECUTIVE, TEACHER_SAME_ROOM_FOR_DIFF, GROUP_SPLIT_DOUBLE, TEACHER_DAILY_OVERLOAD)
+from schedule_optimisation.profiling import profiled
+
+def calculate_hard_constraints_violations(assignments, problem):
+    # Edges of the conflict graph inside the time slots (shared by teacher and group conflicts)
+    slot_edges = problem.conflict_graph.same_slot_edges(assignments)
 
-def calculate_hard_constraints_violations(assignments, lessons, rooms):
     # Calculate the violations for each type of hard constraint
-    teacher_conflicts_viol = teacher_conflicts(assignments, lessons)
-    room_conflicts_viol = room_conflicts(assignments, rooms)
-    group_conflicts_viol = group_conflicts(assignments, lessons)
+    teacher_conflicts_viol = teacher_conflicts(assignments, problem, slot_edges)
+    room_conflicts_viol = room_conflicts(assignments, problem)
+    group_conflicts_viol = group_conflicts(assignments, problem, slot_edges)
 
     # Sum up all hard constraint violations
     hard_violations = (teacher_conflicts_viol + room_conflicts_viol + group_conflicts_viol)
@@ -20,11 +24,13 @@ def calculate_hard_constraints_violations(assignments, lessons, rooms):
     
     return hard_violations, hard_metrics
 
-def build_schedules(assignments, lessons, teachers, groups):
-    # Initialise empty schedule structures
-    teacher_schedule = {t: {} for t in teachers}  # {teacher: {date: [time_indices]}}
-    teacher_rooms_used = {t: [] for t in teachers}  # {teacher: [(date_idx, time_idx, room_idx)]}
-    group_schedule = {g: {} for g in groups}  # {group: {date: [time_indices]}}
+@profiled("build_schedules")
+def build_schedules(assignments, problem):
+    # Initialise empty schedule structures (keyed by teacher and group ids)
+    teacher_schedule = {t: {} for t in range(problem.num_teachers)}  # {teacher: {date: [time_indices]}}
+    teacher_rooms_used = {t: [] for t in range(problem.num_teachers)}  # {teacher: [(date_idx, time_idx, room_idx)]}
+    group_schedule = {g: {} for g in range(problem.num_groups)}  # {group: {date: [time_indices]}}
+    teacher_of, groups_of = problem.teacher_of, problem.groups_of
     
     # Process each lesson assignment to build the schedules
     for i, assign in enumerate(assignments):
@@ -33,8 +39,8 @@ def build_schedules(assignments, lessons, teachers, groups):
         
         # Extract assignment details
         date_idx, time_idx, room_idx = assign
-        teacher = lessons[i]["lecturer"]
-        grp_list = lessons[i].get("groups", [])
+        teacher = teacher_of[i]
+        grp_list = groups_of[i]
         
         # Update teacher's schedule and room usage
         teacher_schedule[teacher].setdefault(date_idx, []).append(time_idx)  # add time slot to teacher's schedule for this date
@@ -42,30 +48,26 @@ def build_schedules(assignments, lessons, teachers, groups):
         
         # Update schedules for each group in the lesson
         for grp in grp_list:
-            if grp not in group_schedule:
-                group_schedule[grp] = {}
             group_schedule[grp].setdefault(date_idx, []).append(time_idx)  # add time slot to group's schedule for this date
     
     # Time slots sorting within each day for all schedules
-    for t in teachers:
+    for t in teacher_schedule:
         for d in teacher_schedule[t]:
             teacher_schedule[t][d].sort()  # sort time slots within each day for teacher's schedule
-    for g in groups:
+    for g in group_schedule:
         for d in group_schedule[g]:
             group_schedule[g][d].sort()  # sort time slots within each day for group's schedule
     
     return teacher_schedule, teacher_rooms_used, group_schedule
 
-def calculate_soft_constraints_violations(assignments, lessons, teachers, groups, rooms):
+def calculate_soft_constraints_violations(assignments, problem):
     # Build structured schedules for easier analysis
-    teacher_schedule, teacher_rooms_used, group_schedule = build_schedules(
-        assignments, lessons, teachers, groups
-    )
+    teacher_schedule, teacher_rooms_used, group_schedule = build_schedules(assignments, problem)
         
     # Calculate violations for each type of soft constraint
     teacher_move_viol = teacher_movement(teacher_rooms_used)
     teacher_same_room_viol = teacher_room_reuse(teacher_rooms_used)
-    group_split_viol = group_splits(assignments, lessons, teachers)
+    group_split_viol = group_splits(assignments, problem)
     overload_viol = teacher_overload(teacher_schedule)
 
     # Calculate total weighted cost of violations
@@ -1,26 +1,20 @@
-def teacher_conflicts(assignments, lessons):
-    # Track teacher assignments for each time slot
-    slot_teacher = {}
-    violations = 0
-    
-    # Check each lesson assignment
-    for i, assign in enumerate(assignments):
-        if assign is None:
-            continue
-        date_idx, time_idx, _ = assign
-        teacher = lessons[i]["lecturer"]
-        slot = (date_idx, time_idx)
-        
-        # Check if teacher is already assigned to this time slot
-        if slot in slot_teacher:
-            if teacher == slot_teacher[slot]:
-                violations += 1
-        else:
-            slot_teacher[slot] = teacher
+import numpy as np
+from schedule_optimisation.conflict_graph import TEACHER_EDGE, GROUP_EDGE
+from schedule_optimisation.state import UNASSIGNED
+from schedule_optimisation.profiling import profiled
 
-    return violations
+@profiled("teacher_conflicts")
+def teacher_conflicts(assignments, problem, slot_edges=None):
+    # Teacher edges of the conflict graph between lessons in the same time slot
+    if slot_edges is None:
+        slot_edges = problem.conflict_graph.same_slot_edges(assignments)
+    a, _, kinds, first = slot_edges
 
-def room_conflicts(assignments, rooms):
+    # Lessons of the slot clash with the teacher of the first lesson assigned to the slot
+    return int(np.count_nonzero((first[a] == a) & ((kinds & TEACHER_EDGE) != 0)))
+
+@profiled("room_conflicts")
+def room_conflicts(assignments, problem):
     # Track room assignments for each time slot
     slot_room = {}
     violations = 0
@@ -29,8 +23,8 @@ def room_conflicts(assignments, rooms):
     for i, assign in enumerate(assignments):
         if assign is None:
             continue
-        date_idx, time_idx, room_idx = assign
-        room = rooms[room_idx] if room_idx is not None else None
+        # Room indices identify rooms (room names are unique)
+        date_idx, time_idx, room = assign
         slot = (date_idx, time_idx)
         
         # Check if room is already assigned to this time slot
@@ -43,29 +37,25 @@ def room_conflicts(assignments, rooms):
 
     return violations
 
-def group_conflicts(assignments, lessons):
-    # Track group assignments for each time slot
-    slot_groups = {}
-    violations = 0
-    
-    # Check each lesson assignment
-    for i, assign in enumerate(assignments):
-        if assign is None:
-            continue
-        date_idx, time_idx, _ = assign
-        grp_list = lessons[i].get("groups", [])
-        slot = (date_idx, time_idx)
-        
-        # Initialise group set for this time slot if not exists
-        if slot not in slot_groups:
-            slot_groups[slot] = set()
-            
-        # Check each group in the lesson
-        for grp in grp_list:
-            # Check if group is already assigned to this time slot
-            if grp in slot_groups[slot]:
-                violations += 1
-            else:
-                slot_groups[slot].add(grp)
+@profiled("group_conflicts")
+def group_conflicts(assignments, problem, slot_edges=None):
+    # Group edges of the conflict graph between lessons in the same time slot
+    graph = problem.conflict_graph
+    if slot_edges is None:
+        slot_edges = graph.same_slot_edges(assignments)
+    a, b, kinds, first = slot_edges
+    group_edges = (kinds & GROUP_EDGE) != 0
+    groups_of = problem.groups_of
+
+    # Repeated groups inside a lesson are always violations
+    violations = int(graph.group_repeats[first != UNASSIGNED].sum())
+
+    # Only lessons sharing a group with an earlier lesson of the same slot have further violations
+    earlier = {}
+    for prev, lesson in zip(a[group_edges].tolist(), b[group_edges].tolist()):
+        earlier.setdefault(lesson, []).append(prev)
+    for lesson, prev_lessons in earlier.items():
+        seen = {grp for prev in prev_lessons for grp in groups_of[prev]}
+        violations += len(set(groups_of[lesson]) & seen)
 
     return violations
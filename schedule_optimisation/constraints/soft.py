@@ -1,3 +1,6 @@
+from schedule_optimisation.profiling import profiled
+
+@profiled("teacher_movement")
 def teacher_movement(teacher_rooms_used):
     teacher_move_viol = 0
     
@@ -24,6 +27,7 @@ def teacher_movement(teacher_rooms_used):
     
     return teacher_move_viol
 
+@profiled("teacher_room_reuse")
 def teacher_room_reuse(teacher_rooms_used):
     teacher_same_room_viol = 0
     
@@ -44,21 +48,22 @@ def teacher_room_reuse(teacher_rooms_used):
     
     return teacher_same_room_viol
 
-def group_splits(assignments, lessons, teachers):
+@profiled("group_splits")
+def group_splits(assignments, problem):
     group_split_viol = 0
+    groups_of = problem.groups_of
     
     # Process each teacher's schedule
-    for t in teachers:
-        # Group lessons by student group
+    for t in range(problem.num_teachers):
+        # Group lessons of the teacher (precomputed index) by student group
         grp_lessons = {}
-        for i, assign in enumerate(assignments):
+        for i in problem.lessons_of_teacher(t).tolist():
+            assign = assignments[i]
             if assign is None: 
                 continue
-            if lessons[i]["lecturer"] != t:
-                continue
             date_idx, time_idx, _ = assign
             # Track lesson times for each group
-            for grp in lessons[i].get("groups", []):
+            for grp in groups_of[i]:
                 grp_lessons.setdefault(grp, []).append((date_idx, time_idx))
         
         # Check for split classes within each group
@@ -83,6 +88,7 @@ def group_splits(assignments, lessons, teachers):
     
     return group_split_viol
 
+@profiled("teacher_overload")
 def teacher_overload(teacher_schedule):
     overload_viol = 0
     
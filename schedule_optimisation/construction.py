@@ -0,0 +1,78 @@
+"""
+Constructive Initialisation Module
+
+The Constructive Initialisation Module contains a greedy initialiser which places lessons without a
+valid assignment before the search begins. Lessons are placed most-constrained first (lessons sharing
+their teacher or groups with the most other lessons go first) into the least loaded time slot where
+their teacher, groups and a room are free. Optionally lessons in hard conflicts are lifted out of
+their slots and placed again the same way, so the search starts from a (nearly) conflict-free schedule.
+"""
+
+from schedule_optimisation.cost import compute_cost
+from schedule_optimisation.evaluator import CostEvaluator
+from schedule_optimisation.occupancy import SlotOccupancy
+from schedule_optimisation.state import AssignmentState
+
+INITIALISERS = ("greedy", "greedy_conflicts")
+
+def _has_conflict(i, assign, evaluator, occupancy):
+    # Another lesson of the slot shares the teacher, a group or the room of the lesson
+    slot = occupancy.slot_index(assign[0], assign[1])
+    return (assign[2] is not None and occupancy.room_counts[slot, assign[2]] > 1) or bool(evaluator.conflicting_lessons(i))
+
+def _place(i, state, evaluator, occupancy, assign):
+    move = ("move", i, state[i], assign)
+    state.apply(move)
+    evaluator.commit(move)
+    occupancy.apply(move)
+
+def construct_initial_solution(assignments, problem, initialiser="greedy", room_strategy="first"):
+    if initialiser not in INITIALISERS:
+        raise ValueError(f"Invalid initialiser: '{initialiser}'. Available initialisers: {', '.join(INITIALISERS)}.")
+    state = AssignmentState.from_assignments(assignments)
+    initial_cost, _ = compute_cost(state, problem)
+    evaluator = CostEvaluator(state, problem)
+    occupancy = SlotOccupancy(state, problem)
+    graph = problem.conflict_graph
+
+    # Lessons to place: unassigned lessons and (optionally) lessons lifted out of hard conflicts, least constrained
+    # lessons are lifted first so the more constrained lessons keep their slots
+    pending = [i for i in range(problem.num_lessons) if state[i] is None]
+    num_unassigned = len(pending)
+    lifted = {}
+    if initialiser == "greedy_conflicts":
+        for i in sorted(range(problem.num_lessons), key=lambda i: (graph.degree(i), i)):
+            assign = state[i]
+            if assign is not None and _has_conflict(i, assign, evaluator, occupancy):
+                lifted[i] = assign
+                _place(i, state, evaluator, occupancy, None)
+        pending.extend(lifted)
+
+    # Most-constrained first: lessons with most lessons sharing their teacher or groups, then most groups
+    pending.sort(key=lambda i: (-graph.degree(i), -len(problem.groups_of[i]), i))
+    placed = 0
+    for i in pending:
+        # Least loaded slots first, the first slot with free teacher, groups and room wins
+        slots = sorted(problem.time_slots, key=lambda slot: len(evaluator.slot_lessons.get(slot, ())))
+        for date_idx, time_idx in slots:
+            room_idx = occupancy.choose_room(date_idx, time_idx, strategy=room_strategy)
+            if room_idx is not None and not evaluator.conflicting_lessons(i, (date_idx, time_idx, room_idx)):
+                _place(i, state, evaluator, occupancy, (date_idx, time_idx, room_idx))
+                placed += 1
+                break
+        else:
+            if i in lifted:
+                _place(i, state, evaluator, occupancy, lifted[i])  # no conflict-free slot, the lesson keeps its slot
+
+    cost, penalties = compute_cost(state, problem)
+    report = {
+        "initialiser": initialiser,
+        "unassigned": num_unassigned,
+        "lifted": len(lifted),
+        "placed": placed,
+        "unplaced": sum(state[i] is None for i in range(problem.num_lessons)),
+        "initial_cost": initial_cost,
+        "cost": cost,
+        "cost_reduction": initial_cost - cost,
+    }
+    return state, cost, penalties, report
@@ -1,7 +1,11 @@
 import copy
 from datetime import datetime, timedelta
+from schedule_optimisation.state import AssignmentState
+from schedule_optimisation.problem import Problem
+from schedule_optimisation.profiling import profiled
 
-def prepare_input_data(schedule_data, lessons_times, start_date, end_date):
+@profiled("prepare_input_data")
+def prepare_input_data(schedule_data, lessons_times, start_date, end_date, as_state=False):
     # Convert date strings to datetime objects if they are not datetime objects
     if isinstance(start_date, str):
         start_date = datetime.strptime(start_date, "%Y-%m-%d")
@@ -23,15 +27,13 @@ def prepare_input_data(schedule_data, lessons_times, start_date, end_date):
     for di, date in enumerate(all_dates):
         for ti, t in enumerate(lessons_times):
             time_slots.append((di, ti))
-    total_slots = len(time_slots)
     
     # Filter lessons by type 'Lesson'
     lessons = [lesson for lesson in schedule_data if lesson.get("type") == "Lesson"]
     # Remove from lessons cancelled lessons
     lessons = [lesson for lesson in lessons if str(lesson.get("room")).lower() != "cancelled" and str(lesson.get("room")).lower() != "canceled"]
 
-    # Extract unique resources for checking the constraints
-    teachers = {lesson["lecturer"] for lesson in lessons}
+    # Extract unique rooms (teachers and groups are interned by the problem model)
     rooms = set() 
     for lesson in schedule_data:
         room = lesson.get("room")
@@ -39,10 +41,6 @@ def prepare_input_data(schedule_data, lessons_times, start_date, end_date):
         if room and str(room).lower() not in ["none", "null", "cancelled"]:
             rooms.add(room)
     rooms = list(rooms)
-    groups = set() 
-    for lesson in lessons:
-        for grp in lesson.get("groups", []):
-            groups.add(grp)
     
     # Remain existing time and room assignments and
     # create a list of assignments with lessons length (len(lessons)):
@@ -66,14 +64,19 @@ def prepare_input_data(schedule_data, lessons_times, start_date, end_date):
             # Set to None if valid assignment not found
             full_assignments[i] = None  # Explicitly indicate no assignment
     
-    # Conversion to list for indexing for random selection
-    groups = list(groups)
+    # Compact integer model of the problem for the constraints and algorithms
+    problem = Problem(lessons, rooms, time_slots)
+
+    # Array-backed assignments for the search algorithms
+    if as_state:
+        full_assignments = AssignmentState.from_assignments(full_assignments)
     
-    return lessons, teachers, groups, rooms, time_slots, total_slots, all_dates, full_assignments
+    return problem, all_dates, full_assignments
 
-def prepare_output_data(best_assignments, lessons, rooms, lessons_times, all_dates, initial_cost, initial_penalties, best_cost, best_penalties):
-    # Format output data
+def prepare_output_data(best_assignments, problem, lessons_times, all_dates, initial_cost, initial_penalties, best_cost, best_penalties):
+    # Format output data (best assignments can be a list of tuples or an AssignmentState)
     optimised_schedule = []
+    lessons, rooms = problem.lessons, problem.rooms
     for i, assign in enumerate(best_assignments):
         lesson = copy.deepcopy(lessons[i])
         if assign is None:
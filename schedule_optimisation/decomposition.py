@@ -0,0 +1,150 @@
+"""
+Time-Window Decomposition Module
+
+The Time-Window Decomposition Module contains a decomposition mode for long (e.g. semester-long)
+horizons. The dates are split into weekly or custom windows, every lesson belongs to the window of its
+current date and each window is optimised as an independent sub-problem in a pool of processes, where
+lessons can only move inside their window. The window results are stitched into one schedule and a
+short global polish over the whole horizon handles the cross-window terms (e.g. teacher room reuse).
+The report compares the costs with an optional monolithic run of the same algorithm. A time limit
+covers all phases: the windows, the polish and the comparison stop at the same deadline.
+"""
+
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import numpy as np
+from schedule_optimisation.algorithms import select_algorithm
+from schedule_optimisation.budget import absolute_deadline
+from schedule_optimisation.cost import compute_cost
+from schedule_optimisation.problem import Problem
+from schedule_optimisation.state import AssignmentState
+from schedule_optimisation.constants import DECOMPOSITION_POLISH_ITERS
+
+def window_ranges(all_dates, windows="week"):
+    # Date index ranges [start, end) of the windows: "week" (calendar weeks), a number of dates per window
+    # or a list of the first dates of the windows
+    if windows == "week":
+        weeks = [datetime.strptime(date, "%Y-%m-%d").isocalendar()[:2] for date in all_dates]
+        starts = [d for d in range(len(all_dates)) if d == 0 or weeks[d] != weeks[d - 1]]
+    elif isinstance(windows, str):
+        raise ValueError(f"Invalid windows: '{windows}'. Available windows: 'week', a number of dates per window or a list of window start dates.")
+    elif isinstance(windows, int):
+        if windows < 1:
+            raise ValueError(f"Invalid windows: {windows}. Expected a positive number of dates per window.")
+        starts = list(range(0, len(all_dates), windows))
+    else:
+        unknown = [date for date in windows if date not in all_dates]
+        if unknown:
+            raise ValueError(f"Invalid windows: {', '.join(map(str, unknown))}. Window starts must be dates of the range.")
+        starts = sorted({0, *(all_dates.index(date) for date in windows)})
+    return [(start, end) for start, end in zip(starts, starts[1:] + [len(all_dates)])]
+
+def partition_lessons(assignments, num_lessons, ranges):
+    # Lessons of every window by their current date, unassigned lessons go to the window with fewest lessons
+    window_of_date = {}
+    for w, (start, end) in enumerate(ranges):
+        window_of_date.update((d, w) for d in range(start, end))
+    members = [[] for _ in ranges]
+    unassigned = []
+    for i in range(num_lessons):
+        assign = assignments[i]
+        if assign is None:
+            unassigned.append(i)
+        else:
+            members[window_of_date[assign[0]]].append(i)
+    for i in unassigned:
+        min(members, key=len).append(i)
+    return [np.array(sorted(lessons), dtype=np.int64) for lessons in members]
+
+def window_problem(problem, lessons, start, end):
+    # Sub-problem of the window lessons restricted to the window time slots (date indices stay global)
+    time_slots = [(d, t) for d, t in problem.time_slots if start <= d < end]
+    return Problem([problem.lessons[i] for i in lessons.tolist()], problem.rooms, time_slots)
+
+def _optimise_window(algorithm, sub_problem, sub_assignments, seed, algorithm_options):
+    # Seed both random generators used by the algorithms
+    random.seed(seed)
+    np.random.seed(seed)
+
+    start_time = time.perf_counter()
+    initial_cost, _ = compute_cost(sub_assignments, sub_problem)
+    best_assignments, best_cost, _ = select_algorithm(algorithm)(sub_assignments, sub_problem, plot=False, **algorithm_options)
+    return best_assignments, initial_cost, best_cost, time.perf_counter() - start_time
+
+def run_decomposed(current_assignments, problem, all_dates, algorithm='ts', windows="week", max_iters=1000,
+                   polish_iters=DECOMPOSITION_POLISH_ITERS, max_workers=None, seeds=None, compare_monolithic=False,
+                   **algorithm_options):
+    current_assignments = AssignmentState.from_assignments(current_assignments)
+    ranges = window_ranges(all_dates, windows)
+    members = partition_lessons(current_assignments, problem.num_lessons, ranges)
+    active = [w for w in range(len(ranges)) if len(members[w])]  # windows without lessons are skipped
+
+    # Seeds of the window runs and of the polish (drawn from the global random generator if not given)
+    if seeds is None:
+        seeds = [random.randrange(2**32) for _ in range(len(active) + 1)]
+    if len(seeds) != len(active) + 1:
+        raise ValueError(f"Invalid seeds: expected {len(active) + 1} seeds (windows and polish), got {len(seeds)}.")
+    select_algorithm(algorithm)  # validate the algorithm name before starting the workers
+    # One deadline for all phases instead of a fresh time limit for every window, the polish and the comparison
+    algorithm_options["deadline"] = absolute_deadline(algorithm_options.pop("time_limit", None),
+                                                      algorithm_options.get("deadline"))
+
+    # Optimise the windows in parallel processes
+    wall_start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = []
+        for w, seed in zip(active, seeds):
+            start, end = ranges[w]
+            sub_problem = window_problem(problem, members[w], start, end)
+            sub_assignments = AssignmentState(current_assignments.data[:, members[w]].copy())
+            futures.append(pool.submit(_optimise_window, algorithm, sub_problem, sub_assignments, seed,
+                                       dict(algorithm_options, max_iters=max_iters)))
+        results = [future.result() for future in futures]
+    windows_time = time.perf_counter() - wall_start
+
+    # Stitch the window results into one schedule
+    stitched = current_assignments.copy()
+    for w, (best_assignments, _, _, _) in zip(active, results):
+        stitched.data[:, members[w]] = AssignmentState.from_assignments(best_assignments).data
+    stitched_cost, _ = compute_cost(stitched, problem)
+
+    # Short global polish over the whole horizon for the cross-window terms
+    polish_start = time.perf_counter()
+    random.seed(seeds[-1])
+    np.random.seed(seeds[-1])
+    best_assignments, best_cost, best_penalties = select_algorithm(algorithm)(
+        stitched, problem, plot=False, **dict(algorithm_options, max_iters=polish_iters)
+    )
+    polish_time = time.perf_counter() - polish_start
+
+    report = {
+        "windows": [{"first_date": all_dates[ranges[w][0]], "last_date": all_dates[ranges[w][1] - 1],
+                     "lessons": len(members[w]), "initial_cost": initial_cost, "best_cost": window_cost, "run_time": run_time}
+                    for w, (_, initial_cost, window_cost, run_time) in zip(active, results)],
+        "seeds": list(seeds),
+        "stitched_cost": stitched_cost,
+        "polished_cost": best_cost,
+        "windows_time": windows_time,
+        "polish_time": polish_time,
+        "wall_time": windows_time + polish_time,
+    }
+
+    # Monolithic run of the same algorithm over the whole horizon with the same iterations as the critical path
+    if compare_monolithic:
+        monolithic_start = time.perf_counter()
+        random.seed(seeds[-1])
+        np.random.seed(seeds[-1])
+        _, monolithic_cost, _ = select_algorithm(algorithm)(
+            current_assignments, problem, plot=False, **dict(algorithm_options, max_iters=max_iters + polish_iters)
+        )
+        monolithic_time = time.perf_counter() - monolithic_start
+        report["monolithic"] = {
+            "max_iters": max_iters + polish_iters,
+            "cost": monolithic_cost,
+            "run_time": monolithic_time,
+            "cost_ratio": best_cost / monolithic_cost if monolithic_cost else None,  # below 1 means decomposition is better
+            "speedup": monolithic_time / report["wall_time"] if report["wall_time"] > 0 else None,
+        }
+    return best_assignments, best_cost, best_penalties, report
@@ -0,0 +1,368 @@
+"""
+Search Engine Module
+
+The Search Engine Module contains the step-wise engine shared by the optimisation algorithms. The
+engine owns the search state (assignments, incremental evaluator, room occupancy, tabu memory, best
+solution, cost history) and runs the search in steps of iterations, so a host application can
+interleave several optimisations, serve progress queries between steps or stop and continue a search
+without threads. Neighbour generation, tabu handling, best tracking, stopping rules, anytime delivery
+and checkpoints are implemented once here, the algorithms only choose the next move.
+"""
+
+import random
+from time import perf_counter
+from schedule_optimisation.evaluator import CostEvaluator, PRUNED
+from schedule_optimisation.occupancy import SlotOccupancy
+from schedule_optimisation.state import AssignmentState
+from schedule_optimisation.tabu import TabuMemory, SolutionTabu
+from schedule_optimisation.zobrist import ZobristHash, CostCache
+from schedule_optimisation.room_assignment import reassign_slot_rooms
+from schedule_optimisation.profiling import active_profiler
+from schedule_optimisation.trace import CostHistory
+from schedule_optimisation.checkpoint import capture_search_state, restore_search_state, restore_candidate_order
+from schedule_optimisation.budget import SearchBudget
+from schedule_optimisation.constants import NEIGHBOUR_CHECKS_LIMIT
+
+# Reasons why a search stopped
+STOP_MAX_ITERS = "max_iters"
+STOP_NO_IMPROVEMENT = "no_improvement"
+STOP_NO_NEIGHBOURS = "no_neighbours"
+STOP_TIME_LIMIT = "time_limit"
+STOP_REQUESTED = "stop_requested"
+
+class SearchEngine:
+    name = None  # short algorithm name (checkpoints and figures)
+    track_candidates = False  # whether the evaluator keeps the lessons in conflicts (always when candidate_bias > 0)
+
+    def __init__(self, current_assignments, problem, max_iters=1000, tabu_tenure=50, no_improvement_limit=None,
+                 room_strategy="first", neighbour_checks_limit=NEIGHBOUR_CHECKS_LIMIT, tabu_attribute="lesson_pair",
+                 time_limit=None, deadline=None, best_so_far=None, on_improvement=None, trace=None, checkpoint=None,
+                 resume_from=None, movable_lessons=None, candidate_bias=0.0, enumerate_moves=False, bounded_evaluation=False,
+                 term_order=None, cost_cache_size=None, cache_eviction="lru", solution_tabu_tenure=None,
+                 room_reassignment=False):
+        self.problem = problem
+        self.max_iters = max_iters
+        self.no_improvement_limit = no_improvement_limit
+        self.room_strategy = room_strategy
+        self.neighbour_checks_limit = neighbour_checks_limit
+        # Lessons the neighbour moves may change (None for all lessons), the other lessons stay fixed
+        self.movable_lessons = None if movable_lessons is None else [int(i) for i in movable_lessons]
+        self._movable_set = None if movable_lessons is None else set(self.movable_lessons)
+        # Probability of choosing the moved lesson among the lessons with conflicts or penalties, and whether all
+        # moves of one lesson are evaluated instead of random moves and swaps
+        if not 0 <= candidate_bias <= 1:
+            raise ValueError(f"Invalid candidate bias: {candidate_bias}. Expected a probability between 0 and 1.")
+        self.candidate_bias = candidate_bias
+        self.enumerate_moves = enumerate_moves
+        # Whether neighbours are evaluated with the cost of the best neighbour so far as a bound (early cutoff)
+        self.bounded_evaluation = bounded_evaluation
+        # Whether the rooms of the slots changed by every accepted move are reassigned optimally
+        self.room_reassignment = room_reassignment
+        self.best_so_far = best_so_far
+        self.on_improvement = on_improvement
+        self.trace = trace
+        self.checkpoint = checkpoint
+        self.budget = SearchBudget(time_limit, deadline)  # wall-clock stopping rule (unlimited if neither is given)
+        self.profiler = active_profiler()  # None unless profiling is enabled
+
+        # Tabu memory of forbidden move attributes and of recently visited solutions (None unless enabled)
+        self.tabu_memory = TabuMemory(problem, tabu_tenure, attribute=tabu_attribute)
+        self.solution_tabu = SolutionTabu(solution_tabu_tenure) if solution_tabu_tenure else None
+
+        # Assignment state (updated in place) or the state of a checkpointed search
+        self.current_assignments = AssignmentState.from_assignments(current_assignments)
+        self.cost_history = CostHistory()  # bounded, evenly spaced for long runs
+        self.iteration = 0  # next iteration
+        self.no_improve_counter = 0
+        if resume_from is not None:
+            (self.current_assignments, self.best_assignments, self.best_cost, self.best_penalties,
+             self.iteration, self.no_improve_counter) = restore_search_state(resume_from, self.name, self.tabu_memory,
+                                                                             self.cost_history, self.solution_tabu)
+
+        # Incremental cost evaluator and rooms used in each time slot
+        self.evaluator = CostEvaluator(self.current_assignments, problem, track_candidates=self.track_candidates or candidate_bias > 0,
+                                      term_order=term_order)
+        self.current_cost, self.current_penalties = self.evaluator.cost()
+        if resume_from is not None and self.evaluator.conflicted is not None:
+            restore_candidate_order(resume_from, self.evaluator)
+        self.occupancy = SlotOccupancy(self.current_assignments, problem)
+
+        # Hash of the current state for the cost cache of neighbours and the solution tabu (None unless enabled)
+        self.zobrist = None
+        self.cost_cache = CostCache(cost_cache_size, cache_eviction) if cost_cache_size else None
+        if self.cost_cache is not None or self.solution_tabu is not None:
+            self.zobrist = ZobristHash(problem)
+            self.state_hash = self.zobrist.hash(self.current_assignments)
+            if self.solution_tabu is not None and resume_from is None:
+                self.solution_tabu.add(self.state_hash, self.iteration)
+        if resume_from is None:
+            self.best_assignments = self.current_assignments.copy()  # preallocated buffer for the best solution
+            self.best_cost = self.current_cost
+            self.best_penalties = self.current_penalties
+            self.cost_history.append(self.current_cost)
+        if best_so_far is not None:
+            best_so_far.publish(self.best_assignments, self.best_cost, self.best_penalties, self.iteration)
+
+        self.done = False
+        self.stop_reason = None
+
+    def step(self, n=1):
+        # Run up to n iterations, returns the number of iterations performed
+        performed = 0
+        while performed < n and not self.done:
+            # Stop at the iteration limit, the time limit or deadline, or when a supervisor asks for it
+            if self.iteration >= self.max_iters:
+                self.stop(STOP_MAX_ITERS)
+            elif self.budget.expired():
+                self.stop(STOP_TIME_LIMIT)
+            elif self.best_so_far is not None and self.best_so_far.stop_requested:
+                self.stop(STOP_REQUESTED)
+            elif self._iterate():
+                performed += 1
+        return performed
+
+    def run_until(self, predicate, batch_size=1):
+        # Run batches of iterations until the predicate of the engine holds or the search is done
+        while not self.done and not predicate(self):
+            self.step(batch_size)
+        return self.done
+
+    def run(self):
+        # Run the search to the end (the behaviour of the monolithic algorithms)
+        while not self.done:
+            self.step(max(self.max_iters, 1))  # at least one step, so the stopping rules are checked
+        return self.result()
+
+    def batches(self, batch_size=100):
+        # Generator yielding the engine after each batch of iterations
+        while not self.done:
+            self.step(batch_size)
+            yield self
+
+    def result(self):
+        return self.best_assignments, self.best_cost, self.best_penalties
+
+    def status(self):
+        # Progress of the search (e.g. for progress queries between steps)
+        status = {"algorithm": self.name, "iteration": self.iteration, "max_iters": self.max_iters,
+                  "current_cost": self.current_cost, "best_cost": self.best_cost, "elapsed": self.budget.elapsed(),
+                  "done": self.done, "stop_reason": self.stop_reason}
+        if self.bounded_evaluation:
+            status["pruning"] = self.evaluator.pruning_report()
+        if self.cost_cache is not None:
+            status["cost_cache"] = self.cost_cache.report()
+        return status
+
+    def stop(self, reason=STOP_REQUESTED):
+        # Finish the search, the best solution stays available
+        if not self.done:
+            self.done = True
+            self.stop_reason = reason
+            self.close()
+
+    def close(self):
+        # Release resources of the algorithm (e.g. worker processes)
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def select_move(self, iteration):
+        # Next move of the algorithm: (move, cost, penalties) or None if there is no valid neighbour
+        raise NotImplementedError
+
+    def neighbour_moves(self, iteration):
+        # Non-tabu neighbour moves of the iteration: all moves of one lesson or random moves and swaps
+        moves = self._lesson_moves() if self.enumerate_moves else self._random_moves()
+        profiler = self.profiler
+        for move in moves:
+            if profiler is not None:
+                section_start = perf_counter()
+            # Check if the move is tabu (e.g. returning a lesson to its previous slot or reverse swap of the same lessons)
+            is_tabu = self.tabu_memory.is_tabu(move, iteration)
+            if profiler is not None:
+                profiler.add("tabu_check", perf_counter() - section_start)
+            # Check if the move returns to a recently visited solution
+            if not is_tabu and self.solution_tabu is not None:
+                is_tabu = self.solution_tabu.is_tabu(self.state_hash ^ self.zobrist.delta(move), iteration)
+            if is_tabu:
+                if self.trace is not None:
+                    self.trace.rejected(iteration, self.current_cost, self.best_cost, move[0])
+                continue
+            yield move
+
+    def _pick_lesson(self, num_lessons):
+        # Lesson from the candidate sets of the evaluator (hard conflicts first, then soft penalties) with probability
+        # candidate_bias, uniformly at random otherwise
+        movable = self.movable_lessons
+        if self.candidate_bias and random.random() < self.candidate_bias:
+            candidates = self.evaluator.conflicted if len(self.evaluator.conflicted) else self.evaluator.penalised
+            if len(candidates):
+                lesson_idx = candidates.sample()
+                if movable is None or lesson_idx in self._movable_set:
+                    return lesson_idx
+        lesson_idx = random.randrange(num_lessons)
+        return lesson_idx if movable is None else movable[lesson_idx]
+
+    def _random_moves(self):
+        # Random moves of a lesson to a random slot or swaps of two lessons, every generated move (including tabu
+        # moves and slots without a free room) counts as a check
+        problem = self.problem
+        movable = self.movable_lessons
+        num_lessons = problem.num_lessons if movable is None else len(movable)
+        if num_lessons == 0:
+            return
+        current_assignments = self.current_assignments
+        profiler = self.profiler
+        neighbour_checks = 0
+        while neighbour_checks < self.neighbour_checks_limit:
+            if profiler is not None:
+                section_start = perf_counter()
+            # Random choose to swap two lessons or move one lesson
+            if random.random() < 0.5:
+                # Move a single lesson to a random time slot
+                lesson_idx = self._pick_lesson(num_lessons)
+                old_assign = current_assignments[lesson_idx]
+                d_new, t_new = problem.time_slots[random.randrange(problem.total_slots)]
+
+                # Find available room for the new time slot from the occupancy index
+                new_room_idx = self.occupancy.choose_room(d_new, t_new, strategy=self.room_strategy, moving_assign=old_assign)
+                neighbour_checks += 1
+                if new_room_idx is None:
+                    continue  # no available rooms in this slot, skip
+                move = ("move", lesson_idx, old_assign, (d_new, t_new, new_room_idx))
+            else:
+                # Swap two lessons (exchange their time slots and rooms)
+                a = self._pick_lesson(num_lessons)
+                b = random.randrange(num_lessons)
+                if movable is not None:
+                    b = movable[b]
+                if a == b:
+                    continue  # skip if the two lessons are the same (not counted as a check)
+                move = ("swap", a, b, current_assignments[a], current_assignments[b])
+                neighbour_checks += 1
+            if profiler is not None:
+                profiler.add("move_generation", perf_counter() - section_start)
+            yield move
+
+    def _lesson_moves(self):
+        # All moves of one lesson (chosen like the random moves) to the other slots with a free room
+        problem = self.problem
+        num_lessons = problem.num_lessons if self.movable_lessons is None else len(self.movable_lessons)
+        if num_lessons == 0:
+            return
+        lesson_idx = self._pick_lesson(num_lessons)
+        old_assign = self.current_assignments[lesson_idx]
+        old_slot = old_assign[:2] if old_assign is not None else None
+        for d_new, t_new in problem.time_slots:
+            if (d_new, t_new) == old_slot:
+                continue
+            new_room_idx = self.occupancy.choose_room(d_new, t_new, strategy=self.room_strategy, moving_assign=old_assign)
+            if new_room_idx is not None:
+                yield ("move", lesson_idx, old_assign, (d_new, t_new, new_room_idx))
+
+    def evaluate_move(self, move, bound=None):
+        # Cost and penalties of the neighbour, looked up in the cost cache by the hash of the neighbour if enabled
+        # (pruned evaluations depend on the bound and are not cached)
+        cache = self.cost_cache
+        if cache is None:
+            return self.evaluator.evaluate(move, bound=bound)
+        neighbour_hash = self.state_hash ^ self.zobrist.delta(move)
+        entry = cache.get(neighbour_hash)
+        if entry is not None:
+            return entry
+        neighbour_cost, neighbour_penalties = self.evaluator.evaluate(move, bound=bound)
+        if neighbour_penalties is not PRUNED:
+            cache.put(neighbour_hash, neighbour_cost, neighbour_penalties)
+        return neighbour_cost, neighbour_penalties
+
+    def apply_move(self, move):
+        # Accept the move, even if it is worse than the current solution (uphill move is allowed), returns the
+        # applied moves (the move and the room moves of the room reassignment)
+        profiler = self.profiler
+        if profiler is not None:
+            section_start = perf_counter()
+        if self.zobrist is not None:
+            self.state_hash ^= self.zobrist.delta(move)
+        self.current_assignments.apply(move)
+        self.current_cost, self.current_penalties = self.evaluator.commit(move)
+        self.occupancy.apply(move)
+        if profiler is not None:
+            profiler.add("commit", perf_counter() - section_start)
+        if not self.room_reassignment:
+            return [move]
+
+        # Optimal rooms of the slots the move left and entered
+        if profiler is not None:
+            section_start = perf_counter()
+        assigns = (move[2], move[3]) if move[0] == "move" else (move[3], move[4])
+        room_moves = []
+        for slot in dict.fromkeys(assign[:2] for assign in assigns if assign is not None):
+            room_moves.extend(reassign_slot_rooms(*slot, self.current_assignments, self.evaluator, self.occupancy,
+                                                  self.problem))
+        if room_moves:
+            if self.zobrist is not None:
+                for room_move in room_moves:
+                    self.state_hash ^= self.zobrist.delta(room_move)
+            self.current_cost, self.current_penalties = self.evaluator.cost()
+        if profiler is not None:
+            profiler.add("room_reassignment", perf_counter() - section_start)
+        return [move] + room_moves
+
+    def _iterate(self):
+        # One iteration: choose and apply a move, update tabu memory, best solution and history
+        iteration = self.iteration
+        selected = self.select_move(iteration)
+        if selected is None:
+            self.stop(STOP_NO_NEIGHBOURS)  # all moves are tabu or no moves available
+            return False
+        move = selected[0]
+        self.apply_move(move)
+
+        # Update tabu memory based on the performed move (expired entries are overwritten, no cleanup needed)
+        self.tabu_memory.add(move, iteration)
+        if self.solution_tabu is not None:
+            self.solution_tabu.add(self.state_hash, iteration)
+
+        # Update best solution found with the current solution
+        improved = self.current_cost < self.best_cost
+        if improved:
+            self.best_cost = self.current_cost
+            profiler = self.profiler
+            if profiler is not None:
+                section_start = perf_counter()
+            self.current_assignments.snapshot(self.best_assignments)
+            if profiler is not None:
+                profiler.add("copy", perf_counter() - section_start)
+            self.best_penalties = self.current_penalties
+            self.no_improve_counter = 0
+            # Deliver the new best solution to the supervisor
+            if self.best_so_far is not None:
+                self.best_so_far.publish(self.best_assignments, self.best_cost, self.best_penalties, iteration)
+            if self.on_improvement is not None:
+                self.on_improvement(iteration, self.best_cost, self.best_penalties, self.best_assignments)
+        else:
+            self.no_improve_counter += 1
+        if self.trace is not None:
+            self.trace.iteration(iteration, self.current_cost, self.best_cost, move[0], improved)
+        self.iteration = iteration + 1
+
+        # Check if we should stop due to no improvement
+        if self.no_improvement_limit is not None and self.no_improve_counter >= self.no_improvement_limit:
+            self.stop(STOP_NO_IMPROVEMENT)
+            return True
+
+        # Track cost history and checkpoint the search state periodically (written in the background)
+        self.cost_history.append(self.current_cost)
+        if self.checkpoint is not None and self.checkpoint.due(self.iteration):
+            self.checkpoint.save(self.checkpoint_state())
+        return True
+
+    def checkpoint_state(self):
+        # Copy of the search state to continue exactly from the next iteration (e.g. for resume_from)
+        return capture_search_state(self.name, self.iteration, self.current_assignments, self.best_assignments,
+                                    self.best_cost, self.best_penalties, self.no_improve_counter, self.tabu_memory,
+                                    self.cost_history, evaluator=self.evaluator, solution_tabu=self.solution_tabu)
@@ -0,0 +1,476 @@
+"""
+Incremental Cost Evaluation Module
+
+The Incremental Cost Evaluation Module contains a stateful cost evaluator which keeps the counters
+of all hard and soft constraints for the current assignments. A "move" or "swap" touches only one or
+two lessons, so the cost of a neighbouring solution is found by updating only the affected slots,
+teacher days and groups instead of running `compute_cost` from scratch. Optionally the evaluator keeps
+the lessons involved in hard conflicts and soft-constraint penalties as candidate sets for the move
+generators.
+"""
+
+import random
+from bisect import insort
+from time import perf_counter
+from schedule_optimisation.weights import (TEACHER_MOVE_BETWEEN_CONSECUTIVE, TEACHER_SAME_ROOM_FOR_DIFF, GROUP_SPLIT_DOUBLE,
+                                           TEACHER_DAILY_OVERLOAD, HARD_CONFLICTS_PENALTY)
+from schedule_optimisation.profiling import active_profiler
+
+HARD_METRICS = ("teacher_conflicts", "room_conflicts", "group_conflicts")
+SOFT_METRICS = ("teacher_move_between_consecutive", "teacher_same_room_for_diff", "group_split_double", "teacher_daily_overload")
+SOFT_WEIGHTS = {"teacher_move_between_consecutive": TEACHER_MOVE_BETWEEN_CONSECUTIVE, "teacher_same_room_for_diff": TEACHER_SAME_ROOM_FOR_DIFF,
+                "group_split_double": GROUP_SPLIT_DOUBLE, "teacher_daily_overload": TEACHER_DAILY_OVERLOAD}
+
+# Terms of the bounded evaluation and the violations they update, the default order puts the cheap and decisive
+# hard terms first and the soft terms by weight
+EVALUATION_TERMS = {
+    "group_conflicts": ("group_conflicts",),
+    "slot_conflicts": ("teacher_conflicts", "room_conflicts"),
+    "teacher_day": ("teacher_move_between_consecutive", "teacher_daily_overload"),
+    "group_split_double": ("group_split_double",),
+    "teacher_room_reuse": ("teacher_same_room_for_diff",),
+}
+HARD_TERMS = ("group_conflicts", "slot_conflicts")
+PRUNED = "pruned"  # penalties of a neighbour pruned by the bounded evaluation
+
+def overload_violations(count):
+    # Same rule as in teacher_overload: penalise classes beyond 4 and additionally beyond 6 per day
+    viol = 0
+    if count > 4:
+        viol += count - 4
+        if count > 6:
+            viol += count - 6
+    return viol
+
+def movement_violations(entries):
+    # Entries are (time_idx, lesson_idx, room_idx) of one teacher on one day sorted by time and lesson order
+    viol = 0
+    for idx in range(len(entries) - 1):
+        time_idx, _, room_idx = entries[idx]
+        next_time_idx, _, next_room_idx = entries[idx + 1]
+        if next_time_idx == time_idx + 1 and room_idx is not None and next_room_idx is not None and room_idx != next_room_idx:
+            viol += 1
+    return viol
+
+def lonely_violations(times):
+    # Times are the sorted time indices of one teacher with one group on one day
+    lonely_flags = [True] * len(times)
+    for k in range(len(times) - 1):
+        if times[k + 1] == times[k] + 1:
+            lonely_flags[k] = False
+            lonely_flags[k + 1] = False
+    return sum(lonely_flags)
+
+
+class CandidateSet:
+    def __init__(self):
+        # Lesson indices with their positions for constant-time updates and uniform sampling
+        self.items = []
+        self.position = {}
+
+    def add(self, i):
+        if i not in self.position:
+            self.position[i] = len(self.items)
+            self.items.append(i)
+
+    def discard(self, i):
+        pos = self.position.pop(i, None)
+        if pos is not None:
+            last = self.items.pop()
+            if last != i:
+                self.items[pos] = last
+                self.position[last] = pos
+
+    def restore(self, items):
+        # Same lessons in the given order (sampling by position depends on the order)
+        self.items = list(items)
+        self.position = {i: pos for pos, i in enumerate(self.items)}
+
+    def sample(self):
+        return self.items[random.randrange(len(self.items))]
+
+    def __contains__(self, i):
+        return i in self.position
+
+    def __len__(self):
+        return len(self.items)
+
+
+class CostEvaluator:
+    def __init__(self, assignments, problem, track_candidates=False, term_order=None):
+        self.problem = problem
+        self.num_lessons = problem.num_lessons
+        self.assignments = list(assignments)  # own copy of the current assignments
+
+        # Lesson attributes used by the constraints (interned teacher and group ids)
+        self.lesson_teacher = problem.teacher_of
+        self.lesson_groups = problem.groups_of
+
+        # Constraint counters
+        self.slot_lessons = {}        # {(date_idx, time_idx): sorted lesson indices}
+        self.slot_teachers = {}       # {(date_idx, time_idx): {teacher: count}}
+        self.slot_rooms = {}          # {(date_idx, time_idx): {room_idx: count}}
+        self.slot_groups = {}         # {(date_idx, time_idx): {group: count}}
+        self.teacher_day = {}         # {(teacher, date_idx): sorted [(time_idx, lesson_idx, room_idx)]}
+        self.teacher_rooms = {}       # {teacher: {room_idx: count}}
+        self.teacher_classes = {}     # {teacher: number of assigned classes}
+        self.teacher_group_day = {}   # {(teacher, group, date_idx): sorted [time_idx]}
+
+        # Violation totals for every constraint
+        self.violations = {name: 0 for name in HARD_METRICS + SOFT_METRICS}
+
+        for i, assign in enumerate(self.assignments):
+            self._add(i, assign)
+
+        # Lessons in hard conflicts and lessons with soft penalties (updated on commit, None unless tracked)
+        self.conflicted = None
+        self.penalised = None
+        if track_candidates:
+            self.conflicted, self.penalised = CandidateSet(), CandidateSet()
+            self._refresh_candidates(range(self.num_lessons))
+
+        # Order of the terms in the bounded evaluation and how often evaluations stop after each term
+        if term_order is None:
+            term_order = tuple(EVALUATION_TERMS)
+        if sorted(term_order) != sorted(EVALUATION_TERMS):
+            raise ValueError(f"Invalid term order: {', '.join(term_order)}. Expected every term once: {', '.join(EVALUATION_TERMS)}.")
+        updates = {"group_conflicts": self._update_groups, "slot_conflicts": self._update_slot, "teacher_day": self._update_teacher_day,
+                   "group_split_double": self._update_split_double, "teacher_room_reuse": self._update_teacher_rooms}
+        self.term_order = tuple(term_order)
+        self._terms = [(name, updates[name], EVALUATION_TERMS[name], name in HARD_TERMS)
+                       for name in self.term_order]
+        self.bounded_evaluations = 0
+        self.terms_evaluated = dict.fromkeys(self.term_order, 0)
+        self.pruned_after = dict.fromkeys(self.term_order, 0)
+
+    # --- Per-bucket contributions ---
+
+    def _slot_conflicts(self, slot):
+        # Violations of teacher and room conflicts in one slot (only lessons matching the first lesson count)
+        lesson_indices = self.slot_lessons.get(slot)
+        if not lesson_indices:
+            return 0, 0
+        first = lesson_indices[0]
+        teacher_viol = self.slot_teachers[slot][self.lesson_teacher[first]] - 1
+        room_viol = 0
+        for i in lesson_indices:
+            room_idx = self.assignments[i][2]
+            if room_idx is not None:
+                room_viol = self.slot_rooms[slot][room_idx] - 1
+                break
+        return teacher_viol, room_viol
+
+    def _teacher_day_violations(self, key):
+        entries = self.teacher_day.get(key, [])
+        return movement_violations(entries), overload_violations(len(entries))
+
+    def _teacher_reuse_violations(self, teacher):
+        return self.teacher_classes.get(teacher, 0) - len(self.teacher_rooms.get(teacher, {}))
+
+    def _lesson_violations(self, i):
+        # Whether the lesson shares its slot with a lesson of the same teacher, room or group (hard) and whether
+        # it takes part in a soft penalty (movement, overload, room reuse or split double class)
+        assign = self.assignments[i]
+        if assign is None:
+            return False, False
+        date_idx, time_idx, room_idx = assign
+        slot = (date_idx, time_idx)
+        teacher = self.lesson_teacher[i]
+        grp_list = self.lesson_groups[i]
+        group_counts = self.slot_groups[slot]
+        if (self.slot_teachers[slot][teacher] > 1 or (room_idx is not None and self.slot_rooms[slot][room_idx] > 1)
+                or any(group_counts[grp] > 1 for grp in grp_list)):
+            return True, True
+
+        entries = self.teacher_day[(teacher, date_idx)]
+        if len(entries) > 4 or (room_idx is not None and self.teacher_rooms[teacher][room_idx] > 1):
+            return False, True
+        for other_time, _, other_room in entries:
+            if abs(other_time - time_idx) == 1 and other_room is not None and room_idx is not None and other_room != room_idx:
+                return False, True
+        for grp in grp_list:
+            times = self.teacher_group_day[(teacher, grp, date_idx)]
+            if time_idx - 1 not in times and time_idx + 1 not in times:
+                return False, True
+        return False, False
+
+    def _refresh_candidates(self, lessons):
+        for i in lessons:
+            conflicted, penalised = self._lesson_violations(i)
+            if conflicted:
+                self.conflicted.add(i)
+            else:
+                self.conflicted.discard(i)
+            if penalised:
+                self.penalised.add(i)
+            else:
+                self.penalised.discard(i)
+
+    def _touched_lessons(self, move):
+        # Lessons whose candidate status can change with the move: lessons of the old and new slots and all
+        # lessons of the teachers of the moved lessons (teacher days, room reuse and split classes)
+        if move[0] == "move":
+            _, lesson_idx, old_asgn, new_asgn = move
+            moved, assigns = (lesson_idx,), (old_asgn, new_asgn)
+        else:
+            _, a_idx, b_idx, assign_a, assign_b = move
+            moved, assigns = (a_idx, b_idx), (assign_a, assign_b)
+        touched = set(moved)
+        for assign in assigns:
+            if assign is not None:
+                touched.update(self.slot_lessons.get((assign[0], assign[1]), ()))
+        for i in moved:
+            touched.update(self.problem.lessons_of_teacher(self.lesson_teacher[i]).tolist())
+        return sorted(touched)
+
+    # --- State updates ---
+
+    def _update(self, i, assign, add):
+        if assign is None:
+            return
+        self._update_slot(i, assign, add)
+        self._update_groups(i, assign, add)
+        self._update_teacher_day(i, assign, add)
+        self._update_teacher_rooms(i, assign, add)
+        self._update_split_double(i, assign, add)
+
+    def _update_slot(self, i, assign, add):
+        # Teacher and room conflicts in the slot
+        slot = (assign[0], assign[1])
+        room_idx = assign[2]
+        viol = self.violations
+        sign = 1 if add else -1
+        old_teacher_viol, old_room_viol = self._slot_conflicts(slot)
+        lesson_indices = self.slot_lessons.setdefault(slot, [])
+        teacher_counts = self.slot_teachers.setdefault(slot, {})
+        room_counts = self.slot_rooms.setdefault(slot, {})
+        if add:
+            insort(lesson_indices, i)
+        else:
+            lesson_indices.remove(i)
+        _change_count(teacher_counts, self.lesson_teacher[i], sign)
+        if room_idx is not None:
+            _change_count(room_counts, room_idx, sign)
+        new_teacher_viol, new_room_viol = self._slot_conflicts(slot)
+        viol["teacher_conflicts"] += new_teacher_viol - old_teacher_viol
+        viol["room_conflicts"] += new_room_viol - old_room_viol
+
+    def _update_groups(self, i, assign, add):
+        # Group conflicts in the slot (every repeated group occurrence is a violation)
+        viol = self.violations
+        group_counts = self.slot_groups.setdefault((assign[0], assign[1]), {})
+        for grp in self.lesson_groups[i]:
+            if add:
+                if group_counts.get(grp, 0) > 0:
+                    viol["group_conflicts"] += 1
+                _change_count(group_counts, grp, 1)
+            else:
+                _change_count(group_counts, grp, -1)
+                if group_counts.get(grp, 0) > 0:
+                    viol["group_conflicts"] -= 1
+
+    def _update_teacher_day(self, i, assign, add):
+        # Teacher movement and daily overload
+        date_idx, time_idx, room_idx = assign
+        viol = self.violations
+        day_key = (self.lesson_teacher[i], date_idx)
+        old_move_viol, old_overload_viol = self._teacher_day_violations(day_key)
+        entries = self.teacher_day.setdefault(day_key, [])
+        if add:
+            insort(entries, (time_idx, i, room_idx), key=lambda e: (e[0], e[1]))
+        else:
+            entries.remove((time_idx, i, room_idx))
+        new_move_viol, new_overload_viol = self._teacher_day_violations(day_key)
+        viol["teacher_move_between_consecutive"] += new_move_viol - old_move_viol
+        viol["teacher_daily_overload"] += new_overload_viol - old_overload_viol
+
+    def _update_teacher_rooms(self, i, assign, add):
+        # Teacher room reuse
+        room_idx = assign[2]
+        teacher = self.lesson_teacher[i]
+        sign = 1 if add else -1
+        old_reuse_viol = self._teacher_reuse_violations(teacher)
+        self.teacher_classes[teacher] = self.teacher_classes.get(teacher, 0) + sign
+        if room_idx is not None:
+            _change_count(self.teacher_rooms.setdefault(teacher, {}), room_idx, sign)
+        self.violations["teacher_same_room_for_diff"] += self._teacher_reuse_violations(teacher) - old_reuse_viol
+
+    def _update_split_double(self, i, assign, add):
+        # Split double classes of the teacher with each group
+        date_idx, time_idx, _ = assign
+        viol = self.violations
+        teacher = self.lesson_teacher[i]
+        for grp in self.lesson_groups[i]:
+            group_key = (teacher, grp, date_idx)
+            times = self.teacher_group_day.setdefault(group_key, [])
+            old_split_viol = lonely_violations(times)
+            if add:
+                insort(times, time_idx)
+            else:
+                times.remove(time_idx)
+            viol["group_split_double"] += lonely_violations(times) - old_split_viol
+
+    def _add(self, i, assign):
+        self._update(i, assign, add=True)
+
+    def _remove(self, i, assign):
+        self._update(i, assign, add=False)
+
+    def _assign(self, i, new_assign):
+        self._remove(i, self.assignments[i])
+        self.assignments[i] = new_assign
+        self._add(i, new_assign)
+
+    def _apply(self, move):
+        if move[0] == "move":
+            _, lesson_idx, _, new_asgn = move
+            self._assign(lesson_idx, new_asgn)
+        elif move[0] == "swap":
+            _, a_idx, b_idx, assign_a, assign_b = move
+            self._assign(a_idx, assign_b)
+            self._assign(b_idx, assign_a)
+
+    def _changes(self, move):
+        # (lesson, old assignment, new assignment) of the move in the order of _apply
+        if move[0] == "move":
+            _, lesson_idx, old_asgn, new_asgn = move
+            return ((lesson_idx, old_asgn, new_asgn),)
+        _, a_idx, b_idx, assign_a, assign_b = move
+        return (a_idx, assign_a, assign_b), (b_idx, assign_b, assign_a)
+
+    def _apply_term(self, update, changes, revert=False):
+        # Apply (or revert) the move for one term only, the other counters keep the current state
+        assignments = self.assignments
+        if revert:
+            changes = [(i, new_asgn, old_asgn) for i, old_asgn, new_asgn in reversed(changes)]
+        for i, old_asgn, _ in changes:
+            assignments[i] = old_asgn
+        for i, old_asgn, new_asgn in changes:
+            if old_asgn is not None:
+                update(i, old_asgn, False)
+            assignments[i] = new_asgn
+            if new_asgn is not None:
+                update(i, new_asgn, True)
+
+    def _evaluate_bounded(self, move, bound):
+        # Terms are applied one by one until the cost is known or a lower bound of the cost reaches the bound
+        viol = self.violations
+        changes = self._changes(move)
+        hard_penalty = HARD_CONFLICTS_PENALTY * self.num_lessons
+        hard_terms_left = len(HARD_TERMS)
+        hard = soft = 0
+        applied = []
+        profiler = active_profiler()
+        self.bounded_evaluations += 1
+        try:
+            for name, update, metrics, is_hard in self._terms:
+                if profiler is not None:
+                    section_start = perf_counter()
+                self._apply_term(update, changes)
+                applied.append(update)
+                self.terms_evaluated[name] += 1
+                if profiler is not None:
+                    profiler.add(f"evaluation_term:{name}", perf_counter() - section_start)
+                if is_hard:
+                    hard_terms_left -= 1
+                    hard += sum(viol[metric] for metric in metrics)
+                else:
+                    soft += sum(viol[metric] * SOFT_WEIGHTS[metric] for metric in metrics)
+                if hard > 0:
+                    lower_bound = hard * hard_penalty
+                else:
+                    # Soft costs so far, while hard terms are left the cost is at least one hard conflict or the soft cost
+                    lower_bound = min(soft, hard_penalty) if hard_terms_left else soft
+                if lower_bound >= bound:
+                    self.pruned_after[name] += 1
+                    if profiler is not None:
+                        profiler.add(f"evaluation_pruned:{name}", 0.0)
+                    return lower_bound, PRUNED
+                if hard > 0 and not hard_terms_left:
+                    break  # the cost only depends on the hard conflicts, the soft terms are not needed
+            return self.cost()
+        finally:
+            for update in reversed(applied):
+                self._apply_term(update, changes, revert=True)
+
+    def _revert(self, move):
+        if move[0] == "move":
+            _, lesson_idx, old_asgn, _ = move
+            self._assign(lesson_idx, old_asgn)
+        elif move[0] == "swap":
+            _, a_idx, b_idx, assign_a, assign_b = move
+            self._assign(b_idx, assign_b)
+            self._assign(a_idx, assign_a)
+
+    # --- Public API ---
+
+    def cost(self):
+        # Same cost and penalties structure as compute_cost for the current assignments
+        viol = self.violations
+        hard_metrics = {name: viol[name] for name in HARD_METRICS}
+        hc_cost = sum(hard_metrics.values())
+        if hc_cost > 0:
+            return hc_cost * HARD_CONFLICTS_PENALTY * self.num_lessons, {"hard_conflicts": hard_metrics, "soft_conflicts": {}}
+
+        soft_metrics = {name: viol[name] for name in SOFT_METRICS}
+        sc_cost = (soft_metrics["teacher_move_between_consecutive"] * TEACHER_MOVE_BETWEEN_CONSECUTIVE +
+                   soft_metrics["teacher_same_room_for_diff"] * TEACHER_SAME_ROOM_FOR_DIFF +
+                   soft_metrics["group_split_double"] * GROUP_SPLIT_DOUBLE +
+                   soft_metrics["teacher_daily_overload"] * TEACHER_DAILY_OVERLOAD)
+        return sc_cost, {"hard_conflicts": hard_metrics, "soft_conflicts": soft_metrics}
+
+    def evaluate(self, move, bound=None):
+        # Cost and penalties of the neighbouring solution without changing the current state, with a bound the
+        # evaluation stops as soon as the cost cannot be below the bound (a lower bound and PRUNED are returned)
+        if bound is not None:
+            return self._evaluate_bounded(move, bound)
+        self._apply(move)
+        try:
+            return self.cost()
+        finally:
+            self._revert(move)
+
+    def delta(self, move):
+        # Exact cost change of the move
+        current_cost, _ = self.cost()
+        neighbour_cost, _ = self.evaluate(move)
+        return neighbour_cost - current_cost
+
+    def commit(self, move):
+        # Accept the move and keep the counters (and candidate sets) for the new current state
+        self._apply(move)
+        if self.conflicted is not None:
+            self._refresh_candidates(self._touched_lessons(move))
+        return self.cost()
+
+    def pruning_report(self):
+        # Pruning rates of the bounded evaluation by the term after which evaluations stopped
+        evaluations = self.bounded_evaluations
+        pruned = sum(self.pruned_after.values())
+        return {
+            "term_order": list(self.term_order),
+            "evaluations": evaluations,
+            "pruned": pruned,
+            "pruning_rate": pruned / evaluations if evaluations else 0.0,
+            "terms_evaluated": dict(self.terms_evaluated),
+            "pruned_after": {name: {"count": count, "rate": count / evaluations if evaluations else 0.0}
+                             for name, count in self.pruned_after.items()},
+        }
+
+    def conflicting_lessons(self, lesson_idx, assign=None):
+        # Lessons sharing a teacher or a group with the lesson in the slot of assign (current slot by default),
+        # only the graph neighbours among the lessons of that slot are visited
+        if assign is None:
+            assign = self.assignments[lesson_idx]
+        if assign is None:
+            return []
+        slot_lessons = [i for i in self.slot_lessons.get((assign[0], assign[1]), ()) if i != lesson_idx]
+        return self.problem.conflict_graph.adjacent_in(lesson_idx, slot_lessons).tolist()
+
+
+def _change_count(counts, key, change):
+    value = counts.get(key, 0) + change
+    if value:
+        counts[key] = value
+    else:
+        del counts[key]
@@ -1,9 +1,16 @@
-import matplotlib.pyplot as plt
 import numpy as np
 
-def plot_cost_history(cost_history, algorithm_name, path_to_save, show_ema=False):
-    plt.figure(figsize=(10, 5))
-    plt.plot(cost_history, label='Cost History', alpha=0.3)
+def plot_cost_history(cost_history, algorithm_name, path_to_save, show_ema=False, show=False):
+    # Matplotlib is imported only when a plot is requested (it is slow to import and not needed on headless hosts)
+    if show:
+        import matplotlib.pyplot as plt
+        fig = plt.figure(figsize=(10, 5))
+    else:
+        # Figure without pyplot: no GUI backend and nothing blocks
+        from matplotlib.figure import Figure
+        fig = Figure(figsize=(10, 5))
+    ax = fig.add_subplot()
+    ax.plot(cost_history, label='Cost History', alpha=0.3)
 
     if show_ema:
         # Exponential Moving Average
@@ -14,13 +21,13 @@ def plot_cost_history(cost_history, algorithm_name, path_to_save, show_ema=False
                 ema.append(v)
             else:
                 ema.append(alpha * v + (1 - alpha) * ema[-1])
-        plt.plot(ema, label=f'EMA (alpha={alpha})', color='red', linewidth=3)
+        ax.plot(ema, label=f'EMA (alpha={alpha})', color='red', linewidth=3)
 
-    plt.xlabel('Iteration')
-    plt.ylabel('Cost')
-    plt.title(f'Cost History (algorithm={algorithm_name})')
-    plt.legend()
-    plt.grid(True, alpha=0.3)
-    plt.savefig(path_to_save)
-    plt.show()
-    plt.close()
+    ax.set_xlabel('Iteration')
+    ax.set_ylabel('Cost')
+    ax.set_title(f'Cost History (algorithm={algorithm_name})')
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    fig.savefig(path_to_save)
+    if show:
+        plt.show(block=False)  # do not wait for the window to be closed
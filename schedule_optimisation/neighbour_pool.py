@@ -0,0 +1,95 @@
+"""
+Neighbour Evaluation Pool Module
+
+The Neighbour Evaluation Pool Module contains a persistent pool of worker processes which evaluate
+the neighbours of one iteration in parallel. Every worker keeps its own incremental cost evaluator
+over its own copy of the current assignments, so after the start only the candidate moves and the
+accepted move are sent to the workers (the whole assignments only when they are replaced). The results are returned in the order of the moves, so the search stays
+deterministic for a fixed seed whatever the number of workers.
+"""
+
+import multiprocessing
+import weakref
+from schedule_optimisation.evaluator import CostEvaluator
+from schedule_optimisation.state import AssignmentState
+
+def _neighbour_worker(conn, assignments, problem):
+    try:
+        evaluator = CostEvaluator(assignments, problem)
+        while True:
+            command, payload = conn.recv()
+            if command == "evaluate":
+                conn.send([evaluator.evaluate(move) for move in payload])
+            elif command == "commit":
+                evaluator.commit(payload)
+            elif command == "sync":
+                # Rebuild the counters from the assignments which replaced the current ones
+                evaluator = CostEvaluator(payload, problem)
+            elif command == "close":
+                break
+    finally:
+        conn.close()
+
+def _shutdown(connections, processes):
+    for conn in connections:
+        try:
+            conn.send(("close", None))
+        except (BrokenPipeError, OSError):
+            pass
+    for process in processes:
+        process.join(timeout=5)
+        if process.is_alive():
+            process.terminate()
+
+
+class NeighbourEvaluationPool:
+    def __init__(self, assignments, problem, num_workers):
+        # Persistent workers with one pipe each, every worker starts from a copy of the assignments
+        assignments = list(AssignmentState.from_assignments(assignments))
+        self.num_workers = num_workers
+        self._connections, self._processes = [], []
+        for _ in range(num_workers):
+            parent_conn, child_conn = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_neighbour_worker, daemon=True,
+                args=(child_conn, assignments, problem)
+            )
+            process.start()
+            child_conn.close()
+            self._connections.append(parent_conn)
+            self._processes.append(process)
+        self._finalizer = weakref.finalize(self, _shutdown, self._connections, self._processes)
+
+    def evaluate(self, moves):
+        # Split the moves into contiguous chunks (one per worker) and return (cost, penalties) in the order of moves
+        chunk = -(-len(moves) // self.num_workers) if moves else 0
+        busy = []
+        for w, conn in enumerate(self._connections):
+            part = moves[w * chunk:(w + 1) * chunk]
+            if part:
+                conn.send(("evaluate", part))
+                busy.append(conn)
+        results = []
+        for conn in busy:
+            results.extend(conn.recv())
+        return results
+
+    def commit(self, move):
+        # Send only the accepted move to the workers
+        for conn in self._connections:
+            conn.send(("commit", move))
+
+    def sync(self, assignments):
+        # Replace the assignments of the workers and rebuild their counters
+        assignments = list(AssignmentState.from_assignments(assignments))
+        for conn in self._connections:
+            conn.send(("sync", assignments))
+
+    def close(self):
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,91 @@
+"""
+Slot Occupancy Module
+
+The Slot Occupancy Module contains an index of the rooms used in every time slot. The index is kept
+up to date with the accepted moves, so the free rooms of a slot are found from a bitset instead of
+scanning all assignments.
+"""
+
+import random
+import numpy as np
+
+ROOM_STRATEGIES = ("first", "random")
+
+class SlotOccupancy:
+    def __init__(self, assignments, problem):
+        self.num_rooms = problem.num_rooms
+        self.num_times = problem.num_times
+
+        # Number of lessons using each room in each slot and bitset of occupied rooms per slot
+        self.room_counts = np.zeros((problem.num_slots, self.num_rooms), dtype=np.int32)
+        self.occupied = [0] * problem.num_slots
+        self.all_rooms = (1 << self.num_rooms) - 1
+
+        for assign in assignments:
+            self.add(assign)
+
+    def slot_index(self, date_idx, time_idx):
+        return date_idx * self.num_times + time_idx
+
+    def add(self, assign):
+        if assign is None or assign[2] is None:
+            return
+        date_idx, time_idx, room_idx = assign
+        slot = self.slot_index(date_idx, time_idx)
+        self.room_counts[slot, room_idx] += 1
+        self.occupied[slot] |= 1 << room_idx
+
+    def remove(self, assign):
+        if assign is None or assign[2] is None:
+            return
+        date_idx, time_idx, room_idx = assign
+        slot = self.slot_index(date_idx, time_idx)
+        self.room_counts[slot, room_idx] -= 1
+        if self.room_counts[slot, room_idx] == 0:
+            self.occupied[slot] &= ~(1 << room_idx)
+
+    def apply(self, move):
+        # Update the index with an accepted move
+        if move[0] == "move":
+            _, _, old_asgn, new_asgn = move
+            self.remove(old_asgn)
+            self.add(new_asgn)
+        # Swap exchanges the slots and rooms of two lessons, so the occupancy does not change
+
+    def free_rooms_mask(self, date_idx, time_idx, moving_assign=None):
+        # Bitset of free rooms in the slot, the room of the moving lesson is free if it is in the same slot
+        slot = self.slot_index(date_idx, time_idx)
+        occupied = self.occupied[slot]
+        if moving_assign is not None and moving_assign[2] is not None and moving_assign[:2] == (date_idx, time_idx):
+            room_idx = moving_assign[2]
+            if self.room_counts[slot, room_idx] == 1:
+                occupied &= ~(1 << room_idx)
+        return self.all_rooms & ~occupied
+
+    def free_rooms(self, date_idx, time_idx, moving_assign=None):
+        mask = self.free_rooms_mask(date_idx, time_idx, moving_assign)
+        free = []
+        while mask:
+            lowest = mask & -mask
+            free.append(lowest.bit_length() - 1)
+            mask ^= lowest
+        return free
+
+    def choose_room(self, date_idx, time_idx, strategy="first", moving_assign=None):
+        # Choose a free room in the slot:
+        # - "first": the free room with the lowest index
+        # - "random": a uniformly random free room
+        # - callable: strategy(free_rooms, date_idx, time_idx) returns one of the free room indices
+        # Returns None if all rooms are used in the slot
+        if strategy not in ROOM_STRATEGIES and not callable(strategy):
+            raise ValueError(f"Invalid room strategy: '{strategy}'. Available strategies: {', '.join(ROOM_STRATEGIES)} or a callable.")
+        if strategy == "first":
+            mask = self.free_rooms_mask(date_idx, time_idx, moving_assign)
+            return (mask & -mask).bit_length() - 1 if mask else None
+
+        free = self.free_rooms(date_idx, time_idx, moving_assign)
+        if not free:
+            return None
+        if strategy == "random":
+            return random.choice(free)
+        return strategy(free, date_idx, time_idx)
@@ -5,38 +5,198 @@ The Schedule Optimisation Module contains main functions for optimising schedule
 algorithms. The functions from this module are used to optimise schedules.
 """
 
+import os
+from contextlib import nullcontext
 from typing import Callable
 from schedule_optimisation.cost import compute_cost
 from schedule_optimisation.data_preparation import prepare_input_data, prepare_output_data
-from schedule_optimisation.algorithms import tabu_search, quantum_inspired_tabu_search
+from schedule_optimisation.state import AssignmentState
+from schedule_optimisation.algorithms import select_algorithm
+from schedule_optimisation.parallel import run_multistart
+from schedule_optimisation.decomposition import run_decomposed
+from schedule_optimisation.templates import run_weekly_template
+from schedule_optimisation.construction import construct_initial_solution
+from schedule_optimisation.repair import repair_conflicts
+from schedule_optimisation.room_assignment import assign_rooms
+from schedule_optimisation.profiling import profiling, active_profiler, profile_path_from_env
+from schedule_optimisation.trace import TraceRecorder
+from schedule_optimisation.checkpoint import Checkpointer, load_checkpoint
+from schedule_optimisation.budget import absolute_deadline
+from schedule_optimisation.constants import DECOMPOSITION_POLISH_ITERS, TEMPLATE_MIN_WEEKS, NEIGHBOUR_CHECKS_LIMIT
 
-def optimise_schedule(schedule_data, lessons_times, start_date, end_date, algorithm='ts', max_iters=1000, tabu_tenure=50):
+def optimise_schedule(schedule_data, lessons_times, start_date, end_date, algorithm='ts', max_iters=1000, tabu_tenure=50,
+                      room_strategy='first', tabu_attribute='lesson_pair', initial_assignments=None, n_starts=1,
+                      max_workers=None, seeds=None, plot=True, profile=False, trace=None, checkpoint_path=None,
+                      checkpoint_interval=100, resume=False, no_improvement_limit=None, time_limit=None, deadline=None,
+                      best_so_far=None, on_improvement=None, decompose=None, polish_iters=DECOMPOSITION_POLISH_ITERS,
+                      compare_monolithic=False, weekly_template=False, template_min_weeks=TEMPLATE_MIN_WEEKS,
+                      template_exception_iters=None, candidate_bias=0.0,
+                      enumerate_moves=False, initialiser=None, repair=False, bounded_evaluation=False, term_order=None,
+                      cost_cache_size=None, cache_eviction='lru', solution_tabu_tenure=None, room_reassignment=False,
+                      room_postpass=False, batch_evaluation=False, neighbour_workers=None,
+                      neighbour_checks_limit=NEIGHBOUR_CHECKS_LIMIT):
+    # Profile the run if requested (or switched on by the environment), an outer profiling block is reported as well
+    profile_path = profile_path_from_env()
+    if profile or profile_path is not None:
+        profiler_context = profiling(path=profile_path)
+    else:
+        profiler_context = nullcontext(active_profiler())
+
+    # Iteration trace: a TraceRecorder or the path of a JSONL trace file written during the run
+    trace_recorder = TraceRecorder(trace) if isinstance(trace, str) else trace
+
+    # One deadline for the time limit of the whole run: every phase, worker and sub-run stops at it
+    deadline = absolute_deadline(time_limit, deadline)
+
+    # Stopping rules and neighbourhood of the algorithms (forwarded to every search of all modes)
+    search_options = dict(no_improvement_limit=no_improvement_limit, deadline=deadline,
+                          candidate_bias=candidate_bias, enumerate_moves=enumerate_moves, bounded_evaluation=bounded_evaluation,
+                          term_order=term_order, cost_cache_size=cost_cache_size, cache_eviction=cache_eviction,
+                          solution_tabu_tenure=solution_tabu_tenure, room_reassignment=room_reassignment,
+                          neighbour_checks_limit=neighbour_checks_limit)
+    # Neighbour evaluation of QITS: the whole neighbourhood at once or worker processes (forwarded only if requested)
+    qits_options = {}
+    if batch_evaluation:
+        qits_options["batch_evaluation"] = True
+    if neighbour_workers is not None:
+        qits_options["neighbour_workers"] = neighbour_workers
+    if qits_options and algorithm != 'qits':
+        raise ValueError(f"Invalid options: {' and '.join(qits_options)} can only be used with 'qits', got '{algorithm}'.")
+    search_options.update(qits_options)
+    # Anytime delivery of the algorithms, best-so-far slot and callback live in this process
+    anytime_options = dict(best_so_far=best_so_far, on_improvement=on_improvement)
+    # Multi-start, time-window decomposition and weekly template are exclusive modes of several searches
+    modes = [name for name, enabled in (("n_starts > 1", n_starts > 1), ("decompose", decompose is not None),
+                                        ("weekly_template", weekly_template)) if enabled]
+    if len(modes) > 1:
+        raise ValueError(f"Invalid options: {' and '.join(modes)} cannot be combined.")
+    if modes and (best_so_far is not None or on_improvement is not None):
+        raise ValueError("Invalid anytime options: best_so_far and on_improvement are only supported for single runs.")
+    # Time windows (None for a monolithic run), iterations of the global polish and optional monolithic comparison
+    decomposition_options = None
+    if decompose is not None:
+        decomposition_options = dict(windows=decompose, polish_iters=polish_iters, compare_monolithic=compare_monolithic)
+    # Weekly template folding of recurring lessons, the exceptions are optimised for template_exception_iters
+    # iterations (their share of max_iters if not given)
+    template_options = None
+    if weekly_template:
+        template_options = dict(exception_iters=template_exception_iters, min_weeks=template_min_weeks)
+
+    # Periodic checkpoints of the search state (single runs only), resumed if the checkpoint exists
+    checkpointer = None
+    if checkpoint_path is not None:
+        if modes:
+            raise ValueError("Invalid checkpoint options: checkpoints are only supported for single runs.")
+        checkpointer = Checkpointer(checkpoint_path, checkpoint_interval)
+    resume_from = load_checkpoint(checkpoint_path) if resume and checkpoint_path is not None and os.path.exists(checkpoint_path) else None
+
+    try:
+        with profiler_context as profiler:
+            optimised_schedule, metrics = _optimise_schedule(
+                schedule_data, lessons_times, start_date, end_date, algorithm, max_iters, tabu_tenure, room_strategy,
+                tabu_attribute, initial_assignments, n_starts, max_workers, seeds, plot, trace_recorder, checkpointer,
+                resume_from, search_options, anytime_options, decomposition_options, template_options, initialiser,
+                repair, room_postpass
+            )
+    finally:
+        if checkpointer is not None:
+            checkpointer.close()
+        if trace_recorder is not None and trace_recorder is not trace:
+            trace_recorder.close()
+    if profiler is not None:
+        metrics["profile"] = profiler.report()  # calls and cumulative time of the instrumented sections
+
+    return optimised_schedule, metrics
+
+def _optimise_schedule(schedule_data, lessons_times, start_date, end_date, algorithm, max_iters, tabu_tenure, room_strategy,
+                       tabu_attribute, initial_assignments, n_starts, max_workers, seeds, plot, trace, checkpoint=None,
+                       resume_from=None, search_options=None, anytime_options=None, decomposition_options=None,
+                       template_options=None, initialiser=None, repair=False, room_postpass=False):
+    search_options = search_options or {}
+    anytime_options = anytime_options or {}
     # Prepare input data for optimisation
-    lessons, teachers, groups, rooms, time_slots, total_slots, all_dates, current_assignments = prepare_input_data(
-        schedule_data, lessons_times, start_date, end_date
+    problem, all_dates, current_assignments = prepare_input_data(
+        schedule_data, lessons_times, start_date, end_date, as_state=True
     )
+
+    # Start from the given assignments (list of tuples or AssignmentState), e.g. a result of a previous run
+    if initial_assignments is not None:
+        if len(initial_assignments) != problem.num_lessons:
+            raise ValueError(f"Invalid initial assignments: expected {problem.num_lessons} assignments, got {len(initial_assignments)}.")
+        current_assignments = AssignmentState.from_assignments(initial_assignments)
+    if resume_from is not None and resume_from[1]["num_lessons"] != problem.num_lessons:
+        raise ValueError(f"Invalid checkpoint: saved for {resume_from[1]['num_lessons']} lessons, expected {problem.num_lessons}.")
         
     # Calculate initial solution cost and penalties
-    initial_cost, initial_penalties = compute_cost(current_assignments, lessons, teachers, groups, rooms, iteration=0)
+    initial_cost, initial_penalties = compute_cost(current_assignments, problem, iteration=0)
+
+    # Place unassigned lessons (and optionally lessons in hard conflicts) greedily before the search
+    initialiser_report = None
+    if initialiser is not None and resume_from is None:
+        current_assignments, _, _, initialiser_report = construct_initial_solution(
+            current_assignments, problem, initialiser=initialiser, room_strategy=room_strategy
+        )
+
+    # Min-conflicts repair of hard conflicts, the search starts from a feasible schedule if the repair finds one
+    repair_report = None
+    if repair and resume_from is None:
+        current_assignments, _, _, repair_report = repair_conflicts(
+            current_assignments, problem, room_strategy=room_strategy, deadline=search_options.get("deadline")
+        )
 
     # Choose the algorithm to use
-    if algorithm == 'ts':
-        opt_algorithm: Callable = tabu_search
-    elif algorithm == 'qits':
-        opt_algorithm: Callable = quantum_inspired_tabu_search
+    opt_algorithm: Callable = select_algorithm(algorithm)
+
+    # Run chosen algorithm (independent runs or time windows in parallel processes for multi-start or decomposition,
+    # representative week and exceptions for the weekly template)
+    multistart_report = None
+    decomposition_report = None
+    template_report = None
+    if template_options is not None:
+        best_assignments, best_cost, best_penalties, template_report = run_weekly_template(
+            current_assignments, problem, all_dates, algorithm=algorithm, max_iters=max_iters, seeds=seeds,
+            tabu_tenure=tabu_tenure, room_strategy=room_strategy, tabu_attribute=tabu_attribute, **template_options,
+            **search_options
+        )
+    elif decomposition_options is not None:
+        best_assignments, best_cost, best_penalties, decomposition_report = run_decomposed(
+            current_assignments, problem, all_dates, algorithm=algorithm, max_iters=max_iters, max_workers=max_workers,
+            seeds=seeds, tabu_tenure=tabu_tenure, room_strategy=room_strategy, tabu_attribute=tabu_attribute,
+            **decomposition_options, **search_options
+        )
+    elif n_starts > 1:
+        best_assignments, best_cost, best_penalties, multistart_report = run_multistart(
+            current_assignments, problem, algorithm=algorithm, n_starts=n_starts, max_workers=max_workers, seeds=seeds,
+            max_iters=max_iters, tabu_tenure=tabu_tenure, room_strategy=room_strategy, tabu_attribute=tabu_attribute,
+            **search_options
+        )
     else:
-        raise ValueError(f"Invalid algorithm: '{algorithm}'. Available algorithms: 'ts' - Tabu Search, 'qits' - Quantum Inspired Tabu Search.")
+        best_assignments, best_cost, best_penalties = opt_algorithm(
+            current_assignments, problem, max_iters, tabu_tenure, room_strategy=room_strategy, tabu_attribute=tabu_attribute,
+            plot=plot, trace=trace, checkpoint=checkpoint, resume_from=resume_from, **search_options, **anytime_options
+        )
 
-    # Run chosen algorithm
-    best_assignments, best_cost, best_penalties = opt_algorithm(
-        current_assignments, lessons, teachers, groups, rooms, 
-        time_slots, total_slots, max_iters, tabu_tenure
-    )
+    # Optimal rooms of every slot for the times found by the search
+    room_report = None
+    if room_postpass:
+        best_assignments, best_cost, best_penalties, room_report = assign_rooms(best_assignments, problem)
     
     # Format the optimised schedule and find performance metrics
     optimised_schedule, metrics = prepare_output_data(
-        best_assignments, lessons, rooms, lessons_times, all_dates,
+        best_assignments, problem, lessons_times, all_dates,
         initial_cost, initial_penalties, best_cost, best_penalties
     )
+    if multistart_report is not None:
+        metrics["multistart"] = multistart_report
+    if decomposition_report is not None:
+        metrics["decomposition"] = decomposition_report
+    if initialiser_report is not None:
+        metrics["initialiser"] = initialiser_report
+    if repair_report is not None:
+        metrics["repair"] = repair_report
+    if room_report is not None:
+        metrics["room_assignment"] = room_report
+    if template_report is not None:
+        metrics["weekly_template"] = template_report
 
     return optimised_schedule, metrics
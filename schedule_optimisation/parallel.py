@@ -0,0 +1,69 @@
+"""
+Parallel Optimisation Module
+
+The Parallel Optimisation Module contains a multi-start mode which runs independent trajectories of
+the chosen algorithm in a pool of processes. The prepared problem is shipped to every worker once
+when the pool starts, each run gets its own seed and the best result wins.
+"""
+
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from schedule_optimisation.algorithms import select_algorithm
+from schedule_optimisation.budget import absolute_deadline
+
+# Prepared problem of the worker process, set once by the pool initializer
+_worker_problem = None
+
+def _init_worker(problem):
+    global _worker_problem
+    _worker_problem = problem
+
+def _run_start(algorithm, seed, algorithm_options):
+    problem, initial_assignments = _worker_problem
+
+    # Seed both random generators used by the algorithms
+    random.seed(seed)
+    np.random.seed(seed)
+
+    start_time = time.perf_counter()
+    best_assignments, best_cost, best_penalties, cost_history = select_algorithm(algorithm)(
+        initial_assignments, problem, plot=False, return_history=True, **algorithm_options
+    )
+    return best_assignments, best_cost, best_penalties, cost_history, time.perf_counter() - start_time
+
+def run_multistart(current_assignments, problem, algorithm='ts', n_starts=4, max_workers=None, seeds=None, **algorithm_options):
+    # Seeds of the runs (drawn from the global random generator if not given)
+    if seeds is None:
+        seeds = [random.randrange(2**32) for _ in range(n_starts)]
+    if len(seeds) != n_starts:
+        raise ValueError(f"Invalid seeds: expected {n_starts} seeds, got {len(seeds)}.")
+    select_algorithm(algorithm)  # validate the algorithm name before starting the workers
+    # Runs queued behind busy workers share the deadline instead of starting a fresh time limit
+    algorithm_options["deadline"] = absolute_deadline(algorithm_options.pop("time_limit", None),
+                                                      algorithm_options.get("deadline"))
+
+    # Run independent trajectories, the problem is sent to each worker once by the initializer
+    wall_start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=((problem, current_assignments),)) as pool:
+        futures = [pool.submit(_run_start, algorithm, seed, algorithm_options) for seed in seeds]
+        results = [future.result() for future in futures]
+    wall_time = time.perf_counter() - wall_start
+
+    # The best result wins (the first run in case of equal costs)
+    best_index = min(range(n_starts), key=lambda i: results[i][1])
+    best_assignments, best_cost, best_penalties, _, _ = results[best_index]
+
+    # Report of all runs, speedup compares the sum of run times (single process) with the wall-clock time
+    run_times = [result[4] for result in results]
+    report = {
+        "seeds": list(seeds),
+        "best_seed": seeds[best_index],
+        "costs": [result[1] for result in results],
+        "cost_histories": [result[3] for result in results],
+        "run_times": run_times,
+        "wall_time": wall_time,
+        "speedup": sum(run_times) / wall_time if wall_time > 0 else None,
+    }
+    return best_assignments, best_cost, best_penalties, report
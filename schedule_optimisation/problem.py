@@ -0,0 +1,89 @@
+"""
+Problem Model Module
+
+The Problem Model Module contains a compact integer model of the scheduling problem. Teachers and
+groups are interned to integer ids, lesson groups are stored in a CSR-style mapping and the lessons of
+every teacher and every group are precomputed as index arrays, so the constraints do not hash strings
+or scan all lessons for every teacher.
+"""
+
+import numpy as np
+from schedule_optimisation.conflict_graph import ConflictGraph
+
+def _csr(rows, num_rows):
+    # CSR offsets and column indices from a list of index lists
+    ptr = np.zeros(num_rows + 1, dtype=np.int32)
+    ptr[1:] = np.cumsum([len(row) for row in rows])
+    indices = np.fromiter((j for row in rows for j in row), dtype=np.int32, count=int(ptr[-1]))
+    return ptr, indices
+
+
+class Problem:
+    __slots__ = (
+        "lessons", "teachers", "groups", "rooms", "time_slots", "total_slots", "num_dates", "num_times",
+        "lesson_teacher", "lesson_groups_ptr", "lesson_groups",
+        "teacher_lessons_ptr", "teacher_lessons", "group_lessons_ptr", "group_lessons",
+        "teacher_of", "groups_of", "conflict_graph",
+    )
+
+    def __init__(self, lessons, rooms, time_slots):
+        self.lessons = lessons                  # original lesson dicts (used for the output only)
+        self.rooms = rooms                      # room names, index is room_idx
+        self.time_slots = time_slots            # all (date_idx, time_idx) slots
+        self.total_slots = len(time_slots)
+        self.num_dates = max((d for d, _ in time_slots), default=-1) + 1
+        self.num_times = max((t for _, t in time_slots), default=-1) + 1
+
+        # Interned teacher and group ids in order of first appearance
+        teacher_ids, group_ids = {}, {}
+        teacher_of, groups_of = [], []
+        for lesson in lessons:
+            teacher_of.append(teacher_ids.setdefault(lesson["lecturer"], len(teacher_ids)))
+            groups_of.append(tuple(group_ids.setdefault(grp, len(group_ids)) for grp in lesson.get("groups", [])))
+        self.teachers = list(teacher_ids)       # teacher names, index is teacher id
+        self.groups = list(group_ids)           # group names, index is group id
+
+        # Python views for per-lesson loops
+        self.teacher_of = tuple(teacher_of)     # teacher id of every lesson
+        self.groups_of = tuple(groups_of)       # group ids of every lesson (repeated groups are kept)
+
+        # Array views: lesson -> teacher, lesson -> groups (CSR), teacher -> lessons (CSR), group -> lessons (CSR)
+        self.lesson_teacher = np.array(teacher_of, dtype=np.int32)
+        self.lesson_groups_ptr, self.lesson_groups = _csr(groups_of, len(lessons))
+        teacher_rows = [[] for _ in self.teachers]
+        group_rows = [[] for _ in self.groups]
+        for i, (teacher, grp_ids) in enumerate(zip(teacher_of, groups_of)):
+            teacher_rows[teacher].append(i)
+            for grp in dict.fromkeys(grp_ids):
+                group_rows[grp].append(i)
+        self.teacher_lessons_ptr, self.teacher_lessons = _csr(teacher_rows, len(self.teachers))
+        self.group_lessons_ptr, self.group_lessons = _csr(group_rows, len(self.groups))
+
+        # Lessons sharing a teacher or a group (built once, the lessons do not change during the search)
+        self.conflict_graph = ConflictGraph(self)
+
+    @property
+    def num_lessons(self):
+        return len(self.teacher_of)
+
+    @property
+    def num_teachers(self):
+        return len(self.teachers)
+
+    @property
+    def num_groups(self):
+        return len(self.groups)
+
+    @property
+    def num_rooms(self):
+        return len(self.rooms)
+
+    @property
+    def num_slots(self):
+        return self.num_dates * self.num_times
+
+    def lessons_of_teacher(self, teacher):
+        return self.teacher_lessons[self.teacher_lessons_ptr[teacher]:self.teacher_lessons_ptr[teacher + 1]]
+
+    def lessons_of_group(self, grp):
+        return self.group_lessons[self.group_lessons_ptr[grp]:self.group_lessons_ptr[grp + 1]]
@@ -0,0 +1,82 @@
+"""
+Profiling Module
+
+The Profiling Module contains an opt-in instrumentation layer for the hot paths of the optimisation.
+Constraint functions, move generation, neighbour evaluation, copying and tabu checks record their call
+counts and cumulative time in the active profiler. Profiling is enabled with the `profiling` context
+manager (or the SCHEDULE_OPTIMISATION_PROFILE environment variable in `optimise_schedule`); while it is
+disabled every hook is a single check of the active profiler.
+"""
+
+import functools
+import json
+import os
+from contextlib import contextmanager
+from time import perf_counter
+
+PROFILE_ENV_VAR = "SCHEDULE_OPTIMISATION_PROFILE"  # path of the JSON dump (or "1" to profile without a dump)
+
+# Profiler of the current process (None while profiling is disabled)
+_active = None
+
+class Profiler:
+    def __init__(self):
+        self.stats = {}  # {section name: [calls, seconds]}
+
+    def add(self, name, seconds, calls=1):
+        entry = self.stats.get(name)
+        if entry is None:
+            self.stats[name] = [calls, seconds]
+        else:
+            entry[0] += calls
+            entry[1] += seconds
+
+    def report(self):
+        # Sections sorted by cumulative time
+        return {name: {"calls": calls, "seconds": seconds}
+                for name, (calls, seconds) in sorted(self.stats.items(), key=lambda item: -item[1][1])}
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+
+
+def active_profiler():
+    return _active
+
+def profile_path_from_env():
+    # JSON dump path from the environment switch, None if profiling is not switched on
+    value = os.environ.get(PROFILE_ENV_VAR, "").strip()
+    if not value or value == "0":
+        return None
+    return value
+
+@contextmanager
+def profiling(path=None):
+    # Enable profiling inside the block and optionally dump the breakdown as JSON on exit
+    global _active
+    previous = _active
+    profiler = Profiler()
+    _active = profiler
+    try:
+        yield profiler
+    finally:
+        _active = previous
+        if path is not None and path != "1":
+            profiler.dump(path)
+
+def profiled(name):
+    # Decorator recording the calls of a function in the active profiler
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _active
+            if profiler is None:
+                return func(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.add(name, perf_counter() - start)
+        return wrapper
+    return decorator
@@ -0,0 +1,75 @@
+"""
+Feasibility Repair Module
+
+The Feasibility Repair Module contains a min-conflicts repair phase which runs before the tabu search
+algorithms. While hard conflicts exist the cost is flat in the soft constraints, so random neighbours
+rarely lead out of the plateau. The repair repeatedly picks a lesson in a hard conflict and moves it
+to the time slot (with a free room) where it conflicts with the fewest lessons, ties broken at random.
+A short tabu memory keeps lessons from returning to the slots they left, so the repair does not cycle.
+The repair stops as soon as no lesson is in a hard conflict.
+"""
+
+import random
+import time
+from schedule_optimisation.engine import SearchEngine
+from schedule_optimisation.constants import REPAIR_MAX_ITERS, REPAIR_TABU_TENURE
+
+STOP_FEASIBLE = "feasible"
+
+class MinConflictsRepair(SearchEngine):
+    name = "repair"
+    track_candidates = True
+
+    def select_move(self, iteration):
+        # Move of a random lesson in a hard conflict to the slot with the fewest conflicting lessons
+        evaluator = self.evaluator
+        if not len(evaluator.conflicted):
+            self.stop(STOP_FEASIBLE)
+            return None
+        lesson_idx = evaluator.conflicted.sample()
+        old_assign = self.current_assignments[lesson_idx]
+        best_conflicts = None
+        best_moves = []
+        for d_new, t_new in self.problem.time_slots:
+            if (d_new, t_new) == old_assign[:2]:
+                continue
+            new_room_idx = self.occupancy.choose_room(d_new, t_new, strategy=self.room_strategy, moving_assign=old_assign)
+            if new_room_idx is None:
+                continue
+            move = ("move", lesson_idx, old_assign, (d_new, t_new, new_room_idx))
+            num_conflicts = len(evaluator.conflicting_lessons(lesson_idx, move[3]))
+            # Tabu moves are allowed only if the lesson becomes conflict-free (aspiration)
+            if num_conflicts and self.tabu_memory.is_tabu(move, iteration):
+                continue
+            if best_conflicts is None or num_conflicts < best_conflicts:
+                best_conflicts, best_moves = num_conflicts, [move]
+            elif num_conflicts == best_conflicts:
+                best_moves.append(move)
+        if not best_moves:
+            return None
+        move = random.choice(best_moves)
+        neighbour_cost, neighbour_penalties = evaluator.evaluate(move)
+        return move, neighbour_cost, neighbour_penalties
+
+
+def repair_conflicts(current_assignments, problem, max_iters=REPAIR_MAX_ITERS, tabu_tenure=REPAIR_TABU_TENURE,
+                     room_strategy="first", time_limit=None, deadline=None):
+    # Repair hard conflicts before the search, returns the repaired assignments, their cost and penalties and a report
+    start_time = time.perf_counter()
+    engine = MinConflictsRepair(current_assignments, problem, max_iters, tabu_tenure, room_strategy=room_strategy,
+                                tabu_attribute="lesson_slot", time_limit=time_limit, deadline=deadline)
+    initial_cost = engine.current_cost
+    initial_conflicted = len(engine.evaluator.conflicted)
+    with engine:
+        best_assignments, best_cost, best_penalties = engine.run()
+
+    report = {
+        "iterations": engine.iteration,
+        "stop_reason": engine.stop_reason,
+        "initial_cost": initial_cost,
+        "cost": best_cost,
+        "initial_conflicted_lessons": initial_conflicted,
+        "feasible": not any(best_penalties["hard_conflicts"].values()),
+        "run_time": time.perf_counter() - start_time,
+    }
+    return best_assignments, best_cost, best_penalties, report
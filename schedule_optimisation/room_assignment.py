@@ -0,0 +1,147 @@
+"""
+Room Assignment Module
+
+The Room Assignment Module contains a room sub-solver for fixed time assignments. The rooms of the
+lessons in one time slot are allocated exactly as a min-cost assignment problem (Hungarian algorithm):
+giving a lesson a room costs the teacher movements to and from the lessons of the same teacher in the
+neighbouring time slots and the room reuse of the teacher in the other slots, and every lesson of the
+slot gets a different room. The result is accepted only if the violations of the whole schedule drop.
+The sub-solver runs as a post-pass over all slots after the search or as an inner step on the slots
+changed by every accepted move, so the search itself mostly has to find the times.
+"""
+
+import time
+import numpy as np
+from schedule_optimisation.cost import compute_cost
+from schedule_optimisation.evaluator import CostEvaluator, HARD_METRICS, SOFT_WEIGHTS
+from schedule_optimisation.occupancy import SlotOccupancy
+from schedule_optimisation.state import AssignmentState
+from schedule_optimisation.weights import TEACHER_MOVE_BETWEEN_CONSECUTIVE, TEACHER_SAME_ROOM_FOR_DIFF
+from schedule_optimisation.constants import ROOM_ASSIGNMENT_MAX_PASSES
+
+def min_cost_assignment(cost):
+    # Hungarian algorithm with row and column potentials for a cost matrix with rows <= columns,
+    # returns the column assigned to every row
+    cost = np.asarray(cost, dtype=np.float64)
+    num_rows, num_cols = cost.shape
+    u = np.zeros(num_rows + 1)
+    v = np.zeros(num_cols + 1)
+    row_of_col = np.zeros(num_cols + 1, dtype=np.int64)  # 1-based row matched to every column (0 for none)
+    way = np.zeros(num_cols + 1, dtype=np.int64)
+    for row in range(1, num_rows + 1):
+        row_of_col[0] = row
+        col = 0
+        min_reduced = np.full(num_cols + 1, np.inf)
+        used = np.zeros(num_cols + 1, dtype=bool)
+        # Grow the alternating tree from the new row until a free column is reached
+        while True:
+            used[col] = True
+            current_row = row_of_col[col]
+            free = ~used[1:]
+            reduced = cost[current_row - 1] - u[current_row] - v[1:]
+            better = free & (reduced < min_reduced[1:])
+            min_reduced[1:][better] = reduced[better]
+            way[1:][better] = col
+            candidates = np.where(free, min_reduced[1:], np.inf)
+            next_col = int(np.argmin(candidates)) + 1
+            delta = candidates[next_col - 1]
+            used_cols = np.nonzero(used)[0]
+            u[row_of_col[used_cols]] += delta
+            v[used_cols] -= delta
+            min_reduced[1:][free] -= delta
+            col = next_col
+            if row_of_col[col] == 0:
+                break
+        # Augment along the path
+        while col:
+            prev_col = way[col]
+            row_of_col[col] = row_of_col[prev_col]
+            col = prev_col
+    assignment = np.empty(num_rows, dtype=np.int64)
+    for col in range(1, num_cols + 1):
+        if row_of_col[col]:
+            assignment[row_of_col[col] - 1] = col - 1
+    return assignment
+
+def slot_room_costs(evaluator, problem, date_idx, time_idx, lessons):
+    # Cost of every room for every lesson of the slot with the other slots fixed: teacher movements between
+    # consecutive classes and reuse of the rooms the teacher uses in other slots
+    costs = np.zeros((len(lessons), problem.num_rooms))
+    slot_rooms = {}  # {teacher: {room_idx: count}} of the lessons of the slot
+    for i in lessons:
+        rooms = slot_rooms.setdefault(evaluator.lesson_teacher[i], {})
+        room_idx = evaluator.assignments[i][2]
+        rooms[room_idx] = rooms.get(room_idx, 0) + 1
+    for row, i in enumerate(lessons):
+        teacher = evaluator.lesson_teacher[i]
+        for other_time, _, other_room in evaluator.teacher_day.get((teacher, date_idx), ()):
+            if abs(other_time - time_idx) == 1 and other_room is not None:
+                costs[row] += TEACHER_MOVE_BETWEEN_CONSECUTIVE
+                costs[row, other_room] -= TEACHER_MOVE_BETWEEN_CONSECUTIVE
+        for room_idx, count in evaluator.teacher_rooms.get(teacher, {}).items():
+            if count > slot_rooms[teacher].get(room_idx, 0):
+                costs[row, room_idx] += TEACHER_SAME_ROOM_FOR_DIFF
+    return costs
+
+def _violation_key(evaluator):
+    # Hard conflicts first, then the weighted soft penalties (also while hard conflicts exist)
+    viol = evaluator.violations
+    return sum(viol[name] for name in HARD_METRICS), sum(viol[name] * weight for name, weight in SOFT_WEIGHTS.items())
+
+def reassign_slot_rooms(date_idx, time_idx, state, evaluator, occupancy, problem):
+    # Optimal rooms of the lessons of the slot, the room moves are applied to the state, evaluator and occupancy
+    # if the violations drop, returns the applied moves
+    lessons = [i for i in evaluator.slot_lessons.get((date_idx, time_idx), ()) if state[i][2] is not None]
+    if not lessons or len(lessons) > problem.num_rooms:
+        return []
+    rooms = min_cost_assignment(slot_room_costs(evaluator, problem, date_idx, time_idx, lessons))
+    moves = [("move", i, state[i], (date_idx, time_idx, int(room_idx)))
+             for i, room_idx in zip(lessons, rooms) if state[i][2] != room_idx]
+    if not moves:
+        return []
+
+    old_key = _violation_key(evaluator)
+    for move in moves:
+        state.apply(move)
+        evaluator.commit(move)
+        occupancy.apply(move)
+    if _violation_key(evaluator) < old_key:
+        return moves
+    for _, i, old_assign, new_assign in reversed(moves):
+        move = ("move", i, new_assign, old_assign)
+        state.apply(move)
+        evaluator.commit(move)
+        occupancy.apply(move)
+    return []
+
+def assign_rooms(assignments, problem, max_passes=ROOM_ASSIGNMENT_MAX_PASSES):
+    # Post-pass: optimal rooms of all slots, repeated while a pass changes rooms (slots share teachers)
+    start_time = time.perf_counter()
+    state = AssignmentState.from_assignments(assignments)
+    initial_cost, _ = compute_cost(state, problem)
+    evaluator = CostEvaluator(state, problem)
+    occupancy = SlotOccupancy(state, problem)
+    passes = slots_changed = rooms_changed = 0
+    while passes < max_passes:
+        passes += 1
+        changed = 0
+        for date_idx, time_idx in problem.time_slots:
+            moves = reassign_slot_rooms(date_idx, time_idx, state, evaluator, occupancy, problem)
+            if moves:
+                changed += 1
+                rooms_changed += len(moves)
+        slots_changed += changed
+        if not changed:
+            break
+
+    cost, penalties = evaluator.cost()
+    report = {
+        "passes": passes,
+        "slots_changed": slots_changed,
+        "rooms_changed": rooms_changed,
+        "initial_cost": initial_cost,
+        "cost": cost,
+        "cost_reduction": initial_cost - cost,
+        "run_time": time.perf_counter() - start_time,
+    }
+    return state, cost, penalties, report
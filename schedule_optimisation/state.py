@@ -0,0 +1,88 @@
+"""
+Assignment State Module
+
+The Assignment State Module contains a compact array-backed representation of the lesson assignments.
+Each lesson has a (date_index, time_index, room_index) triple stored in NumPy int32 arrays, where
+UNASSIGNED marks a lesson without a valid assignment. Moves are applied and undone in place and
+snapshots are copied into preallocated buffers instead of deep copying lists of tuples.
+"""
+
+import numpy as np
+
+UNASSIGNED = -1  # sentinel for lessons without assignment (or without room)
+
+class AssignmentState:
+    def __init__(self, data):
+        # Data is int32 array with shape (3, number of lessons): rows are dates, times and rooms
+        self.data = data
+        self.dates, self.times, self.rooms = data
+
+    @classmethod
+    def empty(cls, num_lessons):
+        return cls(np.full((3, num_lessons), UNASSIGNED, dtype=np.int32))
+
+    @classmethod
+    def from_assignments(cls, assignments):
+        # Create state from a list of (date_idx, time_idx, room_idx) tuples or None
+        if isinstance(assignments, AssignmentState):
+            return assignments.copy()
+        state = cls.empty(len(assignments))
+        for i, assign in enumerate(assignments):
+            state[i] = assign
+        return state
+
+    def __len__(self):
+        return self.data.shape[1]
+
+    def __getitem__(self, i):
+        date_idx = int(self.dates[i])
+        if date_idx == UNASSIGNED:
+            return None
+        room_idx = int(self.rooms[i])
+        return (date_idx, int(self.times[i]), room_idx if room_idx != UNASSIGNED else None)
+
+    def __setitem__(self, i, assign):
+        if assign is None:
+            self.data[:, i] = UNASSIGNED
+        else:
+            date_idx, time_idx, room_idx = assign
+            self.data[:, i] = (date_idx, time_idx, room_idx if room_idx is not None else UNASSIGNED)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __eq__(self, other):
+        if isinstance(other, AssignmentState):
+            return np.array_equal(self.data, other.data)
+        return self.to_list() == list(other)
+
+    def to_list(self):
+        return list(self)
+
+    def apply(self, move):
+        # Apply a "move" or "swap" in place
+        if move[0] == "move":
+            _, lesson_idx, _, new_asgn = move
+            self[lesson_idx] = new_asgn
+        elif move[0] == "swap":
+            _, a_idx, b_idx, _, _ = move
+            self.data[:, [a_idx, b_idx]] = self.data[:, [b_idx, a_idx]]
+
+    def undo(self, move):
+        # Revert a move applied by apply()
+        if move[0] == "move":
+            _, lesson_idx, old_asgn, _ = move
+            self[lesson_idx] = old_asgn
+        elif move[0] == "swap":
+            self.apply(move)  # swap is its own inverse
+
+    def copy(self):
+        return AssignmentState(self.data.copy())
+
+    def snapshot(self, buffer=None):
+        # Copy the state into a preallocated buffer state (allocated on first use)
+        if buffer is None:
+            return self.copy()
+        np.copyto(buffer.data, self.data)
+        return buffer
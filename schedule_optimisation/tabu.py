@@ -0,0 +1,192 @@
+"""
+Tabu Memory Module
+
+The Tabu Memory Module contains the short-term memory shared by the tabu search algorithms. Tabu
+attributes of the performed moves are stored with their expiry iteration in preallocated tables (a
+NumPy array for lessons and set-associative hashed tables for lesson-slot and lesson-pair attributes),
+so checks and inserts are O(1). Expired entries are reused, a live entry is never overwritten (a full
+bucket doubles the table instead) and the memory does not grow with the number of iterations. The
+solution tabu keeps the hashes of recently visited solutions in the same kind of table and forbids
+revisiting them.
+"""
+
+import numpy as np
+from schedule_optimisation.constants import TABU_TABLE_MIN_SIZE, TABU_TABLE_WAYS
+
+# Tabu attributes: what is remembered about a performed move
+#   "lesson_slot" - lessons may not return to the slots they left (moves and swaps)
+#   "lesson_pair" - lessons may not return to the slots they left, swapped pairs may not be swapped again
+#   "lesson"      - moved lessons may not be moved again
+TABU_ATTRIBUTES = ("lesson_slot", "lesson_pair", "lesson")
+
+_HASH_MULTIPLIER = 0x9E3779B97F4A7C15  # Fibonacci hashing of the integer keys
+_EMPTY = -1
+
+class _HashedExpiryTable:
+    def __init__(self, size, ways=TABU_TABLE_WAYS):
+        # Set-associative table: a power of two of buckets with the keys and expiry iterations of up to ways entries
+        self.ways = ways
+        self._allocate(max(int(max(size // ways, 1) - 1).bit_length(), 1))
+
+    def _allocate(self, bits):
+        self.bits = bits
+        self.keys = [[_EMPTY] * self.ways for _ in range(1 << bits)]
+        self.expiry = [[_EMPTY] * self.ways for _ in range(1 << bits)]
+
+    def _bucket(self, key):
+        return ((key * _HASH_MULTIPLIER) & 0xFFFFFFFFFFFFFFFF) >> (64 - self.bits)
+
+    def get(self, key):
+        b = self._bucket(key)
+        keys = self.keys[b]
+        return self.expiry[b][keys.index(key)] if key in keys else _EMPTY
+
+    def set(self, key, expiry, iteration):
+        # The entry of the key or an entry expired at the iteration is replaced, never a live entry of another key
+        b = self._bucket(key)
+        keys, expiries = self.keys[b], self.expiry[b]
+        if key in keys:
+            expiries[keys.index(key)] = expiry
+            return
+        for j in range(self.ways):
+            if expiries[j] <= iteration:
+                keys[j] = key
+                expiries[j] = expiry
+                return
+        self._grow(iteration)
+        self.set(key, expiry, iteration)
+
+    def _grow(self, iteration):
+        # All entries of the bucket are live: double the number of buckets and keep the live entries
+        live = [(key, expiry) for keys, expiries in zip(self.keys, self.expiry)
+                for key, expiry in zip(keys, expiries) if expiry > iteration]
+        self._allocate(self.bits + 1)
+        for key, expiry in live:
+            self.set(key, expiry, iteration)
+
+    def state(self, prefix=""):
+        # Arrays of the table (for checkpoints)
+        return {f"{prefix}keys": np.array(self.keys, dtype=np.int64), f"{prefix}expiry": np.array(self.expiry, dtype=np.int64)}
+
+    def load_state(self, arrays, prefix=""):
+        # Restore the table from arrays returned by state() (the table keeps its saved size)
+        keys = arrays[f"{prefix}keys"]
+        self.bits = max(int(len(keys) - 1).bit_length(), 1)
+        self.ways = keys.shape[1]
+        self.keys = keys.astype(np.int64).tolist()
+        self.expiry = arrays[f"{prefix}expiry"].astype(np.int64).tolist()
+
+    def clear(self):
+        self._allocate(self.bits)
+
+
+class TabuMemory:
+    def __init__(self, problem, tabu_tenure, attribute="lesson_pair", table_size=None):
+        if attribute not in TABU_ATTRIBUTES:
+            raise ValueError(f"Invalid tabu attribute: {attribute}. Available attributes: {', '.join(TABU_ATTRIBUTES)}.")
+        self.attribute = attribute
+        self.tabu_tenure = tabu_tenure
+        self.num_lessons = problem.num_lessons
+        self.num_times = problem.num_times
+        self.unassigned_slot = problem.num_slots  # slot id of lessons without assignment
+
+        # At most two entries are added per iteration and they live for tabu_tenure iterations
+        if table_size is None:
+            table_size = max(TABU_TABLE_MIN_SIZE, 16 * tabu_tenure)
+        self.lesson_expiry = np.full(problem.num_lessons, _EMPTY, dtype=np.int64) if attribute == "lesson" else None
+        self.slot_table = _HashedExpiryTable(table_size) if attribute != "lesson" else None
+        self.pair_table = _HashedExpiryTable(table_size) if attribute == "lesson_pair" else None
+
+    def _slot_key(self, lesson_idx, assign):
+        slot = assign[0] * self.num_times + assign[1] if assign is not None else self.unassigned_slot
+        return lesson_idx * (self.unassigned_slot + 1) + slot
+
+    def _pair_key(self, a_idx, b_idx):
+        if a_idx > b_idx:
+            a_idx, b_idx = b_idx, a_idx
+        return a_idx * self.num_lessons + b_idx
+
+    def _lesson_slots(self, move):
+        # (lesson, assignment) pairs of the move: where the lessons go to, and where they leave from
+        if move[0] == "move":
+            _, lesson_idx, old_assign, new_assign = move
+            return ((lesson_idx, new_assign),), ((lesson_idx, old_assign),)
+        _, a_idx, b_idx, assign_a, assign_b = move
+        return ((a_idx, assign_b), (b_idx, assign_a)), ((a_idx, assign_a), (b_idx, assign_b))
+
+    def is_tabu(self, move, iteration):
+        if self.attribute == "lesson":
+            lessons = (move[1],) if move[0] == "move" else (move[1], move[2])
+            return any(self.lesson_expiry[i] > iteration for i in lessons)
+        if move[0] == "swap" and self.pair_table is not None:
+            return self.pair_table.get(self._pair_key(move[1], move[2])) > iteration
+        targets, _ = self._lesson_slots(move)
+        return any(self.slot_table.get(self._slot_key(i, assign)) > iteration for i, assign in targets)
+
+    def add(self, move, iteration):
+        # Remember the performed move until iteration + tabu_tenure
+        expiry = iteration + self.tabu_tenure
+        if self.attribute == "lesson":
+            lessons = (move[1],) if move[0] == "move" else (move[1], move[2])
+            for i in lessons:
+                self.lesson_expiry[i] = expiry
+        elif move[0] == "swap" and self.pair_table is not None:
+            self.pair_table.set(self._pair_key(move[1], move[2]), expiry, iteration)
+        else:
+            _, sources = self._lesson_slots(move)
+            for i, assign in sources:
+                self.slot_table.set(self._slot_key(i, assign), expiry, iteration)
+
+    def state(self):
+        # Arrays of the memory (for checkpoints)
+        arrays = {}
+        if self.lesson_expiry is not None:
+            arrays["lesson_expiry"] = self.lesson_expiry
+        for name, table in (("slot", self.slot_table), ("pair", self.pair_table)):
+            if table is not None:
+                arrays.update(table.state(prefix=f"{name}_"))
+        return arrays
+
+    def load_state(self, arrays):
+        # Restore the memory from arrays returned by state() (tables keep their saved size)
+        if self.lesson_expiry is not None:
+            self.lesson_expiry = arrays["lesson_expiry"].astype(np.int64)
+        for name, table in (("slot", self.slot_table), ("pair", self.pair_table)):
+            if table is not None:
+                table.load_state(arrays, prefix=f"{name}_")
+
+    def clear(self):
+        if self.lesson_expiry is not None:
+            self.lesson_expiry.fill(_EMPTY)
+        for table in (self.slot_table, self.pair_table):
+            if table is not None:
+                table.clear()
+
+
+class SolutionTabu:
+    def __init__(self, tabu_tenure, table_size=None):
+        # Hashes of the recently visited solutions (one entry is added per iteration), revisiting them is tabu
+        # whatever the move attributes are
+        if table_size is None:
+            table_size = max(TABU_TABLE_MIN_SIZE, 16 * tabu_tenure)
+        self.tabu_tenure = tabu_tenure
+        self.table = _HashedExpiryTable(table_size)
+
+    @staticmethod
+    def _key(state_hash):
+        # Unsigned 64-bit hashes are stored as signed int64 keys
+        return state_hash - (1 << 64) if state_hash >= 1 << 63 else state_hash
+
+    def is_tabu(self, state_hash, iteration):
+        return self.table.get(self._key(state_hash)) > iteration
+
+    def add(self, state_hash, iteration):
+        self.table.set(self._key(state_hash), iteration + self.tabu_tenure, iteration)
+
+    def state(self):
+        # Arrays of the table (for checkpoints)
+        return self.table.state()
+
+    def load_state(self, arrays):
+        # Restore the table from arrays returned by state() (the table keeps its saved size)
+        self.table.load_state(arrays)
@@ -0,0 +1,228 @@
+"""
+Weekly Template Module
+
+The Weekly Template Module contains a folding mode for timetables which repeat every week. Lessons of
+the same lecturer, subject and groups on the same weekday in different weeks form a recurring series.
+Every series becomes one lesson of a representative week and every lesson which does not recur stays
+a lesson of its own week in it. Teachers and groups of the representative week are taken per week, so
+a clash-free representative week expands without clashes. The representative week is repaired and
+optimised as a small problem and its result is expanded to all occurrences across the date range.
+Unassigned lessons and occurrences which cannot follow the template are exceptions and are optimised
+individually with the other lessons fixed. Both searches get the share of the iterations matching
+their share of the lessons, the template result is returned only if it beats a monolithic run of the
+same algorithm and all phases stop at one deadline.
+"""
+
+import math
+import random
+import time
+from collections import Counter
+from datetime import datetime
+import numpy as np
+from schedule_optimisation.algorithms import select_algorithm
+from schedule_optimisation.budget import absolute_deadline
+from schedule_optimisation.cost import compute_cost
+from schedule_optimisation.problem import Problem
+from schedule_optimisation.repair import repair_conflicts
+from schedule_optimisation.state import AssignmentState
+from schedule_optimisation.constants import TEMPLATE_MIN_WEEKS
+
+def _series_key(lesson, weekday):
+    # Lessons of one series: same lecturer, subject, groups and weekday
+    return lesson.get("lecturer"), lesson.get("subject"), tuple(sorted(lesson.get("groups", []))), weekday
+
+def _template_lesson(lesson, weeks):
+    # Lesson of the representative week: series only clash in the weeks they share, so the lecturer and the groups
+    # are taken per week of the series (a clash-free template expands without clashes between the series)
+    lecturer = lesson.get("lecturer")
+    groups = [(grp, week) for grp in lesson.get("groups", []) for week in weeks]
+    groups.extend((("lecturer", lecturer), week) for week in weeks)
+    return dict(lesson, lecturer=(lecturer, weeks), groups=groups)
+
+
+class WeeklyTemplate:
+    def __init__(self, problem, assignments, all_dates, min_weeks=TEMPLATE_MIN_WEEKS):
+        self.problem = problem
+        calendar = [datetime.strptime(date, "%Y-%m-%d").isocalendar() for date in all_dates]
+        self.week_of_date = [(year, week) for year, week, _ in calendar]
+        self.weekday_of_date = [weekday - 1 for _, _, weekday in calendar]  # monday=0, ..., friday=4
+        self.date_of_week_day = {(self.week_of_date[d], self.weekday_of_date[d]): d for d in range(len(all_dates))}
+
+        # Occurrences of every key in every week (repeated lessons of one key in a week form parallel series)
+        occurrences = {}
+        exceptions = []
+        for i in range(problem.num_lessons):
+            assign = assignments[i]
+            if assign is None:
+                exceptions.append(i)
+                continue
+            date_idx = assign[0]
+            key = _series_key(problem.lessons[i], self.weekday_of_date[date_idx])
+            occurrences.setdefault(key, {}).setdefault(self.week_of_date[date_idx], []).append(i)
+
+        # Series are keys occurring in at least min_weeks weeks, lessons of the other keys do not recur
+        self.series = []  # lesson indices of every series in date order
+        for key, weeks in occurrences.items():
+            if len(weeks) < min_weeks:
+                exceptions.extend(i for lessons in weeks.values() for i in lessons)
+                continue
+            for k in range(max(len(lessons) for lessons in weeks.values())):
+                series = [sorted(lessons, key=lambda i: assignments[i][:2])[k] for lessons in weeks.values() if k < len(lessons)]
+                if len(series) >= min_weeks:
+                    self.series.append(sorted(series, key=lambda i: assignments[i][0]))
+                else:
+                    exceptions.extend(series)
+        self.exceptions = sorted(exceptions)  # unassigned and non-recurring lessons
+
+        # Representative week: one lesson per series and per assigned non-recurring lesson, dates are weekdays and
+        # the times and rooms are the most common ones of the occurrences
+        self.template_series = self.series + [[i] for i in self.exceptions if assignments[i] is not None]
+        num_weekdays = max(self.weekday_of_date, default=-1) + 1
+        time_slots = [(day, t) for day in range(num_weekdays) for t in range(problem.num_times)]
+        template_lessons = [_template_lesson(problem.lessons[series[0]],
+                                             tuple(sorted({self.week_of_date[assignments[i][0]] for i in series})))
+                            for series in self.template_series]
+        self.template_problem = Problem(template_lessons, problem.rooms, time_slots)
+        self.template_assignments = AssignmentState.empty(len(self.template_series))
+        for s, series in enumerate(self.template_series):
+            time_idx, room_idx = Counter(assignments[i][1:] for i in series).most_common(1)[0][0]
+            self.template_assignments[s] = (self.weekday_of_date[assignments[series[0]][0]], time_idx, room_idx)
+
+    @property
+    def num_folded_lessons(self):
+        return sum(len(series) for series in self.series)
+
+    def expand(self, template_assignments, assignments):
+        # Assignments of the whole range with every occurrence in the slot and room of its series,
+        # returns the expanded assignments and the occurrences which cannot follow the template (new exceptions)
+        expanded = AssignmentState.from_assignments(assignments)
+        detached = []
+        for s, series in enumerate(self.template_series):
+            weekday, time_idx, room_idx = template_assignments[s]
+            for i in series:
+                date_idx = self.date_of_week_day.get((self.week_of_date[expanded[i][0]], weekday))
+                if date_idx is None:
+                    detached.append(i)  # the template weekday is outside the date range in this week
+                else:
+                    expanded[i] = (date_idx, time_idx, room_idx)
+        return expanded, detached
+
+    def clashing_occurrences(self, expanded):
+        # Template lessons sharing a teacher, a group or a room with another lesson of their slot after the expansion
+        # (none for a clash-free template), only the conflict graph neighbours among the lessons of the slot are visited
+        slot_lessons = {}
+        room_use = Counter()
+        for i in range(len(expanded)):
+            assign = expanded[i]
+            if assign is not None:
+                slot_lessons.setdefault(assign[:2], []).append(i)
+                if assign[2] is not None:
+                    room_use[assign] += 1
+        graph = self.problem.conflict_graph
+        clashing = []
+        for series in self.template_series:
+            for i in series:
+                assign = expanded[i]
+                others = [j for j in slot_lessons[assign[:2]] if j != i]
+                if room_use[assign] > 1 or len(graph.adjacent_in(i, others)):
+                    clashing.append(i)
+        return clashing
+
+
+def run_weekly_template(current_assignments, problem, all_dates, algorithm='ts', max_iters=1000, exception_iters=None,
+                        min_weeks=TEMPLATE_MIN_WEEKS, seeds=None, **algorithm_options):
+    current_assignments = AssignmentState.from_assignments(current_assignments)
+    template = WeeklyTemplate(problem, current_assignments, all_dates, min_weeks)
+    opt_algorithm = select_algorithm(algorithm)
+    room_strategy = algorithm_options.get("room_strategy", "first")
+    # One deadline for all phases instead of a fresh time limit for the template, the exceptions and the baseline
+    deadline = absolute_deadline(algorithm_options.pop("time_limit", None), algorithm_options.get("deadline"))
+    algorithm_options["deadline"] = deadline
+
+    # Seeds of the template, exception and monolithic runs (drawn from the global random generator if not given)
+    if seeds is None:
+        seeds = [random.randrange(2**32) for _ in range(3)]
+    if len(seeds) != 3:
+        raise ValueError(f"Invalid seeds: expected 3 seeds (template, exceptions and monolithic), got {len(seeds)}.")
+
+    # Repair the representative week, then optimise it from the repaired schedule (the search removes the conflicts
+    # left by the repair) for the share of the iterations of its share of the lessons, only a clash-free
+    # representative week is expanded
+    template_iters = math.ceil(max_iters * len(template.template_series) / max(1, problem.num_lessons))
+    start_time = time.perf_counter()
+    template_assignments = template.template_assignments
+    template_initial_cost = template_best_cost = None
+    template_feasible = True
+    if template.template_series:
+        random.seed(seeds[0])
+        np.random.seed(seeds[0])
+        template_initial_cost, _ = compute_cost(template_assignments, template.template_problem)
+        template_assignments, _, _, _ = repair_conflicts(
+            template_assignments, template.template_problem, room_strategy=room_strategy, deadline=deadline
+        )
+        template_assignments, template_best_cost, template_penalties = opt_algorithm(
+            template_assignments, template.template_problem, plot=False, **dict(algorithm_options, max_iters=template_iters)
+        )
+        template_feasible = not any(template_penalties["hard_conflicts"].values())
+    template_time = time.perf_counter() - start_time
+
+    # Expand the clash-free representative week to the whole range and optimise the exceptions individually with the
+    # other lessons fixed: unassigned lessons and occurrences which cannot follow the template or still clash. The
+    # exceptions get the share of the iterations of their share of the lessons by default.
+    start_time = time.perf_counter()
+    exceptions = []
+    expanded_cost = template_cost = None
+    if template_feasible:
+        expanded, detached = template.expand(template_assignments, current_assignments)
+        expanded_cost, expanded_penalties = compute_cost(expanded, problem)
+        unassigned = [i for i in template.exceptions if current_assignments[i] is None]
+        exceptions = sorted(set(unassigned + detached + template.clashing_occurrences(expanded)))
+        if exception_iters is None:
+            exception_iters = math.ceil(max_iters * len(exceptions) / problem.num_lessons)
+        template_result = expanded, expanded_cost, expanded_penalties
+        if exceptions and exception_iters > 0:
+            random.seed(seeds[1])
+            np.random.seed(seeds[1])
+            template_result = opt_algorithm(expanded, problem, plot=False, movable_lessons=exceptions,
+                                            **dict(algorithm_options, max_iters=exception_iters))
+        template_cost = template_result[1]
+    exceptions_time = time.perf_counter() - start_time
+
+    # Monolithic run of the same algorithm: the template result is returned only if it is better
+    start_time = time.perf_counter()
+    random.seed(seeds[2])
+    np.random.seed(seeds[2])
+    best_assignments, best_cost, best_penalties = opt_algorithm(
+        current_assignments, problem, plot=False, **dict(algorithm_options, max_iters=max_iters)
+    )
+    monolithic_cost = best_cost
+    monolithic_time = time.perf_counter() - start_time
+    returned = "monolithic"
+    if template_cost is not None and template_cost < monolithic_cost:
+        best_assignments, best_cost, best_penalties = template_result
+        returned = "template"
+
+    search_lessons = len(template.template_series) + len(exceptions)
+    report = {
+        "weeks": len(set(template.week_of_date)),
+        "series": len(template.series),
+        "folded_lessons": template.num_folded_lessons,
+        "exceptions": len(exceptions),
+        "search_lessons": search_lessons,  # lessons searched instead of all lessons
+        "reduction": problem.num_lessons / max(1, search_lessons),
+        "seeds": list(seeds),
+        "template_initial_cost": template_initial_cost,
+        "template_feasible": template_feasible,  # an infeasible template is not expanded
+        "template_iters": template_iters,
+        "template_best_cost": template_best_cost,
+        "expanded_cost": expanded_cost,
+        "exception_iters": exception_iters,
+        "template_cost": template_cost,
+        "monolithic_cost": monolithic_cost,
+        "returned": returned,  # "template" if the template result beats the monolithic run, "monolithic" otherwise
+        "best_cost": best_cost,
+        "template_time": template_time,
+        "exceptions_time": exceptions_time,
+        "monolithic_time": monolithic_time,
+    }
+    return best_assignments, best_cost, best_penalties, report
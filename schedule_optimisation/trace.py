@@ -0,0 +1,133 @@
+"""
+Iteration Trace Module
+
+The Iteration Trace Module contains a low-overhead structured trace of the search. The algorithms put
+compact records (iteration, current cost, best cost, move type, accepted, elapsed time) into a bounded
+queue and a background thread writes them as JSONL or fixed-size binary records, so the search never
+formats or writes strings itself. The module also contains a bounded cost history which keeps evenly
+spaced costs of arbitrarily long runs.
+"""
+
+import json
+import queue
+import struct
+import threading
+from time import perf_counter
+from schedule_optimisation.constants import TRACE_QUEUE_SIZE, COST_HISTORY_MAX_POINTS
+
+TRACE_FORMATS = ("jsonl", "binary")
+MOVE_TYPES = ("move", "swap")
+
+# Binary record: iteration, current cost, best cost, move type index, accepted flag, elapsed seconds
+BINARY_RECORD = struct.Struct("<IddBBd")
+
+# Verbosity levels
+TRACE_BEST = 0        # new best solutions only
+TRACE_ITERATIONS = 1  # sampled iterations and new best solutions
+TRACE_MOVES = 2       # additionally every rejected (tabu) neighbour
+
+_STOP = object()
+
+class TraceRecorder:
+    def __init__(self, path, fmt="jsonl", sample_every=1, verbosity=TRACE_ITERATIONS, console=False, queue_size=TRACE_QUEUE_SIZE):
+        if fmt not in TRACE_FORMATS:
+            raise ValueError(f"Invalid trace format: {fmt}. Available formats: {', '.join(TRACE_FORMATS)}.")
+        self.path = path
+        self.fmt = fmt
+        self.sample_every = max(1, sample_every)
+        self.verbosity = verbosity
+        self.console = console
+        self.dropped = 0  # records dropped because the queue was full (the search is never blocked)
+        self.start_time = perf_counter()
+
+        # Writer thread with a bounded queue of records (console only without path)
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._file = None
+        if path is not None:
+            self._file = open(path, "wb" if fmt == "binary" else "w", encoding=None if fmt == "binary" else "utf-8")
+        self._thread = threading.Thread(target=self._write_records, name="trace-writer", daemon=True)
+        self._thread.start()
+
+    def _write_records(self):
+        while True:
+            record = self._queue.get()
+            if record is _STOP:
+                break
+            iteration, current_cost, best_cost, move_type, accepted, elapsed = record
+            if self._file is not None:
+                self._file.write(self._encode(record))
+            if self.console:
+                print(f"[{iteration}] {move_type} {'accepted' if accepted else 'rejected'}. "
+                      f"Current cost: {current_cost:.4f}. Best cost: {best_cost:.4f}")
+        if self._file is not None:
+            self._file.close()
+
+    def _encode(self, record):
+        iteration, current_cost, best_cost, move_type, accepted, elapsed = record
+        if self.fmt == "binary":
+            return BINARY_RECORD.pack(iteration, current_cost, best_cost, MOVE_TYPES.index(move_type), accepted, elapsed)
+        return json.dumps({"iteration": iteration, "current_cost": current_cost, "best_cost": best_cost,
+                           "move": move_type, "accepted": accepted, "elapsed": elapsed}) + "\n"
+
+    def record(self, iteration, current_cost, best_cost, move_type, accepted=True):
+        try:
+            self._queue.put_nowait((iteration, float(current_cost), float(best_cost), move_type, bool(accepted),
+                                    perf_counter() - self.start_time))
+        except queue.Full:
+            self.dropped += 1
+
+    def iteration(self, iteration, current_cost, best_cost, move_type, improved):
+        # Record of an accepted move (sampled, new best solutions are always recorded)
+        if improved or (self.verbosity >= TRACE_ITERATIONS and iteration % self.sample_every == 0):
+            self.record(iteration, current_cost, best_cost, move_type)
+
+    def rejected(self, iteration, current_cost, best_cost, move_type):
+        # Record of a rejected neighbour (only with TRACE_MOVES verbosity)
+        if self.verbosity >= TRACE_MOVES:
+            self.record(iteration, current_cost, best_cost, move_type, accepted=False)
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_trace(path, fmt="jsonl"):
+    # Records of a trace file as dicts
+    if fmt == "binary":
+        with open(path, "rb") as f:
+            data = f.read()
+        return [{"iteration": iteration, "current_cost": current_cost, "best_cost": best_cost, "move": MOVE_TYPES[move_type],
+                 "accepted": bool(accepted), "elapsed": elapsed}
+                for iteration, current_cost, best_cost, move_type, accepted, elapsed in BINARY_RECORD.iter_unpack(data)]
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class CostHistory:
+    def __init__(self, max_points=COST_HISTORY_MAX_POINTS):
+        # Every stride-th cost is kept, the stride doubles when the history is full
+        self.max_points = max_points
+        self.stride = 1
+        self.points = []
+        self.count = 0
+
+    def append(self, cost):
+        if self.count % self.stride == 0:
+            self.points.append(cost)
+            if len(self.points) > self.max_points:
+                self.points = self.points[::2]
+                self.stride *= 2
+        self.count += 1
+
+    def __len__(self):
+        return len(self.points)
+
+    def to_list(self):
+        return list(self.points)
@@ -0,0 +1,97 @@
+"""
+Zobrist Hashing Module
+
+The Zobrist Hashing Module contains an incremental 64-bit hash of the assignment state and a bounded
+cost cache keyed by it. The hash is the XOR of one key per (lesson, slot, room) assignment, so a move or
+a swap updates it in O(1) by XOR-ing out the old and in the new assignments. The keys are derived from
+a 64-bit mixing function of the assignment instead of a stored random table, so memory does not grow
+with the problem. The cost cache keeps the costs of recently evaluated states, random move generation
+and tabu cycling revisit the same neighbours and their costs are looked up instead of evaluated again.
+"""
+
+from collections import OrderedDict
+
+CACHE_EVICTIONS = ("lru", "fifo")
+
+_MASK = (1 << 64) - 1
+
+def _mix(x):
+    # SplitMix64 finaliser: well-distributed 64-bit keys from consecutive integers
+    x = (x + 0x9E3779B97F4A7C15) & _MASK
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK
+    return x ^ (x >> 31)
+
+
+class ZobristHash:
+    def __init__(self, problem, seed=0):
+        self.num_times = problem.num_times
+        self.unassigned_slot = problem.num_slots  # slot id of lessons without assignment
+        self.no_room = problem.num_rooms  # room id of lessons without room
+        self.seed = seed
+
+    def key(self, lesson_idx, assign):
+        # Key of one lesson assignment (lessons without assignment have keys too, so moves from and to None change the hash)
+        if assign is None:
+            slot, room = self.unassigned_slot, self.no_room
+        else:
+            slot = assign[0] * self.num_times + assign[1]
+            room = assign[2] if assign[2] is not None else self.no_room
+        index = (lesson_idx * (self.unassigned_slot + 1) + slot) * (self.no_room + 1) + room
+        return _mix(index ^ (self.seed << 40))
+
+    def hash(self, assignments):
+        # Hash of the whole state
+        value = 0
+        for i in range(len(assignments)):
+            value ^= self.key(i, assignments[i])
+        return value
+
+    def delta(self, move):
+        # XOR difference of the hash after the move
+        if move[0] == "move":
+            _, lesson_idx, old_assign, new_assign = move
+            return self.key(lesson_idx, old_assign) ^ self.key(lesson_idx, new_assign)
+        _, a_idx, b_idx, assign_a, assign_b = move
+        return (self.key(a_idx, assign_a) ^ self.key(a_idx, assign_b) ^
+                self.key(b_idx, assign_b) ^ self.key(b_idx, assign_a))
+
+
+class CostCache:
+    def __init__(self, max_size, eviction="lru"):
+        if eviction not in CACHE_EVICTIONS:
+            raise ValueError(f"Invalid cache eviction: {eviction}. Available evictions: {', '.join(CACHE_EVICTIONS)}.")
+        if max_size < 1:
+            raise ValueError(f"Invalid cache size: {max_size}. Expected a positive number of entries.")
+        self.max_size = max_size
+        self.eviction = eviction
+        self.entries = OrderedDict()  # {state hash: (cost, penalties)} in eviction order
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, state_hash):
+        entry = self.entries.get(state_hash)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if self.eviction == "lru":
+            self.entries.move_to_end(state_hash)
+        return entry
+
+    def put(self, state_hash, cost, penalties):
+        # The oldest (fifo) or least recently used (lru) entry is evicted when the cache is full
+        entries = self.entries
+        if state_hash in entries:
+            if self.eviction == "lru":
+                entries.move_to_end(state_hash)
+        elif len(entries) >= self.max_size:
+            entries.popitem(last=False)
+            self.evictions += 1
+        entries[state_hash] = (cost, penalties)
+
+    def report(self):
+        lookups = self.hits + self.misses
+        return {"size": len(self.entries), "max_size": self.max_size, "eviction": self.eviction, "hits": self.hits,
+                "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0, "evictions": self.evictions}
@@ -0,0 +1,8 @@
+import pytest
+from tests.utils import make_problem, random_moves
+
+# Schedules with hard conflicts and a clash-free schedule (soft penalties only), both with unassigned lessons
+@pytest.fixture(params=[0.2, 0.0], ids=["conflicts", "clash_free"])
+def neighbourhood(request):
+    problem, assignments = make_problem(conflict_ratio=request.param, unassigned_ratio=0.05)
+    return problem, assignments, random_moves(problem, assignments, 300)
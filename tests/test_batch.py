@@ -0,0 +1,21 @@
+from schedule_optimisation.batch import BatchEvaluator
+from schedule_optimisation.cost import compute_cost
+
+def test_batch_matches_compute_cost(neighbourhood):
+    problem, assignments, moves = neighbourhood
+    batch_evaluator = BatchEvaluator(problem)
+    costs, violations = batch_evaluator.evaluate(assignments, moves)
+    assert len(costs) == len(moves)
+    for k, move in enumerate(moves):
+        neighbour = assignments.copy()
+        neighbour.apply(move)
+        expected_cost, expected_penalties = compute_cost(neighbour, problem)
+        assert costs[k] == expected_cost
+        assert batch_evaluator.penalties(violations, k) == expected_penalties
+
+def test_batch_accepts_assignment_lists(neighbourhood):
+    problem, assignments, moves = neighbourhood
+    batch_evaluator = BatchEvaluator(problem)
+    costs, _ = batch_evaluator.evaluate(assignments, moves)
+    list_costs, _ = batch_evaluator.evaluate(assignments.to_list(), moves)
+    assert list(costs) == list(list_costs)
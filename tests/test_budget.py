@@ -0,0 +1,57 @@
+import threading
+import time
+from datetime import datetime
+import pytest
+from schedule_optimisation.algorithms import TabuSearch
+from schedule_optimisation.benchmark.generator import generate_timetable
+from schedule_optimisation.budget import BestSoFar, SearchBudget, absolute_deadline
+from schedule_optimisation.engine import STOP_REQUESTED, STOP_TIME_LIMIT
+from schedule_optimisation.optimizer import optimise_schedule
+from tests.utils import make_problem
+
+def test_absolute_deadline():
+    assert absolute_deadline() is None
+    assert absolute_deadline(deadline=123.0) == 123.0
+    now = time.time()
+    assert now + 10 <= absolute_deadline(time_limit=10) <= time.time() + 10
+    assert absolute_deadline(time_limit=10, deadline=now + 5) == now + 5
+    assert absolute_deadline(time_limit=1, deadline=datetime.fromtimestamp(now + 100)) < now + 100
+    with pytest.raises(ValueError):
+        absolute_deadline(time_limit=-1)
+
+def test_search_budget():
+    assert not SearchBudget().expired()
+    assert SearchBudget(time_limit=0).expired()
+    assert SearchBudget(deadline=time.time() - 1).expired()
+    assert not SearchBudget(time_limit=60, deadline=time.time() + 60).expired()
+
+def test_engine_stops_at_time_limit():
+    problem, assignments = make_problem()
+    engine = TabuSearch(assignments, problem, 10**6, 15, time_limit=0.2)
+    start = time.monotonic()
+    engine.run()
+    assert engine.stop_reason == STOP_TIME_LIMIT
+    assert time.monotonic() - start < 1.0
+
+def test_best_so_far_stop_request():
+    problem, assignments = make_problem()
+    best_so_far = BestSoFar()
+    engine = TabuSearch(assignments, problem, 10**6, 15, best_so_far=best_so_far)
+    threading.Timer(0.2, best_so_far.request_stop).start()
+    _, best_cost, _ = engine.run()
+    assert engine.stop_reason == STOP_REQUESTED
+    assert best_so_far.get()[1] == best_cost
+
+# Multi-phase runs: repair before the search, queued multi-start runs, time windows with polish, weekly template
+@pytest.mark.parametrize("options", [
+    dict(repair=True, initialiser="greedy", n_starts=3, max_workers=1),
+    dict(decompose="week", polish_iters=10**6),
+    dict(weekly_template=True),
+], ids=["multistart", "decompose", "weekly_template"])
+def test_time_limit_covers_the_whole_run(options):
+    data = generate_timetable(num_lessons=300, num_teachers=24, num_groups=20, num_rooms=12, num_weeks=2,
+                              conflict_ratio=0.1, seed=0)
+    time_limit = 1.0
+    start = time.monotonic()
+    optimise_schedule(*data, algorithm="ts", max_iters=10**6, time_limit=time_limit, plot=False, **options)
+    assert time.monotonic() - start < time_limit + 0.5
@@ -0,0 +1,47 @@
+import json
+import subprocess
+import sys
+import pytest
+from schedule_optimisation.__main__ import main, parse_args
+from schedule_optimisation.benchmark.generator import generate_timetable
+
+@pytest.fixture
+def schedule_files(tmp_path):
+    schedule, lessons_times, start_date, end_date = generate_timetable(num_lessons=40, num_teachers=6, num_groups=6,
+                                                                       num_rooms=5, num_weeks=1, seed=1)
+    (tmp_path / "schedule.json").write_text(json.dumps(schedule), encoding="utf-8")
+    (tmp_path / "lessons_times.json").write_text(json.dumps(lessons_times), encoding="utf-8")
+    return [str(tmp_path / "schedule.json"), "--lessons-times", str(tmp_path / "lessons_times.json"),
+            "--start-date", str(start_date), "--end-date", str(end_date)], len(schedule)
+
+def test_parse_args_defaults(schedule_files):
+    args = parse_args(schedule_files[0] + ["--output", "-"])
+    assert (args.algorithm, args.max_iters, args.tabu_tenure, args.room_strategy) == ("ts", 1000, 50, "first")
+    assert args.metrics is None and args.seed is None and args.n_starts == 1
+    with pytest.raises(SystemExit):
+        parse_args(schedule_files[0])  # --output is required
+    with pytest.raises(SystemExit):
+        parse_args(schedule_files[0] + ["--output", "-", "--algorithm", "sa"])
+
+def test_main_writes_schedule_and_metrics(schedule_files, tmp_path):
+    argv, num_lessons = schedule_files
+    output, metrics = tmp_path / "optimised.json", tmp_path / "metrics.json"
+    main(argv + ["--output", str(output), "--metrics", str(metrics), "--max-iters", "30", "--tabu-tenure", "10", "--seed", "2"])
+    schedule = json.loads(output.read_text(encoding="utf-8"))
+    report = json.loads(metrics.read_text(encoding="utf-8"))
+    assert len(schedule) == num_lessons
+    assert report["best_cost"] <= report["initial_cost"]
+
+    # The same seed gives the same schedule
+    again = tmp_path / "again.json"
+    main(argv + ["--output", str(again), "--max-iters", "30", "--tabu-tenure", "10", "--seed", "2"])
+    assert json.loads(again.read_text(encoding="utf-8")) == schedule
+
+def test_main_writes_to_stdout(schedule_files, capsys):
+    main(schedule_files[0] + ["--output", "-", "--max-iters", "5", "--seed", "2"])
+    assert len(json.loads(capsys.readouterr().out)) == schedule_files[1]
+
+def test_entry_point_does_not_import_plotting():
+    code = "import sys, schedule_optimisation.__main__; print('matplotlib' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,101 @@
+import random
+import pytest
+from schedule_optimisation.constraints.calcs import calculate_hard_constraints_violations
+from schedule_optimisation.constraints.hard import group_conflicts, room_conflicts, teacher_conflicts
+from schedule_optimisation.problem import Problem
+from tests.utils import make_problem, random_moves
+
+# Original pairwise checks over the lesson dicts (before the interned problem and the conflict graph)
+
+def pairwise_teacher_conflicts(assignments, lessons):
+    # Lessons clash only with the teacher of the first lesson assigned to their slot
+    slot_teacher = {}
+    violations = 0
+    for i, assign in enumerate(assignments):
+        if assign is None:
+            continue
+        slot = assign[:2]
+        if slot in slot_teacher:
+            violations += lessons[i]["lecturer"] == slot_teacher[slot]
+        else:
+            slot_teacher[slot] = lessons[i]["lecturer"]
+    return violations
+
+def pairwise_room_conflicts(assignments, rooms):
+    slot_room = {}
+    violations = 0
+    for assign in assignments:
+        if assign is None or assign[2] is None:
+            continue
+        slot, room = assign[:2], rooms[assign[2]]
+        if slot in slot_room:
+            violations += room == slot_room[slot]
+        else:
+            slot_room[slot] = room
+    return violations
+
+def pairwise_group_conflicts(assignments, lessons):
+    # Every group already seen in the slot is a violation, repeated groups of one lesson included
+    slot_groups = {}
+    violations = 0
+    for i, assign in enumerate(assignments):
+        if assign is None:
+            continue
+        seen = slot_groups.setdefault(assign[:2], set())
+        for grp in lessons[i].get("groups", []):
+            if grp in seen:
+                violations += 1
+            else:
+                seen.add(grp)
+    return violations
+
+def with_repeated_groups(problem, seed):
+    # Same problem with a group repeated inside some lessons
+    rng = random.Random(seed)
+    lessons = [dict(lesson) for lesson in problem.lessons]
+    for lesson in rng.sample(lessons, len(lessons) // 10):
+        if lesson.get("groups"):
+            lesson["groups"] = list(lesson["groups"]) + [rng.choice(lesson["groups"])]
+    return Problem(lessons, problem.rooms, problem.time_slots)
+
+def crowded_schedules(problem, assignments, seed):
+    # Initial assignments and schedules with many clashes: random moves and lessons piled into a few slots
+    rng = random.Random(seed)
+    schedules = [assignments]
+    current = assignments.copy()
+    for move in random_moves(problem, assignments, 60, seed=seed):
+        if move[0] == "swap" or current[move[1]] == move[2]:
+            current.apply(move)
+    schedules.append(current)
+    crowded = current.copy()
+    for i in rng.sample(range(problem.num_lessons), problem.num_lessons // 3):
+        if crowded[i] is not None:
+            date_idx, time_idx = problem.time_slots[rng.randrange(4)]
+            crowded[i] = (date_idx, time_idx, rng.choice([crowded[i][2], rng.randrange(problem.num_rooms)]))
+    schedules.append(crowded)
+    return schedules
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("repeated_groups", [False, True], ids=["groups", "repeated_groups"])
+def test_hard_constraints_match_pairwise_checks(seed, repeated_groups):
+    problem, assignments = make_problem(seed=seed, conflict_ratio=0.2, unassigned_ratio=0.05)
+    if repeated_groups:
+        problem = with_repeated_groups(problem, seed)
+    for schedule in crowded_schedules(problem, assignments, seed):
+        expected = {
+            "teacher_conflicts": pairwise_teacher_conflicts(schedule, problem.lessons),
+            "room_conflicts": pairwise_room_conflicts(schedule, problem.rooms),
+            "group_conflicts": pairwise_group_conflicts(schedule, problem.lessons),
+        }
+        assert teacher_conflicts(schedule, problem) == expected["teacher_conflicts"]
+        assert room_conflicts(schedule, problem) == expected["room_conflicts"]
+        assert group_conflicts(schedule, problem) == expected["group_conflicts"]
+        assert calculate_hard_constraints_violations(schedule, problem) == (sum(expected.values()), expected)
+
+def test_teacher_conflicts_follow_first_lesson():
+    # Lessons 1 and 2 share a teacher but the slot belongs to the teacher of lesson 0, so only lesson 3 clashes
+    lessons = [{"lecturer": "A", "groups": ["g0"]}, {"lecturer": "B", "groups": ["g1"]},
+               {"lecturer": "B", "groups": ["g2"]}, {"lecturer": "A", "groups": ["g3"]}]
+    problem = Problem(lessons, ["r0", "r1", "r2", "r3"], [(0, 0)])
+    schedule = [(0, 0, 0), (0, 0, 1), (0, 0, 2), (0, 0, 3)]
+    assert teacher_conflicts(schedule, problem) == pairwise_teacher_conflicts(schedule, lessons) == 1
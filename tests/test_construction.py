@@ -0,0 +1,33 @@
+import pytest
+from schedule_optimisation.construction import construct_initial_solution
+from schedule_optimisation.cost import compute_cost
+from tests.utils import make_problem
+
+def hard_conflicts(assignments, problem):
+    return sum(compute_cost(assignments, problem)[1]["hard_conflicts"].values())
+
+@pytest.mark.parametrize("seed", range(3))
+def test_greedy_places_unassigned_lessons(seed):
+    problem, assignments = make_problem(seed=seed, conflict_ratio=0.0, unassigned_ratio=0.2)
+    unassigned = [i for i in range(problem.num_lessons) if assignments[i] is None]
+    state, cost, penalties, report = construct_initial_solution(assignments, problem)
+    assert unassigned and (cost, penalties) == compute_cost(state, problem)
+    assert report["unassigned"] == len(unassigned) and report["lifted"] == 0
+    assert report["placed"] + report["unplaced"] == len(unassigned)
+    assert report["unplaced"] == sum(state[i] is None for i in unassigned)
+    # Assigned lessons keep their slots and placed lessons add no hard conflict
+    assert all(state[i] == assignments[i] for i in range(problem.num_lessons) if assignments[i] is not None)
+    assert hard_conflicts(state, problem) == 0
+
+@pytest.mark.parametrize("seed", range(3))
+def test_greedy_conflicts_lifts_clashing_lessons(seed):
+    problem, assignments = make_problem(seed=seed, conflict_ratio=0.2, unassigned_ratio=0.05)
+    state, cost, _, report = construct_initial_solution(assignments, problem, initialiser="greedy_conflicts")
+    assert report["lifted"] > 0
+    assert report["cost"] == cost <= report["initial_cost"] == compute_cost(assignments, problem)[0]
+    assert hard_conflicts(state, problem) < hard_conflicts(assignments, problem)
+
+def test_invalid_initialiser():
+    problem, assignments = make_problem()
+    with pytest.raises(ValueError):
+        construct_initial_solution(assignments, problem, initialiser="random")
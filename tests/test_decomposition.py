@@ -0,0 +1,56 @@
+import time
+import pytest
+from schedule_optimisation.benchmark.generator import generate_timetable
+from schedule_optimisation.cost import compute_cost
+from schedule_optimisation.data_preparation import prepare_input_data
+from schedule_optimisation.decomposition import partition_lessons, run_decomposed, window_ranges
+
+DATES = ["2025-02-03", "2025-02-04", "2025-02-07", "2025-02-10", "2025-02-14", "2025-02-17"]
+
+@pytest.fixture(scope="module")
+def weeks_problem():
+    data = generate_timetable(num_lessons=240, num_teachers=20, num_groups=16, num_rooms=12, num_weeks=3, seed=4)
+    return prepare_input_data(*data, as_state=True)
+
+def test_window_ranges():
+    assert window_ranges(DATES, "week") == [(0, 3), (3, 5), (5, 6)]
+    assert window_ranges(DATES, 4) == [(0, 4), (4, 6)]
+    assert window_ranges(DATES, ["2025-02-07"]) == [(0, 2), (2, 6)]
+    for windows in ("month", 0, ["2025-03-01"]):
+        with pytest.raises(ValueError):
+            window_ranges(DATES, windows)
+
+def test_partition_lessons():
+    assignments = [(0, 0, 0), (4, 1, 0), None, (2, 3, 1), (5, 0, 0), None]
+    members = partition_lessons(assignments, len(assignments), [(0, 3), (3, 5), (5, 6)])
+    assert sorted(i for lessons in members for i in lessons.tolist()) == list(range(len(assignments)))
+    assert [0, 3] == [i for i in members[0].tolist() if assignments[i] is not None]
+    assert members[1].tolist() == [1, 2] and members[2].tolist() == [4, 5]  # unassigned lessons fill small windows
+
+def test_windows_keep_lessons_in_their_window(weeks_problem):
+    problem, all_dates, assignments = weeks_problem
+    ranges = window_ranges(all_dates, "week")
+    members = partition_lessons(assignments, problem.num_lessons, ranges)
+    best_assignments, best_cost, best_penalties, report = run_decomposed(
+        assignments, problem, all_dates, max_iters=100, polish_iters=0, seeds=[1, 2, 3, 4])
+    assert (best_cost, best_penalties) == compute_cost(best_assignments, problem)
+    assert report["polished_cost"] == report["stitched_cost"] == best_cost
+    for lessons, (start, end) in zip(members, ranges):
+        for i in lessons.tolist():
+            assert best_assignments[i] is None or start <= best_assignments[i][0] < end
+
+def test_seeded_runs_are_reproducible(weeks_problem):
+    problem, all_dates, assignments = weeks_problem
+    runs = [run_decomposed(assignments, problem, all_dates, max_iters=60, polish_iters=30, seeds=[5, 6, 7, 8])
+            for _ in range(2)]
+    assert list(runs[0][0]) == list(runs[1][0]) and runs[0][1] == runs[1][1]
+    with pytest.raises(ValueError):
+        run_decomposed(assignments, problem, all_dates, seeds=[1])
+
+def test_time_limit_is_one_deadline(weeks_problem):
+    problem, all_dates, assignments = weeks_problem
+    start = time.monotonic()
+    _, _, _, report = run_decomposed(assignments, problem, all_dates, max_iters=10**6, polish_iters=10**6,
+                                     compare_monolithic=True, time_limit=1.0)
+    assert time.monotonic() - start < 1.5
+    assert report["windows_time"] + report["polish_time"] + report["monolithic"]["run_time"] < 1.5
@@ -0,0 +1,42 @@
+import random
+import numpy as np
+import pytest
+from schedule_optimisation.algorithms import QuantumInspiredTabuSearch, TabuSearch
+from schedule_optimisation.cost import compute_cost
+from schedule_optimisation.engine import STOP_MAX_ITERS, STOP_REQUESTED
+from tests.utils import make_problem
+
+ENGINES = [TabuSearch, QuantumInspiredTabuSearch]
+
+def seeded_engine(engine_class, max_iters, seed=7):
+    problem, assignments = make_problem()
+    random.seed(seed)
+    np.random.seed(seed)
+    return engine_class(assignments, problem, max_iters, 15)
+
+@pytest.mark.parametrize("engine_class", ENGINES, ids=lambda engine_class: engine_class.name)
+def test_steps_match_run(engine_class):
+    full = seeded_engine(engine_class, 120)
+    full.run()
+    stepped = seeded_engine(engine_class, 120)
+    assert stepped.step(50) == 50
+    assert stepped.status()["iteration"] == 50 and not stepped.status()["done"]
+    assert [engine.iteration for engine in stepped.batches(30)] == [80, 110, 120]
+    assert stepped.done and stepped.stop_reason == STOP_MAX_ITERS
+    assert stepped.result()[1] == full.best_cost
+    assert list(stepped.best_assignments) == list(full.best_assignments)
+    assert (stepped.best_cost, stepped.best_penalties) == compute_cost(stepped.best_assignments, stepped.problem)
+
+def test_run_until_and_stop():
+    engine = seeded_engine(TabuSearch, 1000)
+    assert not engine.run_until(lambda engine: engine.iteration >= 40, batch_size=7)
+    assert engine.iteration == 42
+    engine.stop()
+    assert engine.done and engine.stop_reason == STOP_REQUESTED
+    assert engine.step(10) == 0
+
+def test_run_without_iterations():
+    engine = seeded_engine(TabuSearch, 0)
+    best_assignments, best_cost, _ = engine.run()
+    assert engine.iteration == 0 and engine.stop_reason == STOP_MAX_ITERS
+    assert best_cost == compute_cost(best_assignments, engine.problem)[0]
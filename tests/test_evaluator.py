@@ -0,0 +1,63 @@
+import pytest
+from schedule_optimisation.cost import compute_cost
+from schedule_optimisation.evaluator import CostEvaluator, EVALUATION_TERMS, PRUNED
+from tests.utils import make_problem, random_moves
+
+def neighbour_cost(assignments, move, problem):
+    # Cost and penalties of the neighbour computed from scratch
+    neighbour = assignments.copy()
+    neighbour.apply(move)
+    return compute_cost(neighbour, problem)
+
+def test_evaluate_matches_compute_cost(neighbourhood):
+    problem, assignments, moves = neighbourhood
+    evaluator = CostEvaluator(assignments, problem)
+    for move in moves:
+        assert evaluator.evaluate(move) == neighbour_cost(assignments, move, problem)
+    # Evaluations leave the current state unchanged
+    assert evaluator.cost() == compute_cost(assignments, problem)
+
+def test_delta_matches_compute_cost(neighbourhood):
+    problem, assignments, moves = neighbourhood
+    evaluator = CostEvaluator(assignments, problem)
+    current_cost, _ = compute_cost(assignments, problem)
+    for move in moves:
+        assert evaluator.delta(move) == neighbour_cost(assignments, move, problem)[0] - current_cost
+
+@pytest.mark.parametrize("term_order", [None, tuple(reversed(EVALUATION_TERMS))])
+def test_bounded_evaluate_matches_compute_cost(neighbourhood, term_order):
+    problem, assignments, moves = neighbourhood
+    evaluator = CostEvaluator(assignments, problem, term_order=term_order)
+    for move in moves:
+        expected_cost, expected_penalties = neighbour_cost(assignments, move, problem)
+        # Bounds above the cost give the exact cost, bounds at or below it prune with a valid lower bound
+        assert evaluator.evaluate(move, bound=expected_cost + 1) == (expected_cost, expected_penalties)
+        assert evaluator.evaluate(move, bound=float("inf")) == (expected_cost, expected_penalties)
+        for bound in (expected_cost, expected_cost // 2, 0):
+            cost, penalties = evaluator.evaluate(move, bound=bound)
+            if penalties is PRUNED:
+                assert bound <= cost <= expected_cost
+            else:
+                assert (cost, penalties) == (expected_cost, expected_penalties)
+    assert evaluator.cost() == compute_cost(assignments, problem)
+
+def test_commit_keeps_counters_exact():
+    problem, assignments = make_problem(conflict_ratio=0.1, unassigned_ratio=0.05)
+    evaluator = CostEvaluator(assignments, problem)
+    for k in range(60):
+        move = random_moves(problem, assignments, 1, seed=k)[0]
+        expected = neighbour_cost(assignments, move, problem)
+        assignments.apply(move)
+        assert evaluator.commit(move) == expected
+
+def test_candidate_sets_follow_commits():
+    problem, assignments = make_problem(conflict_ratio=0.1, unassigned_ratio=0.05)
+    evaluator = CostEvaluator(assignments, problem, track_candidates=True)
+    for k in range(60):
+        move = random_moves(problem, assignments, 1, seed=k)[0]
+        assignments.apply(move)
+        evaluator.commit(move)
+    # Candidate sets updated by the commits are the same as the ones of the final state
+    fresh = CostEvaluator(assignments, problem, track_candidates=True)
+    assert set(evaluator.conflicted.items) == set(fresh.conflicted.items)
+    assert set(evaluator.penalised.items) == set(fresh.penalised.items)
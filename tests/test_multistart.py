@@ -0,0 +1,40 @@
+import random
+import numpy as np
+import pytest
+from schedule_optimisation.algorithms import tabu_search
+from schedule_optimisation.parallel import run_multistart
+from tests.utils import make_problem
+
+SEEDS = [11, 12, 13]
+
+@pytest.fixture(scope="module")
+def problem_assignments():
+    return make_problem(seed=3)
+
+def test_seeded_runs_match_single_runs(problem_assignments):
+    problem, assignments = problem_assignments
+    best_assignments, best_cost, _, report = run_multistart(assignments, problem, n_starts=3, max_workers=2, seeds=SEEDS,
+                                                            max_iters=60, tabu_tenure=10)
+    # Every start is the single run of the algorithm seeded the same way
+    costs = []
+    for seed in SEEDS:
+        random.seed(seed)
+        np.random.seed(seed)
+        costs.append(tabu_search(assignments, problem, 60, 10, plot=False)[1])
+    assert report["costs"] == costs
+    assert best_cost == min(costs) and report["best_seed"] == SEEDS[costs.index(best_cost)]
+
+def test_results_do_not_depend_on_workers(problem_assignments):
+    problem, assignments = problem_assignments
+    runs = [run_multistart(assignments, problem, algorithm="qits", n_starts=3, max_workers=max_workers, seeds=SEEDS,
+                           max_iters=40, tabu_tenure=10)
+            for max_workers in (1, 3)]
+    assert list(runs[0][0]) == list(runs[1][0]) and runs[0][1] == runs[1][1]
+    assert runs[0][3]["costs"] == runs[1][3]["costs"]
+
+def test_invalid_seeds_and_algorithm(problem_assignments):
+    problem, assignments = problem_assignments
+    with pytest.raises(ValueError):
+        run_multistart(assignments, problem, n_starts=2, seeds=[1])
+    with pytest.raises(ValueError):
+        run_multistart(assignments, problem, algorithm="sa", n_starts=1, seeds=[1])
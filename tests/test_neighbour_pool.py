@@ -0,0 +1,48 @@
+import random
+import numpy as np
+from schedule_optimisation import algorithms
+from schedule_optimisation.evaluator import CostEvaluator
+from schedule_optimisation.neighbour_pool import NeighbourEvaluationPool
+from tests.utils import make_problem, random_moves
+
+def test_pool_matches_serial_evaluation(neighbourhood):
+    problem, assignments, moves = neighbourhood
+    evaluator = CostEvaluator(assignments, problem)
+    with NeighbourEvaluationPool(assignments, problem, num_workers=3) as pool:
+        assert pool.evaluate(moves) == [evaluator.evaluate(move) for move in moves]
+        # Accepted moves are replayed by the workers
+        current = assignments.copy()
+        for move in random_moves(problem, assignments, 1, seed=5):
+            pool.commit(move)
+            evaluator.commit(move)
+            current.apply(move)
+        next_moves = random_moves(problem, current, 40, seed=6)
+        assert pool.evaluate(next_moves) == [evaluator.evaluate(move) for move in next_moves]
+        # Replaced assignments rebuild the workers
+        pool.sync(assignments)
+        assert pool.evaluate(moves) == [CostEvaluator(assignments, problem).evaluate(move) for move in moves]
+
+def _run_qits(assignments, problem, neighbour_workers):
+    random.seed(3)
+    np.random.seed(3)
+    with algorithms.QuantumInspiredTabuSearch(assignments, problem, max_iters=60, tabu_tenure=10,
+                                              neighbour_workers=neighbour_workers) as engine:
+        assert (engine.neighbour_pool is not None) == (neighbour_workers is not None)
+        best_assignments, best_cost, best_penalties = engine.run()
+    return list(best_assignments), best_cost, best_penalties
+
+def test_pool_search_is_deterministic(monkeypatch):
+    problem, assignments = make_problem(seed=2)
+    serial = _run_qits(assignments, problem, None)
+    monkeypatch.setattr(algorithms, "PARALLEL_NEIGHBOURS_MIN_LESSONS", 0)
+    monkeypatch.setattr(algorithms.os, "cpu_count", lambda: 4)
+    for neighbour_workers in (2, 4):
+        assert _run_qits(assignments, problem, neighbour_workers) == serial
+
+def test_pool_is_off_without_spare_cpus(monkeypatch):
+    problem, assignments = make_problem()
+    monkeypatch.setattr(algorithms, "PARALLEL_NEIGHBOURS_MIN_LESSONS", 0)
+    monkeypatch.setattr(algorithms.os, "cpu_count", lambda: 1)
+    engine = algorithms.QuantumInspiredTabuSearch(assignments, problem, max_iters=10, neighbour_workers=4)
+    assert engine.neighbour_pool is None
+    engine.close()
@@ -0,0 +1,45 @@
+import random
+import pytest
+from schedule_optimisation.occupancy import SlotOccupancy
+
+def brute_force_free_rooms(assignments, problem, date_idx, time_idx, moving_assign=None):
+    # Rooms not used by any other lesson of the slot (the moving lesson leaves its room)
+    used = [assign[2] for assign in assignments if assign is not None and assign[2] is not None and assign[:2] == (date_idx, time_idx)]
+    if moving_assign is not None and moving_assign[2] is not None and moving_assign[:2] == (date_idx, time_idx):
+        used.remove(moving_assign[2])
+    return [room_idx for room_idx in range(problem.num_rooms) if room_idx not in used]
+
+def test_free_rooms_match_brute_force(neighbourhood):
+    problem, assignments, moves = neighbourhood
+    occupancy = SlotOccupancy(assignments, problem)
+    current = assignments.copy()
+    rng = random.Random(1)
+    for move in moves[:100]:
+        for date_idx, time_idx in rng.sample(problem.time_slots, 10):
+            for moving_assign in (None, current[rng.randrange(problem.num_lessons)]):
+                expected = brute_force_free_rooms(current, problem, date_idx, time_idx, moving_assign)
+                assert occupancy.free_rooms(date_idx, time_idx, moving_assign) == expected
+                assert occupancy.choose_room(date_idx, time_idx, moving_assign=moving_assign) == (expected[0] if expected else None)
+        # Moves are generated from the initial assignments, only the ones still valid are accepted
+        if move[0] == "move" and current[move[1]] == move[2]:
+            occupancy.apply(move)
+            current.apply(move)
+        elif move[0] == "swap" and (current[move[1]], current[move[2]]) == move[3:]:
+            occupancy.apply(move)
+            current.apply(move)
+
+def test_room_strategies(neighbourhood):
+    problem, assignments, _ = neighbourhood
+    occupancy = SlotOccupancy(assignments, problem)
+    date_idx, time_idx = problem.time_slots[0]
+    free = occupancy.free_rooms(date_idx, time_idx)
+    assert occupancy.choose_room(date_idx, time_idx, strategy="random") in free
+    assert occupancy.choose_room(date_idx, time_idx, strategy=lambda rooms, d, t: rooms[-1]) == free[-1]
+    with pytest.raises(ValueError):
+        occupancy.choose_room(date_idx, time_idx, strategy="best")
+
+def test_full_slot_has_no_free_room(neighbourhood):
+    problem, assignments, _ = neighbourhood
+    occupancy = SlotOccupancy([(0, 0, room_idx) for room_idx in range(problem.num_rooms)], problem)
+    assert occupancy.free_rooms(0, 0) == [] and occupancy.choose_room(0, 0) is None
+    assert occupancy.choose_room(0, 0, moving_assign=(0, 0, 3)) == 3
@@ -0,0 +1,38 @@
+import random
+import numpy as np
+import pytest
+from schedule_optimisation.cost import compute_cost
+from schedule_optimisation.repair import STOP_FEASIBLE, repair_conflicts
+from tests.utils import make_problem
+
+@pytest.mark.parametrize("seed", range(3))
+def test_repair_reaches_feasibility(seed):
+    problem, assignments = make_problem(seed=seed, conflict_ratio=0.3, unassigned_ratio=0.05)
+    random.seed(seed)
+    repaired, cost, penalties, report = repair_conflicts(assignments, problem)
+    assert report["initial_conflicted_lessons"] > 0 and report["initial_cost"] == compute_cost(assignments, problem)[0]
+    assert report["feasible"] and report["stop_reason"] == STOP_FEASIBLE
+    assert (cost, penalties) == compute_cost(repaired, problem)
+    assert not any(penalties["hard_conflicts"].values())
+    # Only the slots of assigned lessons change, unassigned lessons stay unassigned
+    assert all((repaired[i] is None) == (assignments[i] is None) for i in range(problem.num_lessons))
+
+def test_feasible_schedule_is_unchanged():
+    problem, assignments = make_problem(conflict_ratio=0.0)
+    repaired, cost, _, report = repair_conflicts(assignments, problem)
+    assert report["feasible"] and report["iterations"] <= 1
+    assert list(repaired) == list(assignments) and cost == compute_cost(assignments, problem)[0]
+
+def test_repair_is_reproducible():
+    problem, assignments = make_problem(seed=4, conflict_ratio=0.3)
+    runs = []
+    for _ in range(2):
+        random.seed(7)
+        np.random.seed(7)
+        runs.append(repair_conflicts(assignments, problem))
+    assert list(runs[0][0]) == list(runs[1][0]) and runs[0][3]["iterations"] == runs[1][3]["iterations"]
+
+def test_iteration_limit():
+    problem, assignments = make_problem(seed=1, conflict_ratio=0.3)
+    _, _, _, report = repair_conflicts(assignments, problem, max_iters=1)
+    assert report["iterations"] <= 1 and not report["feasible"]
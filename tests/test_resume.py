@@ -0,0 +1,73 @@
+import random
+import numpy as np
+import pytest
+from schedule_optimisation.algorithms import QuantumInspiredTabuSearch, TabuSearch
+from schedule_optimisation.checkpoint import load_checkpoint, save_checkpoint
+from tests.utils import make_problem
+
+ENGINES = [TabuSearch, QuantumInspiredTabuSearch]
+
+# Search options and the problem they are run on: small problems revisit solutions, so the solution tabu matters
+CASES = {
+    "default": ({}, {}),
+    "candidate_bias": (dict(candidate_bias=0.7), {}),
+    "candidate_bias_enumerate": (dict(candidate_bias=0.5, enumerate_moves=True), {}),
+    "solution_tabu": (dict(tabu_tenure=0, solution_tabu_tenure=500, neighbour_checks_limit=5),
+                      dict(num_lessons=10, num_teachers=3, num_groups=3, num_rooms=2, num_weeks=1)),
+    "solution_tabu_enumerate": (dict(tabu_tenure=0, solution_tabu_tenure=500, enumerate_moves=True),
+                                dict(num_lessons=8, num_teachers=3, num_groups=3, num_rooms=2, num_weeks=1)),
+    "solution_tabu_candidate_bias": (dict(solution_tabu_tenure=30, candidate_bias=0.5, cost_cache_size=500), {}),
+}
+
+def run_engine(engine_class, assignments, problem, options, max_iters, resume_from=None, seed=3):
+    options = dict(options)
+    tabu_tenure = options.pop("tabu_tenure", 15)
+    random.seed(seed)
+    np.random.seed(seed)
+    return engine_class(assignments, problem, max_iters, tabu_tenure, resume_from=resume_from, **options)
+
+def assert_same_search(resumed, full):
+    assert resumed.iteration == full.iteration
+    assert resumed.stop_reason == full.stop_reason
+    assert resumed.best_cost == full.best_cost
+    assert list(resumed.best_assignments) == list(full.best_assignments)
+    assert list(resumed.current_assignments) == list(full.current_assignments)
+    assert resumed.cost_history.to_list() == full.cost_history.to_list()
+
+@pytest.mark.parametrize("case", CASES)
+@pytest.mark.parametrize("engine_class", ENGINES, ids=lambda engine_class: engine_class.name)
+def test_resume_continues_exactly(engine_class, case):
+    options, problem_options = CASES[case]
+    problem, assignments = make_problem(seed=1, **problem_options)
+    full = run_engine(engine_class, assignments, problem, options, 200)
+    full.run()
+
+    # Stop halfway, then resume with other random states (the checkpoint restores them)
+    engine = run_engine(engine_class, assignments, problem, options, 200)
+    engine.step(100)
+    state = engine.checkpoint_state()
+    resumed = run_engine(engine_class, assignments, problem, options, 200, resume_from=state, seed=99)
+    resumed.run()
+    assert_same_search(resumed, full)
+
+@pytest.mark.parametrize("engine_class", ENGINES, ids=lambda engine_class: engine_class.name)
+def test_resume_from_checkpoint_file(engine_class, tmp_path):
+    options = dict(candidate_bias=0.7, solution_tabu_tenure=30)
+    problem, assignments = make_problem(seed=2)
+    full = run_engine(engine_class, assignments, problem, options, 150)
+    full.run()
+
+    engine = run_engine(engine_class, assignments, problem, options, 150)
+    engine.step(60)
+    path = tmp_path / "search.npz"
+    save_checkpoint(path, *engine.checkpoint_state())
+    resumed = run_engine(engine_class, assignments, problem, options, 150, resume_from=load_checkpoint(path), seed=99)
+    resumed.run()
+    assert_same_search(resumed, full)
+
+def test_resume_rejects_other_algorithm():
+    problem, assignments = make_problem()
+    engine = run_engine(TabuSearch, assignments, problem, {}, 50)
+    engine.step(10)
+    with pytest.raises(ValueError):
+        run_engine(QuantumInspiredTabuSearch, assignments, problem, {}, 50, resume_from=engine.checkpoint_state())
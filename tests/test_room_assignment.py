@@ -0,0 +1,30 @@
+import itertools
+import numpy as np
+import pytest
+from schedule_optimisation.cost import compute_cost
+from schedule_optimisation.room_assignment import assign_rooms, min_cost_assignment
+from tests.utils import make_problem
+
+def brute_force_cost(cost):
+    # Lowest total cost over all assignments of distinct columns to the rows
+    num_rows, num_cols = cost.shape
+    return min(sum(cost[row, col] for row, col in enumerate(cols))
+               for cols in itertools.permutations(range(num_cols), num_rows))
+
+@pytest.mark.parametrize("shape", [(1, 1), (1, 4), (3, 3), (4, 6), (5, 5), (6, 7)])
+def test_min_cost_assignment_is_optimal(shape):
+    rng = np.random.default_rng(sum(shape))
+    for high in (3, 100):  # few distinct costs (many ties) and mostly distinct costs
+        for _ in range(20):
+            cost = rng.integers(0, high, size=shape)
+            assignment = min_cost_assignment(cost)
+            assert len(set(assignment.tolist())) == shape[0]
+            assert cost[np.arange(shape[0]), assignment].sum() == brute_force_cost(cost)
+
+def test_assign_rooms_never_worsens():
+    problem, assignments = make_problem(conflict_ratio=0.0, unassigned_ratio=0.0)
+    state, cost, penalties, report = assign_rooms(assignments, problem)
+    assert (cost, penalties) == compute_cost(state, problem)
+    assert cost <= report["initial_cost"]
+    # Only the rooms change
+    assert [assign[:2] for assign in state] == [assign[:2] for assign in assignments]
@@ -0,0 +1,73 @@
+import pytest
+from schedule_optimisation.tabu import SolutionTabu, TabuMemory
+from tests.utils import make_problem
+
+def colliding(table, keys, count):
+    # First count keys which fall into the same bucket of the table
+    target = None
+    found = []
+    for key in keys:
+        bucket = table._bucket(key)
+        if target is None:
+            target = bucket
+        if bucket == target:
+            found.append(key)
+            if len(found) == count:
+                return found
+    raise AssertionError("not enough colliding keys")
+
+@pytest.mark.parametrize("tenure", [8, 50, 200])
+def test_solution_tabu_keeps_colliding_hashes(tenure):
+    solution_tabu = SolutionTabu(tenure)
+    hashes = colliding(solution_tabu.table, range(10**6), tenure)
+    for iteration, state_hash in enumerate(hashes):
+        solution_tabu.add(state_hash, iteration)
+    assert all(solution_tabu.is_tabu(state_hash, tenure - 1) for state_hash in hashes)
+    # Entries expire after the tenure and their slots are reused
+    assert not any(solution_tabu.is_tabu(state_hash, 2 * tenure) for state_hash in hashes)
+
+def test_tabu_memory_keeps_colliding_slots():
+    problem, assignments = make_problem()
+    tenure = 40
+    memory = TabuMemory(problem, tenure, attribute="lesson_slot")
+    slots = [(i, (d, t, 0)) for i in range(problem.num_lessons) for d, t in problem.time_slots]
+    keys = {memory._slot_key(i, assign): (i, assign) for i, assign in slots}
+    moves = [("move", *keys[key], None) for key in colliding(memory.slot_table, keys, tenure)]
+    for iteration, move in enumerate(moves):
+        memory.add(move, iteration)
+    # Every lesson may not return to the slot it left
+    for _, i, old_assign, _ in moves:
+        assert memory.is_tabu(("move", i, None, old_assign), tenure - 1)
+
+def test_tabu_attributes_and_expiry():
+    problem, assignments = make_problem()
+    a, b = 0, 1
+    move = ("move", a, assignments[a], (0, 0, 0))
+    back = ("move", a, (0, 0, 0), assignments[a])
+    swap = ("swap", a, b, assignments[a], assignments[b])
+
+    memory = TabuMemory(problem, 10, attribute="lesson")
+    memory.add(move, 5)
+    assert memory.is_tabu(("move", a, (0, 0, 0), (1, 1, 1)), 14)
+    assert not memory.is_tabu(("move", a, (0, 0, 0), (1, 1, 1)), 15)
+
+    memory = TabuMemory(problem, 10, attribute="lesson_pair")
+    memory.add(move, 5)
+    memory.add(swap, 6)
+    assert memory.is_tabu(back, 14) and not memory.is_tabu(back, 15)
+    assert memory.is_tabu(("swap", b, a, assignments[b], assignments[a]), 15)
+    assert not memory.is_tabu(swap, 16)
+
+    with pytest.raises(ValueError):
+        TabuMemory(problem, 10, attribute="slot")
+
+def test_tabu_state_round_trip():
+    problem, _ = make_problem()
+    memory = TabuMemory(problem, 30, attribute="lesson_pair", table_size=8)  # one bucket, grows while adding
+    moves = [("swap", i, i + 1, (0, 0, 0), (0, 1, 0)) for i in range(30)]
+    for iteration, move in enumerate(moves):
+        memory.add(move, iteration)
+    restored = TabuMemory(problem, 30, attribute="lesson_pair")
+    restored.load_state(memory.state())
+    assert all(restored.is_tabu(move, 29) for move in moves)
+    assert not restored.is_tabu(("swap", 0, 5, (0, 0, 0), (0, 1, 0)), 29)
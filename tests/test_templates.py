@@ -0,0 +1,59 @@
+import time
+import pytest
+from schedule_optimisation.benchmark.generator import generate_timetable
+from schedule_optimisation.cost import compute_cost
+from schedule_optimisation.data_preparation import prepare_input_data
+from schedule_optimisation.repair import repair_conflicts
+from schedule_optimisation.templates import WeeklyTemplate, run_weekly_template
+
+@pytest.fixture(scope="module")
+def weeks_problem():
+    data = generate_timetable(num_lessons=300, num_teachers=20, num_groups=16, num_rooms=12, num_weeks=4, seed=2)
+    return prepare_input_data(*data, as_state=True)
+
+def test_series_recur_on_one_weekday(weeks_problem):
+    problem, all_dates, assignments = weeks_problem
+    template = WeeklyTemplate(problem, assignments, all_dates)
+    assert template.series and template.num_folded_lessons > len(template.series)
+    lessons = [i for series in template.template_series for i in series]
+    unassigned = [i for i in range(problem.num_lessons) if assignments[i] is None]
+    assert sorted(lessons + unassigned) == list(range(problem.num_lessons))
+    for series in template.series:
+        lesson = problem.lessons[series[0]]
+        assert len({template.weekday_of_date[assignments[i][0]] for i in series}) == 1
+        assert len({template.week_of_date[assignments[i][0]] for i in series}) == len(series)
+        assert all(problem.lessons[i]["lecturer"] == lesson["lecturer"] for i in series)
+
+def test_clash_free_template_expands_without_clashes(weeks_problem):
+    problem, all_dates, assignments = weeks_problem
+    template = WeeklyTemplate(problem, assignments, all_dates)
+    template_assignments, _, _, report = repair_conflicts(template.template_assignments, template.template_problem)
+    assert report["feasible"]
+    expanded, detached = template.expand(template_assignments, assignments)
+    for s, series in enumerate(template.template_series):
+        for i in series:
+            assert i in detached or expanded[i][1:] == template_assignments[s][1:]
+    if not detached:
+        assert template.clashing_occurrences(expanded) == []
+        _, penalties = compute_cost(expanded, problem)
+        assert not any(penalties["hard_conflicts"].values())
+
+def test_result_is_never_worse_than_monolithic(weeks_problem):
+    problem, all_dates, assignments = weeks_problem
+    best_assignments, best_cost, best_penalties, report = run_weekly_template(
+        assignments, problem, all_dates, max_iters=200, tabu_tenure=10, seeds=[1, 2, 3])
+    assert (best_cost, best_penalties) == compute_cost(best_assignments, problem)
+    assert report["template_feasible"]
+    assert report["template_iters"] < 200 and report["exception_iters"] < 200
+    assert best_cost == min(report["monolithic_cost"], report["template_cost"])
+    assert report["returned"] == ("template" if report["template_cost"] < report["monolithic_cost"] else "monolithic")
+    with pytest.raises(ValueError):
+        run_weekly_template(assignments, problem, all_dates, seeds=[1])
+
+def test_time_limit_is_one_deadline(weeks_problem):
+    problem, all_dates, assignments = weeks_problem
+    start = time.monotonic()
+    _, _, _, report = run_weekly_template(assignments, problem, all_dates, max_iters=10**6, exception_iters=10**6,
+                                          time_limit=1.0)
+    assert time.monotonic() - start < 1.5
+    assert report["template_time"] + report["exceptions_time"] + report["monolithic_time"] < 1.5
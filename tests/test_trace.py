@@ -0,0 +1,56 @@
+import pytest
+from schedule_optimisation.algorithms import tabu_search
+from schedule_optimisation.trace import TRACE_BEST, TRACE_MOVES, CostHistory, TraceRecorder, read_trace
+from tests.utils import make_problem
+
+RECORDS = [(0, 120.0, 120.0, "move", True), (1, 118.5, 118.5, "swap", True), (2, 130.25, 118.5, "move", False)]
+
+@pytest.mark.parametrize("fmt", ["jsonl", "binary"])
+def test_records_round_trip(tmp_path, fmt):
+    path = tmp_path / f"trace.{fmt}"
+    with TraceRecorder(path, fmt=fmt) as recorder:
+        for record in RECORDS:
+            recorder.record(*record)
+    records = read_trace(path, fmt)
+    assert [(r["iteration"], r["current_cost"], r["best_cost"], r["move"], r["accepted"]) for r in records] == RECORDS
+    elapsed = [r["elapsed"] for r in records]
+    assert elapsed == sorted(elapsed) and elapsed[0] >= 0
+
+def test_invalid_format(tmp_path):
+    with pytest.raises(ValueError):
+        TraceRecorder(tmp_path / "trace.csv", fmt="csv")
+
+def test_sampling_and_verbosity(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    with TraceRecorder(path, sample_every=5, verbosity=TRACE_MOVES) as recorder:
+        for iteration in range(12):
+            recorder.iteration(iteration, 100 - iteration, 100 - iteration, "move", improved=iteration == 7)
+        recorder.rejected(12, 90, 88, "swap")
+    assert [(r["iteration"], r["accepted"]) for r in read_trace(path)] == [(0, True), (5, True), (7, True), (10, True), (12, False)]
+
+    path = tmp_path / "best.jsonl"
+    with TraceRecorder(path, sample_every=1, verbosity=TRACE_BEST) as recorder:
+        for iteration in range(4):
+            recorder.iteration(iteration, 100, 100, "move", improved=iteration == 2)
+        recorder.rejected(4, 90, 88, "swap")
+    assert [r["iteration"] for r in read_trace(path)] == [2]
+
+@pytest.mark.parametrize("fmt", ["jsonl", "binary"])
+def test_search_trace_follows_best_cost(tmp_path, fmt):
+    problem, assignments = make_problem()
+    path = tmp_path / f"search.{fmt}"
+    with TraceRecorder(path, fmt=fmt) as recorder:
+        _, best_cost, _ = tabu_search(assignments, problem, 50, 10, plot=False, trace=recorder)
+    records = read_trace(path, fmt)
+    assert len(records) == 50 and recorder.dropped == 0
+    assert [r["iteration"] for r in records] == list(range(50))
+    best_costs = [r["best_cost"] for r in records]
+    assert best_costs == sorted(best_costs, reverse=True) and best_costs[-1] == best_cost
+
+def test_cost_history_keeps_evenly_spaced_costs():
+    history = CostHistory(max_points=8)
+    for cost in range(100):
+        history.append(cost)
+    points = history.to_list()
+    assert len(history) <= 8 and points[0] == 0
+    assert len({b - a for a, b in zip(points, points[1:])}) == 1
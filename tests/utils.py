@@ -0,0 +1,31 @@
+import random
+from schedule_optimisation.benchmark.generator import generate_timetable
+from schedule_optimisation.data_preparation import prepare_input_data
+from schedule_optimisation.occupancy import SlotOccupancy
+
+def make_problem(seed=0, **generator_options):
+    # Problem and initial assignments of a synthetic timetable
+    options = dict(num_lessons=120, num_teachers=12, num_groups=12, num_rooms=8, num_weeks=2)
+    options.update(generator_options)
+    schedule_data, lessons_times, start_date, end_date = generate_timetable(seed=seed, **options)
+    problem, _, assignments = prepare_input_data(schedule_data, lessons_times, start_date, end_date, as_state=True)
+    return problem, assignments
+
+def random_moves(problem, assignments, num_moves, seed=0):
+    # Same neighbourhood as the algorithms: moves of one lesson to a slot with a free room and swaps of two lessons
+    rng = random.Random(seed)
+    occupancy = SlotOccupancy(assignments, problem)
+    moves = []
+    while len(moves) < num_moves:
+        if rng.random() < 0.5:
+            lesson_idx = rng.randrange(problem.num_lessons)
+            old_assign = assignments[lesson_idx]
+            d_new, t_new = problem.time_slots[rng.randrange(problem.total_slots)]
+            new_room_idx = occupancy.choose_room(d_new, t_new, moving_assign=old_assign)
+            if new_room_idx is not None:
+                moves.append(("move", lesson_idx, old_assign, (d_new, t_new, new_room_idx)))
+        else:
+            a, b = rng.randrange(problem.num_lessons), rng.randrange(problem.num_lessons)
+            if a != b:
+                moves.append(("swap", a, b, assignments[a], assignments[b]))
+    return moves